@@ -2,6 +2,8 @@ import os
 import sys
 import typer
 
+from typing import List
+
 from rich import print
 from rich.console import Console
 
@@ -12,12 +14,16 @@ from proxycrawler.messages import (
     errors
 )
 from proxycrawler.src.proxycrawler import ProxyCrawler
+from proxycrawler.src.proxy_file import ProxyFile
+from proxycrawler.src.validation.judge import JudgeServer
 from proxycrawler.src.database.database_handler import DatabaseHandler
 
 from proxycrawler.src.models.cli_options_model import CLIOptions
 
 # Init cli
 cli = typer.Typer()
+db_cli = typer.Typer(help="Maintain the proxies database")
+cli.add_typer(db_cli, name="db")
 
 # Init console
 console = Console()
@@ -25,6 +31,78 @@ console = Console()
 # Configuring console
 console._log_render.omit_repeated_times = False # Repeat the timestamp even if the logs were logged on the same time
 
+def check_validation_options(cli_options: CLIOptions, deadline: str | None) -> None:
+    """
+    Checks the validation options shared by the commands that validate proxies, exiting on the first unvalid one.
+
+    Args:
+        cli_options (CLIOptions): The command's options, its `deadline` is set from `deadline`.
+        deadline (str | None): The `--deadline` option, like 90s, 30m or 1h.
+
+    Returns:
+        None: This function doesn't return anything.
+    """
+    # Check the deadline
+    if deadline is not None:
+        try:
+            cli_options.deadline = helpers.parse_duration(deadline)
+        except ValueError:
+            console.log(
+                errors.UNVALID_DURATION(
+                    duration=deadline
+                )
+            )
+            sys.exit(1)
+
+    # Check the validation targets
+    for target_url in cli_options.target_urls or []:
+        if not helpers.is_valid_target_url(target_url):
+            console.log(
+                errors.UNVALID_TARGET_URL(
+                    target_url=target_url
+                )
+            )
+            sys.exit(1)
+
+    # Check the quorum
+    if not 1 <= cli_options.quorum_threshold <= cli_options.quorum_size:
+        console.log(
+            errors.UNVALID_QUORUM(
+                quorum_size=cli_options.quorum_size,
+                quorum_threshold=cli_options.quorum_threshold
+            )
+        )
+        sys.exit(1)
+
+def check_output_options(cli_options: CLIOptions) -> None:
+    """
+    Checks the output options shared by the commands that save proxies to files, exiting on the first unvalid one.
+
+    Args:
+        cli_options (CLIOptions): The command's options.
+
+    Returns:
+        None: This function doesn't return anything.
+    """
+    # Check the output format
+    if cli_options.output_format not in constants.OUTPUT_FORMATS:
+        console.log(
+            errors.UNVALID_OUTPUT_FORMAT(
+                output_format=cli_options.output_format,
+                output_formats=constants.OUTPUT_FORMATS
+            )
+        )
+        sys.exit(1)
+
+    # Check output file path
+    if cli_options.output_file_path is not None and not os.path.exists("/".join(cli_options.output_file_path.split("/")[:-1])):
+        console.log(
+            errors.UNVALID_OUTPUT_FILE_PATH(
+                output_file_path=cli_options.output_file_path
+            )
+        )
+        sys.exit(1)
+
 @cli.command()
 def version():
     """ proxycrawler's version """
@@ -35,7 +113,14 @@ def scrap(
     enable_save_on_run: bool = typer.Option(True, "--enable-save-on-run", help="Save valid proxies while proxycrawler is still running (can be useful in case of a bad internet connection)"),
     group_by_protocol: bool = typer.Option(False, "--group-by-protocol", help="Save proxies into seperate files based on the supported protocols [http, https, socks4, sock5]"),
     output_file_path: str = typer.Option(None, "--output-file-path", help="Costum output file path to save results (.txt)"),
+    output_format: str = typer.Option("txt", "--format", help="Format of the output files [txt, jsonl, csv, bin]"),
+    snapshot: bool = typer.Option(False, "--snapshot", help="Publish the output as atomic snapshots: each run writes a new generation of the file, <name>.latest.txt points at the newest one and the older ones are pruned"),
     validate_proxies: bool = typer.Option(False, "--validate", help="Validate each proxy that was found (this will make the scrapper run more slower)"),
+    target_urls: List[str] = typer.Option(None, "--target", help="URL requested through the proxies to validate them, can be repeated (default: https://google.com)"),
+    concurrency: int = typer.Option(constants.DEFAULT_CONCURRENCY, "--concurrency", help="Maximum number of validation probes in flight"),
+    quorum_size: int = typer.Option(constants.QUORUM_SIZE, "--quorum-size", help="Maximum number of probes sent per protocol"),
+    quorum_threshold: int = typer.Option(constants.QUORUM_THRESHOLD, "--quorum-threshold", help="Number of successful probes needed for a protocol to be valid"),
+    deadline: str = typer.Option(None, "--deadline", help="Maximum time spent validating, like 90s, 30m or 1h. Unfinished proxies are cancelled and the validated ones are saved"),
     debug_mode: bool = typer.Option(False, "--debug-mode", help="Enable debug mode.")
 ):
     """ Start scrapping proxies """
@@ -43,31 +128,36 @@ def scrap(
         enable_save_on_run=enable_save_on_run,
         group_by_protocol=group_by_protocol,
         output_file_path=output_file_path,
+        snapshot=snapshot,
+        output_format=output_format,
         validate_proxies=validate_proxies,
+        target_urls=target_urls,
+        concurrency=concurrency,
+        quorum_size=quorum_size,
+        quorum_threshold=quorum_threshold,
         debug_mode=debug_mode
     )
 
-    # Check output file path
-    if cli_options.output_file_path is not None and not os.path.exists("/".join(cli_options.output_file_path.split("/")[:-1])):
-        console.log(
-            errors.UNVALID_OUTPUT_FILE_PATH(
-                output_file_path=cli_options.output_file_path
-            )
-        )
-        sys.exit(1)
-
-    # Init database handler
-    database_handler = DatabaseHandler()
+    check_validation_options(
+        cli_options=cli_options,
+        deadline=deadline
+    )
 
-    # Init ProxyCrawler
-    proxy_crawler = ProxyCrawler(
-        database_handler=database_handler,
-        console=console,
+    check_output_options(
         cli_options=cli_options
     )
 
-    # Fetching proxies and validating them
-    proxy_crawler.crawl_proxies()
+    # Init database handler
+    with DatabaseHandler() as database_handler:
+        # Init ProxyCrawler
+        proxy_crawler = ProxyCrawler(
+            database_handler=database_handler,
+            console=console,
+            cli_options=cli_options
+        )
+
+        # Fetching proxies and validating them
+        proxy_crawler.crawl_proxies()
 
 @cli.command()
 def export_db(
@@ -75,6 +165,19 @@ def export_db(
     validate_proxies: bool = typer.Option(False, "--validate", help="Validate proxies"),
     group_by_protocol: bool = typer.Option(False, "--group-by-protocol", help="Save proxies into seperate files based on the supported protocols [http, https, sock4, sock5]"),
     output_file_path: str = typer.Option(None, "--output-file-path", help="Costum output file path to save results (.txt)"),
+    output_format: str = typer.Option("txt", "--format", help="Format of the output files [txt, jsonl, csv, bin]"),
+    snapshot: bool = typer.Option(False, "--snapshot", help="Publish the output as atomic snapshots: each run writes a new generation of the file, <name>.latest.txt points at the newest one and the older ones are pruned"),
+    sort_by: str = typer.Option(None, "--sort-by", help="Sort the exported proxies [latency, score]"),
+    max_latency: float = typer.Option(None, "--max-latency", help="Only export proxies whose latency is at most this many milliseconds"),
+    protocol: str = typer.Option(None, "--protocol", help="Only export proxies supporting this protocol [http, https, socks4, socks5]"),
+    country: str = typer.Option(None, "--country", help="Only export proxies located in this country, like DE or US"),
+    only_valid: bool = typer.Option(False, "--only-valid", help="Only export proxies that were valid when last checked"),
+    checked_within: str = typer.Option(None, "--checked-within", help="Only export proxies checked within this duration, like 90s, 30m or 1h"),
+    target_urls: List[str] = typer.Option(None, "--target", help="URL requested through the proxies to validate them, can be repeated (default: https://google.com)"),
+    concurrency: int = typer.Option(constants.DEFAULT_CONCURRENCY, "--concurrency", help="Maximum number of validation probes in flight"),
+    quorum_size: int = typer.Option(constants.QUORUM_SIZE, "--quorum-size", help="Maximum number of probes sent per protocol"),
+    quorum_threshold: int = typer.Option(constants.QUORUM_THRESHOLD, "--quorum-threshold", help="Number of successful probes needed for a protocol to be valid"),
+    deadline: str = typer.Option(None, "--deadline", help="Maximum time spent validating, like 90s, 30m or 1h. Unfinished proxies are cancelled and the validated ones are saved"),
     debug_mode: bool = typer.Option(False, "--debug-mode", help="Enable debug mode.")
 ):
     """ Export proxies from the database """
@@ -82,34 +185,132 @@ def export_db(
         proxies_count=proxies_count,
         group_by_protocol=group_by_protocol,
         output_file_path=output_file_path,
+        snapshot=snapshot,
+        output_format=output_format,
         validate_proxies=validate_proxies,
+        target_urls=target_urls,
+        concurrency=concurrency,
+        quorum_size=quorum_size,
+        quorum_threshold=quorum_threshold,
+        sort_by=sort_by,
+        max_latency=max_latency,
+        protocol=protocol,
+        country=country,
+        only_valid=only_valid,
         debug_mode=debug_mode
     )
 
-    # Check output file path
-    if cli_options.output_file_path is not None and not os.path.exists("/".join(cli_options.output_file_path.split("/")[:-1])):
+    check_validation_options(
+        cli_options=cli_options,
+        deadline=deadline
+    )
+
+    # Check the sort key
+    if cli_options.sort_by is not None and cli_options.sort_by not in constants.SORT_KEYS:
         console.log(
-            errors.UNVALID_OUTPUT_FILE_PATH(
-                output_file_path=cli_options.output_file_path
+            errors.UNVALID_SORT_KEY(
+                sort_by=cli_options.sort_by,
+                sort_keys=constants.SORT_KEYS
             )
         )
         sys.exit(1)
 
-    # Init database handler
-    database_handler = DatabaseHandler()
+    # Check the protocol
+    if cli_options.protocol is not None and cli_options.protocol not in constants.PROTOCOLS:
+        console.log(
+            errors.UNVALID_PROXY_PROTOCOL(
+                protocol=cli_options.protocol,
+                protocols=constants.PROTOCOLS
+            )
+        )
+        sys.exit(1)
 
-    # Init proxycrawler
-    proxy_crawler = ProxyCrawler(
-        database_handler=database_handler,
-        console=console,
+    # Check the country code
+    if cli_options.country is not None and not (len(cli_options.country) == 2 and cli_options.country.isalpha()):
+        console.log(
+            errors.UNVALID_COUNTRY_CODE(
+                country_code=cli_options.country,
+                supported_country_code="ISO 3166-1 alpha-2 country codes, like DE or US"
+            )
+        )
+        sys.exit(1)
+
+    # Check the freshness
+    if checked_within is not None:
+        try:
+            cli_options.checked_within = helpers.parse_duration(checked_within)
+        except ValueError:
+            console.log(
+                errors.UNVALID_DURATION(
+                    duration=checked_within
+                )
+            )
+            sys.exit(1)
+
+    check_output_options(
         cli_options=cli_options
     )
 
-    console.log(
-        info.FETCHING_AND_VALIDATING_PROXIES_FROM_DATABASE
+    # Init database handler
+    with DatabaseHandler() as database_handler:
+        # Init proxycrawler
+        proxy_crawler = ProxyCrawler(
+            database_handler=database_handler,
+            console=console,
+            cli_options=cli_options
+        )
+
+        console.log(
+            info.FETCHING_AND_VALIDATING_PROXIES_FROM_DATABASE
+        )
+
+        proxy_crawler.export_database_proxies()
+
+@cli.command()
+def revalidate(
+    budget: int = typer.Option(constants.REVALIDATE_BUDGET, "--budget", help="Maximum number of proxies revalidated in this run, the due proxies with the best scores go first"),
+    target_urls: List[str] = typer.Option(None, "--target", help="URL requested through the proxies to validate them, can be repeated (default: https://google.com)"),
+    concurrency: int = typer.Option(constants.DEFAULT_CONCURRENCY, "--concurrency", help="Maximum number of validation probes in flight"),
+    quorum_size: int = typer.Option(constants.QUORUM_SIZE, "--quorum-size", help="Maximum number of probes sent per protocol"),
+    quorum_threshold: int = typer.Option(constants.QUORUM_THRESHOLD, "--quorum-threshold", help="Number of successful probes needed for a protocol to be valid"),
+    deadline: str = typer.Option(None, "--deadline", help="Maximum time spent validating, like 90s, 30m or 1h. Unfinished proxies are cancelled and the validated ones are saved"),
+    debug_mode: bool = typer.Option(False, "--debug-mode", help="Enable debug mode.")
+):
+    """ Revalidate the proxies of the database that weren't checked recently, flaky proxies are due sooner than stable ones """
+    cli_options = CLIOptions(
+        validate_proxies=True,
+        target_urls=target_urls,
+        concurrency=concurrency,
+        quorum_size=quorum_size,
+        quorum_threshold=quorum_threshold,
+        budget=budget,
+        debug_mode=debug_mode
+    )
+
+    check_validation_options(
+        cli_options=cli_options,
+        deadline=deadline
     )
 
-    proxy_crawler.export_database_proxies()
+    # Check the budget
+    if cli_options.budget < 1:
+        console.log(
+            errors.UNVALID_BUDGET(
+                budget=cli_options.budget
+            )
+        )
+        sys.exit(1)
+
+    # Init database handler
+    with DatabaseHandler() as database_handler:
+        # Init proxycrawler
+        proxy_crawler = ProxyCrawler(
+            database_handler=database_handler,
+            console=console,
+            cli_options=cli_options
+        )
+
+        proxy_crawler.revalidate_proxies()
 
 @cli.command()
 def validate(
@@ -118,6 +319,14 @@ def validate(
     test_all_protocols: bool = typer.Option(False, "--test-all-protocols", help="Test all the protocols on a proxy"),
     group_by_protocol: bool = typer.Option(False, "--group-by-protocol", help="Save proxies into seperate files based on the supported protocols [http, https, sock4, sock5]"),
     output_file_path: str = typer.Option(None, "--output-file-path", help="Costum output file path to save results (.txt)"),
+    output_format: str = typer.Option("txt", "--format", help="Format of the output files [txt, jsonl, csv, bin]"),
+    snapshot: bool = typer.Option(False, "--snapshot", help="Publish the output as atomic snapshots: each run writes a new generation of the file, <name>.latest.txt points at the newest one and the older ones are pruned"),
+    target_urls: List[str] = typer.Option(None, "--target", help="URL requested through the proxies to validate them, can be repeated (default: https://google.com)"),
+    concurrency: int = typer.Option(constants.DEFAULT_CONCURRENCY, "--concurrency", help="Maximum number of validation probes in flight"),
+    quorum_size: int = typer.Option(constants.QUORUM_SIZE, "--quorum-size", help="Maximum number of probes sent per protocol"),
+    quorum_threshold: int = typer.Option(constants.QUORUM_THRESHOLD, "--quorum-threshold", help="Number of successful probes needed for a protocol to be valid"),
+    deadline: str = typer.Option(None, "--deadline", help="Maximum time spent validating, like 90s, 30m or 1h. Unfinished proxies are cancelled and the validated ones are saved"),
+    low_memory: bool = typer.Option(False, "--low-memory", help="Deduplicate the proxies of the file on disk instead of in memory, for lists larger than the RAM"),
     debug_mode: bool = typer.Option(False, "--debug-mode", help="Enable debug mode.")
 ):
     """ Validate a proxies list file """
@@ -126,29 +335,26 @@ def validate(
         protocol=protocol,
         group_by_protocol=group_by_protocol,
         output_file_path=output_file_path,
+        snapshot=snapshot,
+        output_format=output_format,
         test_all_protocols=test_all_protocols,
+        target_urls=target_urls,
+        concurrency=concurrency,
+        quorum_size=quorum_size,
+        quorum_threshold=quorum_threshold,
+        low_memory=low_memory,
         debug_mode=debug_mode
     )
 
-    # Init database handler
-    database_handler = DatabaseHandler()
+    check_validation_options(
+        cli_options=cli_options,
+        deadline=deadline
+    )
 
-    # Init proxycrawler
-    proxy_crawler = ProxyCrawler(
-        database_handler=database_handler,
-        console=console,
+    check_output_options(
         cli_options=cli_options
     )
 
-    # Check output file path
-    if cli_options.output_file_path is not None and not os.path.exists("/".join(cli_options.output_file_path.split("/")[:-1])):
-        console.log(
-            errors.UNVALID_OUTPUT_FILE_PATH(
-                output_file_path=cli_options.output_file_path
-            )
-        )
-        sys.exit(1)
-
     # Check if the proxies file exists
     if not os.path.exists(cli_options.proxy_file_path):
         console.log(errors.PROXY_FILE_DOESNT_EXIST)
@@ -159,36 +365,120 @@ def validate(
         console.log(errors.FILE_EXTENSION_NOT_SUPPORTED)
         sys.exit(1)
 
-    # Check the format of the proxies
-    proxies = [proxy.strip() for proxy in open(cli_options.proxy_file_path, "r").readlines()]
-    results = []
-
-    for proxy in proxies:
-        if not proxy_crawler.check_proxy_fromat(proxy=proxy):
-            results.append(proxy)
-
-    if len(results) != 0:
-        console.log(errors.UNVALID_PROXY_FORMAT)
-        sys.exit(1)
-
     # Check the protocol
-    if cli_options.protocol is not None and cli_options.protocol not in cli_options.protocols:
+    if cli_options.protocol is not None and cli_options.protocol not in constants.PROTOCOLS:
         console.log(
             errors.UNVALID_PROXY_PROTOCOL(
-                protocol=protocol
+                protocol=cli_options.protocol,
+                protocols=constants.PROTOCOLS
             )
         )
         sys.exit(1)
 
-    # Validate the list of proxies
+    # The proxies are read, checked and deduplicated as they are validated,
+    # the bad lines are reported and skipped
+    if cli_options.test_all_protocols:
+        protocols = constants.PROTOCOLS
+    elif cli_options.protocol is not None:
+        protocols = [cli_options.protocol]
+    else:
+        protocols = None
+
+    proxy_file = ProxyFile(
+        proxy_file_path=cli_options.proxy_file_path,
+        protocols=protocols,
+        on_disk=cli_options.low_memory,
+        console=console
+    )
+
+    # Init database handler
+    with DatabaseHandler() as database_handler:
+        # Init proxycrawler
+        proxy_crawler = ProxyCrawler(
+            database_handler=database_handler,
+            console=console,
+            cli_options=cli_options
+        )
+
+        # Validate the list of proxies
+        console.log(
+            info.VALIDATING_PROXIES_FROM_FILE(
+                proxy_file_path=cli_options.proxy_file_path
+            )
+        )
+
+        proxy_crawler.validate_proxies(proxy_file=proxy_file)
+
+@cli.command()
+def judge(
+    host: str = typer.Option(constants.JUDGE_HOST, "--host", help="Address the judge listens on"),
+    port: int = typer.Option(constants.JUDGE_PORT, "--port", help="Port the judge listens on"),
+    delay: float = typer.Option(0, "--delay", help="Milliseconds to wait before answering, to simulate a remote target")
+):
+    """ Run a local judge to validate proxies against (use it with --target) """
+    judge_server = JudgeServer(
+        host=host,
+        port=port,
+        delay=delay
+    )
+
     console.log(
-        info.VALIDATING_PROXIES_FROM_FILE(
-            proxies_count=len(proxies),
-            proxy_file_path=cli_options.proxy_file_path
+        info.JUDGE_LISTENING(
+            url=judge_server.url
         )
     )
 
-    proxy_crawler.validate_proxies(proxies=proxies)
+    try:
+        judge_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        judge_server.server_close()
+
+@db_cli.command("compact")
+def db_compact(
+    dead_for: str = typer.Option("30d", "--dead-for", help="Remove the proxies that weren't found valid for this duration, like 12h, 30d or 8w"),
+    checks_for: str = typer.Option("30d", "--checks-for", help="Keep the check history for this duration, like 12h, 30d or 8w"),
+    archive: bool = typer.Option(False, "--archive", help="Archive the removed proxies and their check history instead of deleting them"),
+    archive_path: str = typer.Option(constants.ARCHIVE_DATABASE_PATH, "--archive-path", help="Path of the SQLite database the proxies are archived to"),
+    force_vacuum: bool = typer.Option(False, "--force-vacuum", help="Vacuum the database even if little space would be reclaimed")
+):
+    """ Remove dead proxies and old checks, then optimize the database (runs weekly at the end of `scrap` too) """
+    durations = dict()
+
+    # Check the durations
+    for option, duration in [("dead_for", dead_for), ("checks_for", checks_for)]:
+        try:
+            durations[option] = helpers.parse_duration(duration)
+        except ValueError:
+            console.log(
+                errors.UNVALID_DURATION(
+                    duration=duration
+                )
+            )
+            sys.exit(1)
+
+    # Check the archive path
+    if archive and not os.path.exists(os.path.dirname(os.path.abspath(archive_path))):
+        console.log(
+            errors.UNVALID_OUTPUT_FILE_PATH(
+                output_file_path=archive_path
+            )
+        )
+        sys.exit(1)
+
+    # Init database handler
+    with DatabaseHandler() as database_handler:
+        compaction = database_handler.compact(
+            dead_for=durations["dead_for"],
+            checks_for=durations["checks_for"],
+            archive_path=archive_path if archive else None,
+            force_vacuum=force_vacuum
+        )
+
+        console.log(
+            info.DATABASE_COMPACTED(**compaction)
+        )
 
 @cli.command()
 def update():
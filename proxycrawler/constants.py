@@ -23,3 +23,82 @@ HOME = os.path.expanduser("~")
 
 # Database URL
 DATABASE_URL = f"sqlite+pysqlite:///{HOME}/.proxycrawler/database.db"
+
+# Database tuning
+DATABASE_BATCH_SIZE     =   500         # Most proxies committed at once by the database writer
+DATABASE_FLUSH_INTERVAL =   2           # Most seconds a proxy waits in the database writer's queue before being committed
+DATABASE_QUEUE_SIZE     =   5000        # Proxies waiting in the database writer's queue before the producers wait
+DATABASE_CHUNK_SIZE     =   1000        # Rows loaded at a time when streaming proxies out of the database
+DATABASE_CACHE_SIZE     =   65536       # KiB of page cache per connection
+DATABASE_BUSY_TIMEOUT   =   5000        # Milliseconds a connection waits for a lock held by another process
+
+# Supported proxy protocols
+PROTOCOLS = ["http", "https", "socks4", "socks5"]
+
+# The bit of each protocol in the `protocol_mask` column of the proxies table
+PROTOCOL_BITS = {protocol: 1 << index for index, protocol in enumerate(PROTOCOLS)}
+
+# Validation
+VALIDATION_TARGETS    =   ["https://google.com"]
+DEFAULT_CONCURRENCY   =   200     # Maximum number of probes in flight
+QUORUM_SIZE           =   3       # Maximum number of probes sent per protocol
+QUORUM_THRESHOLD      =   2       # Successful probes needed for a protocol to be valid
+PROBE_BACKOFF_BASE    =   0.5     # Seconds to wait after a failed probe, doubled on each consecutive failure
+PROBE_BACKOFF_MAX     =   8       # Upper bound of the backoff in seconds
+PROBE_BACKOFF_JITTER  =   0.5     # Fraction of the backoff that is randomized
+POLITENESS_RATE       =   4       # Probes per second allowed on a single proxy
+POLITENESS_BURST      =   4       # Probes that can be sent to a single proxy without waiting
+TARGET_RATE_LIMIT     =   100     # Probes per second allowed on a single target host, through every proxy
+TARGET_BURST          =   100     # Probes that can be sent to a single target host without waiting
+CONNECT_TIMEOUT       =   5       # Seconds to connect to a proxy and open the tunnel
+TLS_TIMEOUT           =   5       # Seconds to complete the TLS handshake through the tunnel
+FIRST_BYTE_TIMEOUT    =   10      # Seconds to receive the first line of the response
+PROXY_DEADLINE        =   60      # Seconds a single proxy can take to be validated
+SNIFF_TIMEOUT         =   3       # Seconds to wait for each step of the protocol sniffing
+
+# Local judge
+JUDGE_HOST = "127.0.0.1"
+JUDGE_PORT = 8899
+
+# Scrapers
+SCRAPER_TIMEOUT         =   (5, 30)     # (connect, read) timeouts in seconds of the requests sent to the services
+HTTP_POOL_CONNECTIONS   =   10          # Number of hosts the shared HTTP client keeps connections to
+HTTP_POOL_MAXSIZE       =   10          # Number of connections kept alive per host
+HTTP_MAX_RETRIES        =   2           # Retries of a failed request to a service
+GEONODE_MAX_PAGES       =   20          # Upper bound on the pages requested from Geonode, whatever total it reports
+GEONODE_CONCURRENCY     =   4           # Geonode pages fetched at once, kept under HTTP_POOL_MAXSIZE
+GEONODE_RATE_LIMIT      =   2           # Requests per second sent to Geonode
+
+# Crawling pipeline
+PIPELINE_QUEUE_SIZE     =   1000        # Proxies buffered between two stages before the upstream stage waits
+PIPELINE_BATCH_SIZE     =   100         # Most proxies handed to the sinks at once
+
+# Health score
+HEALTH_ALPHA            =   0.3         # Weight of the latest check in the exponentially weighted averages of a proxy
+HEALTH_LATENCY_SCALE    =   1000        # Milliseconds of latency that halve a proxy's score, also the latency assumed until one is measured
+
+# Retention
+ARCHIVE_DATABASE_PATH   =   f"{HOME}/.proxycrawler/archive.db"
+RETENTION_DEAD_FOR      =   30 * 24 * 3600  # Seconds a proxy has to be dead for before `db compact` removes it
+RETENTION_CHECKS_FOR    =   30 * 24 * 3600  # Seconds the check history is kept for
+COMPACT_INTERVAL        =   7 * 24 * 3600   # Seconds between two compactions run automatically at the end of a crawl
+VACUUM_FREE_RATIO       =   0.2             # Share of free pages from which compacting also runs VACUUM
+
+# Proxy list files
+PROXY_FILE_CHUNK_SIZE       =   1 << 20     # Bytes of lines read at a time from a proxy list file
+PROXY_FILE_REPORTED_LINES   =   100         # Bad lines of a proxy list file reported before they are only counted
+SEEN_SET_CACHE_SIZE         =   65536       # KiB of page cache used to deduplicate the proxies of a file on disk
+
+# Output
+OUTPUT_FORMATS = ["txt", "jsonl", "csv", "bin"]
+
+# Output snapshots
+SNAPSHOT_GENERATIONS    =   5           # Generations of an output file kept in snapshot mode
+
+# Revalidation
+REVALIDATE_MIN_TTL      =   15 * 60     # Seconds between two checks of the flakiest proxies, the ones succeeding half of the time
+REVALIDATE_MAX_TTL      =   24 * 3600   # Seconds between two checks of the most stable proxies, always or never succeeding
+REVALIDATE_BUDGET       =   500         # Most proxies revalidated by a `revalidate` run
+
+# Keys `export-db` can sort the proxies by
+SORT_KEYS = ["latency", "score"]
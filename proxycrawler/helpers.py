@@ -1,10 +1,10 @@
 import uuid
-import string
-import random
 import hashlib
 import datetime
 import subprocess
 
+from urllib.parse import urlsplit
+
 from rich import print
 
 from proxycrawler import constants
@@ -35,7 +35,7 @@ def date() -> datetime:
 
 def generate_uid(data: str) -> str:
     """
-    Generates a UID based on the given data.
+    Generates a UID based on the given data. The same data always gives the same UID.
 
     Args:
         data (str): Data to use to create a UID based off it.
@@ -43,13 +43,199 @@ def generate_uid(data: str) -> str:
     Returns:
         str: Returns the generated UID
     """
-    data = f"{data}{''.join([char for char in random.choices(string.ascii_letters)])}"
-
-    hashed_data_salt = hashlib.md5(data.encode()).hexdigest()
-    generated_uuid = uuid.uuid5(uuid.NAMESPACE_DNS, hashed_data_salt)
+    hashed_data = hashlib.md5(data.encode()).hexdigest()
+    generated_uuid = uuid.uuid5(uuid.NAMESPACE_DNS, hashed_data)
 
     return str(generated_uuid)
 
+def generate_proxy_uid(ip: str, port: int) -> str:
+    """
+    Generates the UID of a proxy, the key of its row in the 'proxies' table.
+
+    Args:
+        ip (str): The IP address of the proxy.
+        port (int): The port number of the proxy.
+
+    Returns:
+        str: Returns the generated UID
+    """
+    return generate_uid(
+        data=f"{ip}:{int(port)}"
+    )
+
+def protocols_to_mask(protocols: list[str]) -> int:
+    """
+    Packs a list of protocols into a bitmask, unknown protocols are ignored.
+
+    Args:
+        protocols (list[str]): The protocols to pack.
+
+    Returns:
+        int: The bitmask of the protocols, see `constants.PROTOCOL_BITS`.
+    """
+    mask = 0
+
+    for protocol in protocols:
+        mask |= constants.PROTOCOL_BITS.get(protocol, 0)
+
+    return mask
+
+def pack_endpoint(ip: str, port: int) -> int:
+    """
+    Packs a dotted IPv4 address and a port into a single 48 bits integer, the address in the high bits.
+
+    Args:
+        ip (str): The IPv4 address.
+        port (int): The port.
+
+    Returns:
+        int: The packed endpoint.
+    """
+    # The octets are read as decimal numbers, unlike `socket.inet_aton` which reads 010 as octal
+    address = 0
+
+    for octet in ip.split("."):
+        address = address << 8 | int(octet)
+
+    return address << 16 | port
+
+def assume_all_protocols(proxy) -> None:
+    """
+    Sets the protocols of a proxy that wasn't validated, since we don't know what protocols it supports we will just set it to all.
+
+    Args:
+        proxy: A proxy model, with its `ip` and `port` set.
+
+    Returns:
+        None: This function doesn't return anything.
+    """
+    proxy.proxy = {
+        "http": f"http://{proxy.ip}:{proxy.port}",
+        "socks4": f"socks4://{proxy.ip}:{proxy.port}",
+        "socks5": f"socks5://{proxy.ip}:{proxy.port}",
+    }
+    proxy.protocols = ["http", "socks4", "socks5"]
+
+def mask_to_protocols(mask: int) -> list[str]:
+    """
+    Unpacks a bitmask built by `protocols_to_mask` into a list of protocols.
+
+    Args:
+        mask (int): The bitmask to unpack.
+
+    Returns:
+        list[str]: The protocols, in the order of `constants.PROTOCOLS`.
+    """
+    return [protocol for protocol in constants.PROTOCOLS if mask & constants.PROTOCOL_BITS[protocol]]
+
+def ewma(average: float, sample: float, alpha: float = constants.HEALTH_ALPHA) -> float:
+    """
+    Folds a sample into an exponentially weighted moving average.
+    Only arithmetic operators are used, so the arguments can be SQL expressions as well as numbers.
+
+    Args:
+        average (float): The current average.
+        sample (float): The new sample.
+        alpha (float, optional, default: constants.HEALTH_ALPHA): The weight of the new sample.
+
+    Returns:
+        float: The updated average.
+    """
+    return average * (1 - alpha) + sample * alpha
+
+def health_score(success_rate: float, latency: float) -> float:
+    """
+    Scores a proxy from its success rate and latency, higher is better.
+    A latency of `constants.HEALTH_LATENCY_SCALE` milliseconds halves the success rate.
+    Only arithmetic operators are used, so the arguments can be SQL expressions as well as numbers.
+
+    Args:
+        success_rate (float): The share of the proxy's checks that succeeded, between 0 and 1.
+        latency (float): The proxy's latency in milliseconds.
+
+    Returns:
+        float: The score, between 0 and 1.
+    """
+    return success_rate * constants.HEALTH_LATENCY_SCALE / (constants.HEALTH_LATENCY_SCALE + latency)
+
+def revalidation_ttl(success_rate: float) -> float:
+    """
+    Returns how long a proxy's last check stays fresh. Flaky proxies are checked more often than stable ones,
+    the TTL going from `constants.REVALIDATE_MAX_TTL` for a success rate of 0 or 1 down to `constants.REVALIDATE_MIN_TTL` for 0.5.
+    Only arithmetic operators are used, so the argument can be a SQL expression as well as a number.
+
+    Args:
+        success_rate (float): The share of the proxy's checks that succeeded, between 0 and 1.
+
+    Returns:
+        float: The TTL in seconds.
+    """
+    flakiness = 4 * success_rate * (1 - success_rate)
+
+    return constants.REVALIDATE_MAX_TTL - (constants.REVALIDATE_MAX_TTL - constants.REVALIDATE_MIN_TTL) * flakiness
+
+def parse_duration(duration: str) -> float:
+    """
+    Parses a duration like `90`, `90s`, `30m`, `1h`, `7d` or `2w` into seconds.
+
+    Args:
+        duration (str): The duration to parse.
+
+    Returns:
+        float: The duration in seconds.
+
+    Raises:
+        ValueError: If the duration isn't valid.
+    """
+    units = {
+        "s": 1,
+        "m": 60,
+        "h": 60 * 60,
+        "d": 24 * 60 * 60,
+        "w": 7 * 24 * 60 * 60
+    }
+    duration = duration.strip().lower()
+    unit = duration[-1:] if duration[-1:] in units else "s"
+    value = float(duration[:-1] if duration[-1:] in units else duration)
+
+    if value < 0:
+        raise ValueError(f"Negative duration: {duration!r}")
+
+    return value * units[unit]
+
+def is_valid_target_url(url: str) -> bool:
+    """
+    Checks if a URL can be used as a validation target.
+
+    Args:
+        url (str): The URL to check.
+
+    Returns:
+        bool: True if the URL is an http or https URL with a host, otherwise False is returned.
+    """
+    try:
+        target = urlsplit(url)
+        target.port # Raises on an unvalid port
+    except ValueError:
+        return False
+
+    return target.scheme in ["http", "https"] and bool(target.hostname)
+
+def is_valid_port(port) -> bool:
+    """
+    Checks if the port of a scraped proxy can be connected to.
+
+    Args:
+        port: The port to check, an int or the string it was scraped as.
+
+    Returns:
+        bool: True if the port is a number between 1 and 65535, otherwise False is returned.
+    """
+    try:
+        return 0 < int(port) < 65536
+    except (TypeError, ValueError):
+        return False
+
 def check_for_update() -> (bool, str | None):
     """
     Check for any new updates.
@@ -5,3 +5,6 @@
 
 def EXCEPTION_RAISED_WHEN_VALIDATING_PROXY(proxy, error) -> str:
     return f"[bold blue][DEBUG][reset] Exception raised when validating proxy:[bold green]{proxy}[reset]. Error: {error}"
+
+def QUORUM_VERDICT(proxy, verdict) -> str:
+    return f"[bold blue][DEBUG][reset] Quorum verdict for proxy:[bold green]{proxy}[reset]: valid={verdict.is_valid}, probes used={verdict.probes_used}, probes skipped={verdict.probes_skipped}, time saved={verdict.time_saved:.2f}s"
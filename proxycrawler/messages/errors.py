@@ -22,7 +22,8 @@ def FAILD_TO_REQUEST_FREE_PROXY_LIST(error) -> str:
 def UNVALID_COUNTRY_CODE(country_code, supported_country_code) -> str:
     return f"[bold red][ ! ] [reset]Unvalid country code [bold red]'{country_code}'[reset]. Supported country code: \n{supported_country_code}"
 
-UNVALID_PROXY_FORMAT = "[bold red][ERROR][reset] Unvalid proxies format. Format should be [bold green]<protocol>://ip:port[reset]. Please fix it and try again"
+def UNVALID_PROXY_LINE(proxy_file_path, line_number, line) -> str:
+    return f"[bold red][ERROR][reset] Skipping line [bold red]{line_number}[reset] of [bold green]'{proxy_file_path}'[reset]: [bold red]'{line}'[reset]. Format should be [bold green]<protocol>://ip:port[reset]"
 
 def UNVALID_PROXY_PROTOCOL(protocol, protocols) -> str:
     return f"[bold red][ERROR][reset] Unvalid proxy protocol [bold red]'{protocol}'. the supported protocols are [bold green]{protocols}[reset] (you may keep --protocol null to test it on all protocols)"
@@ -31,3 +32,24 @@ def NO_PROXIES_WHERE_GATHERED(proxies) -> str:
     return f"[bold red][ERROR][reset] No proxies where gathered. proxies:[bold red]{proxies}[reset]"
 
 NO_PROXIES_WHERE_FOUND_IN_THE_DATABASE = "[bold red][ERROR][reset] No proxies where found in the database"
+
+def UNVALID_QUORUM(quorum_size, quorum_threshold) -> str:
+    return f"[bold red][ERROR][reset] Unvalid quorum [bold red]'{quorum_threshold}/{quorum_size}'[reset]. The threshold must be between 1 and the quorum size"
+
+def UNVALID_DURATION(duration) -> str:
+    return f"[bold red][ERROR][reset] Unvalid duration [bold red]'{duration}'[reset]. Use a number of seconds optionally followed by a unit, like [bold green]90[reset], [bold green]30m[reset] or [bold green]1h[reset]"
+
+def UNVALID_SORT_KEY(sort_by, sort_keys) -> str:
+    return f"[bold red][ERROR][reset] Unvalid sort key [bold red]'{sort_by}'[reset]. The supported sort keys are [bold green]{sort_keys}[reset]"
+
+def UNVALID_TARGET_URL(target_url) -> str:
+    return f"[bold red][ERROR][reset] Unvalid validation target [bold red]'{target_url}'[reset]. It should be an http or https URL, like [bold green]https://google.com[reset]"
+
+def SOURCE_FAILED(source_name, error) -> str:
+    return f"[bold red][ERROR][reset] The service [bold green]'{source_name}'[reset] stopped because of an error. Error: {error}"
+
+def UNVALID_BUDGET(budget) -> str:
+    return f"[bold red][ERROR][reset] Unvalid budget [bold red]'{budget}'[reset]. At least one proxy has to be revalidated per run"
+
+def UNVALID_OUTPUT_FORMAT(output_format, output_formats) -> str:
+    return f"[bold red][ERROR][reset] Unvalid output format [bold red]'{output_format}'[reset]. Supported formats: {', '.join(output_formats)}"
@@ -31,5 +31,39 @@ def FETCHED_PROXIES_FROM_THE_DATABASE_VALIDATING(count) -> str:
 def FETCHED_PROXIES_FROM_THE_DATABASE_WITHOUT_VALIDATING(count) -> str:
     return f"[bold green][INFO][reset] Fetched [bold green]'{count}'[reset] proxies from the database"
 
-def VALIDATING_PROXIES_FROM_FILE(proxies_count, proxy_file_path) -> str:
-    return f"[bold green][INFO][reset] Found [bold green]'{proxies_count}'[reset] proxies from [bold green]'{proxy_file_path}'[reset]. Validating them..."
+def VALIDATING_PROXIES_FROM_FILE(proxy_file_path) -> str:
+    return f"[bold green][INFO][reset] Validating the proxies of [bold green]'{proxy_file_path}'[reset] as they are read..."
+
+BAD_LINES_NOT_REPORTED = "[bold green][INFO][reset] The next bad lines of the file are skipped without being reported"
+
+def PROXY_FILE_SUMMARY(lines, proxies, bad_lines, duplicates) -> str:
+    return f"[bold green][INFO][reset] Read [bold green]'{lines}'[reset] lines: [bold green]'{proxies}'[reset] proxies, [bold red]'{bad_lines}'[reset] bad lines and [bold green]'{duplicates}'[reset] duplicates skipped"
+
+def VALIDATION_SUMMARY(probes_sent, probes_skipped, time_saved) -> str:
+    return f"[bold green][INFO][reset] Sent [bold green]'{probes_sent}'[reset] probes, [bold green]'{probes_skipped}'[reset] were skipped by early quorum verdicts (about [bold green]{time_saved:.1f}s[reset] of probing saved)"
+
+def RUN_DEADLINE_REACHED(cancelled) -> str:
+    return f"[bold green][INFO][reset] Run deadline reached, [bold yellow]'{cancelled}'[reset] unfinished proxies were cancelled. Saving the proxies validated so far"
+
+def JUDGE_LISTENING(url) -> str:
+    return f"[bold green][INFO][reset] Local judge listening at [bold green]'{url}'[reset], validate against it with [bold green]--target {url}[reset]"
+
+def PIPELINE_SUMMARY(found, valid) -> str:
+    return f"[bold green][INFO][reset] Crawled [bold green]'{found}'[reset] proxies, [bold green]'{valid}'[reset] of them are valid"
+
+NO_PROXIES_DUE = "[bold green][INFO][reset] Every proxy of the database was checked recently, none is due to be revalidated"
+
+def REVALIDATING_PROXIES(count, due) -> str:
+    return f"[bold green][INFO][reset] [bold green]'{due}'[reset] proxies are due to be revalidated. Revalidating [bold green]'{count}'[reset] of them..."
+
+def REVALIDATION_SUMMARY(checked, valid, left) -> str:
+    return f"[bold green][INFO][reset] Revalidated [bold green]'{checked}'[reset] proxies, [bold green]'{valid}'[reset] of them are valid. [bold yellow]'{left}'[reset] due proxies are left for the next run"
+
+def DATABASE_COMPACTED(removed_proxies, removed_dead_checks, removed_checks, archive_path, vacuumed) -> str:
+    dead_proxies = f"archived [bold green]'{removed_proxies}'[reset] dead proxies and their [bold green]'{removed_dead_checks}'[reset] checks to [bold green]'{archive_path}'[reset]" if archive_path is not None else f"deleted [bold green]'{removed_proxies}'[reset] dead proxies and their [bold green]'{removed_dead_checks}'[reset] checks"
+    vacuum = " The database was vacuumed" if vacuumed else ""
+
+    return f"[bold green][INFO][reset] Compacted the database: {dead_proxies}, and deleted [bold green]'{removed_checks}'[reset] checks past their retention.{vacuum}"
+
+def SNAPSHOT_PUBLISHED(generation_path, latest_path) -> str:
+    return f"[bold green][INFO][reset] Published the snapshot [bold green]'{generation_path}'[reset], [bold green]'{latest_path}'[reset] points at it"
@@ -1,20 +1,64 @@
 import os
+import ast
+import json
+import operator
+import functools
+import datetime
+import threading
 
-from typing import List
+from typing import (
+    List,
+    Iterator
+)
 
 from sqlalchemy import (
     create_engine,
+    event,
+    inspect,
     select,
-    update
+    update,
+    delete,
+    func,
+    case,
+    or_,
+    text,
+    bindparam,
+    Table,
+    MetaData
 )
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.dialects.sqlite import insert
+
+from proxycrawler import (
+    helpers,
+    constants
+)
+from proxycrawler.src.database.tables import (
+    Base,
+    Proxies,
+    ProxyChecks,
+    Maintenance
+)
+from proxycrawler.src.database.database_writer import DatabaseWriter
 
-from proxycrawler import constants
-from proxycrawler.src.database.tables import Base, Proxies
+# The columns set by validating a proxy, a save that wasn't validated keeps the saved ones
+_VALIDATION_COLUMNS = ["is_valid", "protocol_mask", "latencies", "connect_time", "first_byte_time", "total_time"]
 
 class DatabaseHandler (object):
-    """ proxycrawler's database handler """
-    def __init__(self) -> None:
+    """
+    proxycrawler's database handler
+
+    Proxies are written in batches: `save_proxies` upserts a batch in a single transaction, while `add_proxy`
+    queues the proxies for a `DatabaseWriter`, which commits them in groups from its own thread. `flush`
+    waits for the queued proxies to be written.
+
+    The database runs in WAL mode, so readers (like a second `export-db`) don't block the writer and the
+    writer doesn't block them. Use the handler as a context manager, or call `close` once done with it.
+
+    Attributes:
+        writer (DatabaseWriter): Writes the proxies queued by `add_proxy`.
+    """
+    def __init__(self, batch_size: int = constants.DATABASE_BATCH_SIZE, flush_interval: float = constants.DATABASE_FLUSH_INTERVAL) -> None:
         """ Initializes the DatabaseHandler. """
         self.database_url = constants.DATABASE_URL
 
@@ -28,12 +72,47 @@ class DatabaseHandler (object):
         # Create tables in case they don't exist
         self.create_tables()
 
+        # Bring tables created by older versions up to date
+        self.migrate_tables()
+
+        # The session used for every write
+        self.session = sessionmaker(bind=self.engine)()
+        self._lock = threading.RLock()
+
+        self.writer = DatabaseWriter(
+            save_proxies=self.save_proxies,
+            batch_size=batch_size,
+            flush_interval=flush_interval
+        )
+
+    def __enter__(self) -> "DatabaseHandler":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
     def create_engine(self) -> create_engine:
         """ Creates and returns a SQLAlchemy engine object. """
-        return create_engine(
+        engine = create_engine(
             url=self.database_url,
         )
 
+        event.listen(engine, "connect", self._set_pragmas)
+
+        return engine
+
+    def _set_pragmas(self, dbapi_connection, connection_record) -> None:
+        """ Tunes every new SQLite connection """
+        cursor = dbapi_connection.cursor()
+
+        # Readers don't block the writer and the writer doesn't block them
+        cursor.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode the database can't be corrupted by a crash without fsyncing on every commit
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA cache_size=-{int(constants.DATABASE_CACHE_SIZE)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(constants.DATABASE_BUSY_TIMEOUT)}")
+        cursor.close()
+
     def create_tables(self) -> None:
         """ Creates all the necessary database tables. """
         session = sessionmaker(bind=self.engine)
@@ -42,6 +121,155 @@ class DatabaseHandler (object):
             Base.metadata.create_all(bind=self.engine) # Create all the tables
             session.commit()
 
+    def migrate_tables(self) -> None:
+        """ Adds the columns and indexes that are missing from tables created by older versions of proxycrawler. """
+        inspector = inspect(self.engine)
+
+        with self.engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                self._add_missing_columns(connection=connection, inspector=inspector, table=table)
+
+                if table.name == Proxies.__tablename__:
+                    self._migrate_proxies_data(connection=connection)
+
+                for index in table.indexes:
+                    index.create(bind=connection, checkfirst=True)
+
+    def _add_missing_columns(self, connection, inspector, table: Table) -> None:
+        """ Adds the columns of `table` that are missing from its copy in the database """
+        existing_columns = [column["name"] for column in inspector.get_columns(table.name)]
+
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+
+            connection.execute(
+                text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=self.engine.dialect)}")
+            )
+
+    def _migrate_proxies_data(self, connection) -> None:
+        """ Runs the one-off data migrations of the 'proxies' table that the database didn't go through yet, in order """
+        migrations = [
+            self._merge_duplicate_proxies,  # 1
+            self._fill_protocol_masks,      # 2
+            self._fill_last_valid_at        # 3
+        ]
+        version = self._database_version(connection=connection)
+
+        # The table as it is on disk, with the columns of older versions
+        proxies = Table(Proxies.__tablename__, MetaData(), autoload_with=connection)
+
+        for migration_version, migration in enumerate(migrations, start=1):
+            if version >= migration_version:
+                continue
+
+            migration(connection=connection, proxies=proxies)
+            self._set_database_version(connection=connection, version=migration_version)
+
+    def _database_version(self, connection) -> int:
+        """ Returns the version of the data migrations applied to the database """
+        return connection.execute(text("PRAGMA user_version")).scalar()
+
+    def _set_database_version(self, connection, version: int) -> None:
+        """ Records that the data migrations up to `version` were applied to the database """
+        connection.execute(text(f"PRAGMA user_version = {int(version)}"))
+
+    def _merge_duplicate_proxies(self, connection, proxies: Table) -> None:
+        """
+        Merges the rows saved more than once for the same (ip, port) by older versions of proxycrawler into one, so the unique index can be created,
+        and keys every row by its stable `proxy_id`.
+
+        The merged row supports the union of the protocols of the duplicates, is valid if any of them was and keeps the earliest `added_at`.
+        The rest of the columns are taken from the most recently saved duplicate.
+        """
+        duplicates = connection.execute(
+            select(proxies.c.ip, proxies.c.port).group_by(proxies.c.ip, proxies.c.port).having(func.count() > 1)
+        ).fetchall()
+
+        for ip, port in duplicates:
+            rows = connection.execute(
+                select(proxies).where(proxies.c.ip == ip, proxies.c.port == port).order_by(text("rowid"))
+            ).mappings().fetchall()
+
+            merged = dict(rows[-1])
+
+            # The protocols were saved as a list and as URLs by protocol before being saved as a bitmask
+            if "protocols" in proxies.c and "proxy" in proxies.c:
+                merged_protocols = []
+                merged_proxy = dict()
+
+                for row in rows:
+                    for protocol in _load_protocols(row["protocols"]):
+                        if protocol not in merged_protocols:
+                            merged_protocols.append(protocol)
+
+                    merged_proxy.update(_load_proxy(row["proxy"]))
+
+                merged["protocols"] = str(merged_protocols)
+                merged["proxy"] = json.dumps(merged_proxy)
+
+            # Rows without a bitmask yet are left for `_fill_protocol_masks`
+            protocol_masks = [row["protocol_mask"] for row in rows if row.get("protocol_mask") is not None]
+
+            if len(protocol_masks) > 0:
+                merged["protocol_mask"] = functools.reduce(operator.or_, protocol_masks)
+
+            merged["is_valid"] = any(row["is_valid"] for row in rows)
+            merged["added_at"] = min([row["added_at"] for row in rows if row["added_at"] is not None], default=None)
+
+            connection.execute(
+                delete(proxies).where(proxies.c.ip == ip, proxies.c.port == port)
+            )
+            connection.execute(
+                insert(proxies).values(**merged)
+            )
+
+        for proxy_id, ip, port in connection.execute(select(proxies.c.proxy_id, proxies.c.ip, proxies.c.port)).fetchall():
+            stable_proxy_id = helpers.generate_proxy_uid(ip=ip, port=port)
+
+            if proxy_id == stable_proxy_id:
+                continue
+
+            connection.execute(
+                update(proxies).where(proxies.c.ip == ip, proxies.c.port == port).values(proxy_id=stable_proxy_id)
+            )
+
+    def _fill_protocol_masks(self, connection, proxies: Table) -> None:
+        """ Fills the `protocol_mask` of the rows saved by older versions of proxycrawler from their protocols and URLs """
+        if "protocols" not in proxies.c or "proxy" not in proxies.c:
+            return
+
+        rows = connection.execute(
+            select(proxies.c.proxy_id, proxies.c.protocols, proxies.c.proxy).where(proxies.c.protocol_mask.is_(None))
+        ).fetchall()
+
+        if len(rows) == 0:
+            return
+
+        connection.execute(
+            update(proxies).where(proxies.c.proxy_id == bindparam("row_proxy_id")).values(protocol_mask=bindparam("row_protocol_mask")),
+            [
+                {
+                    "row_proxy_id": proxy_id,
+                    "row_protocol_mask": helpers.protocols_to_mask(
+                        [*_load_protocols(protocols), *_load_proxy(proxy)]
+                    )
+                } for proxy_id, protocols, proxy in rows
+            ]
+        )
+
+    def _fill_last_valid_at(self, connection, proxies: Table) -> None:
+        """
+        Assumes the proxies that were valid when last checked by older versions of proxycrawler were last found valid then.
+        Older versions didn't record when a proxy was checked, but only saved it after validating it, so it's assumed to be when the proxy was added.
+        """
+        connection.execute(
+            update(proxies).where(
+                proxies.c.is_valid == True,
+                proxies.c.last_valid_at.is_(None)
+            ).values(last_valid_at=func.coalesce(proxies.c.last_checked_at, proxies.c.added_at))
+        )
+
     def save_proxy(self, proxy: Proxies) -> None:
         """
         Saves a proxy into the 'proxies' table.
@@ -52,80 +280,482 @@ class DatabaseHandler (object):
         Returns:
             None: This method doesn't return anything.
         """
-        session = sessionmaker(bind=self.engine)
+        self.save_proxies(proxies=[proxy])
 
-        with session() as session:
-            # Check if the proxy already exists in the database
-            if len(session.execute(select(Proxies).where(Proxies.ip == proxy.ip and Proxies.port == proxy.port)).fetchall()) > 0:
-                # Check if the protocols are the same
-                if len(session.execute(select(Proxies).where(Proxies.proxy == proxy.proxy and Proxies.protocols == proxy.protocols)).fetchall()) == 0:
-                    session.execute(
-                        update(
-                            Proxies
-                        ).where(
-                            Proxies.proxy_id == proxy.proxy_id
-                        ).values(
-                            proxy=proxy.proxy,
-                            protocols=proxy.protocols
-                        )
-                    )
-                    session.commit()
+    def save_proxies(self, proxies: list[Proxies]) -> None:
+        """
+        Saves a batch of proxies into the 'proxies' table in a single transaction.
+        A proxy that is already saved (same ip and port) has its row updated, keeping its `proxy_id` and `added_at`.
+        Saving a proxy that wasn't validated doesn't override the results of the saved proxy's last validation.
+        The probes of the proxies that were validated are appended to the 'proxy_checks' table in the same transaction.
 
-                return
+        Args:
+            proxies (list[Proxies]): The proxies to be saved.
 
-            # Save the proxy to the database
-            session.add(proxy)
-            session.commit()
+        Returns:
+            None: This method doesn't return anything.
+        """
+        rows = dict()
+
+        # The occurrences of a proxy in the batch are merged into a single row
+        for proxy in proxies:
+            key = (proxy.ip, int(proxy.port))
+            row = self._row_values(proxy=proxy)
+
+            rows[key] = self._merge_rows(saved_row=rows[key], row=row) if key in rows else row
+
+        if len(rows) == 0:
+            return
+
+        query = insert(Proxies)
+        is_validated = query.excluded.last_checked_at.is_not(None) | Proxies.last_checked_at.is_(None)
+
+        query = query.on_conflict_do_update(
+            index_elements=[Proxies.ip, Proxies.port],
+            set_={
+                **{
+                    column.name: query.excluded[column.name]
+                    for column in Proxies.__table__.columns
+                    if column.name not in ["proxy_id", "ip", "port", "added_at"]
+                },
+                **{
+                    column_name: case((is_validated, query.excluded[column_name]), else_=Proxies.__table__.c[column_name])
+                    for column_name in _VALIDATION_COLUMNS
+                },
+                # Saving a proxy that wasn't validated keeps the time of its last check
+                "last_checked_at": func.coalesce(query.excluded.last_checked_at, Proxies.last_checked_at),
+                "last_valid_at": func.coalesce(query.excluded.last_valid_at, Proxies.last_valid_at),
+                **self._health_updates(excluded=query.excluded)
+            }
+        )
+
+        checks = [
+            check for proxy in proxies for check in self._check_rows(proxy=proxy)
+        ]
+
+        with self._lock:
+            try:
+                self.session.execute(query, list(rows.values()))
+
+                if len(checks) > 0:
+                    self.session.execute(insert(ProxyChecks), checks)
+
+                self.session.commit()
+            except Exception:
+                self.session.rollback()
+                raise
+
+    def add_proxy(self, proxy: Proxies) -> None:
+        """
+        Queues a proxy to be saved by the database writer, without waiting for it to be written.
+
+        Args:
+            proxy (Proxies): The proxy to be saved.
+
+        Returns:
+            None: This method doesn't return anything.
+        """
+        self.writer.write(proxy=proxy)
+
+    def flush(self) -> None:
+        """
+        Waits for the proxies queued by `add_proxy` to be written to the database.
+
+        Args:
+            None
+
+        Returns:
+            None: This method doesn't return anything.
+        """
+        self.writer.flush()
+
+    def close(self) -> None:
+        """
+        Writes the queued proxies, stops the database writer and closes the session, then checkpoints the WAL
+        into the database file and disposes of the engine.
 
-    def fetch_proxies(self, proxies_count: int | None = None) -> List[tuple[Proxies]]:
+        Args:
+            None
+
+        Returns:
+            None: This method doesn't return anything.
+        """
+        try:
+            self.writer.stop()
+        finally:
+            self.session.close()
+
+            with self._lock, self.engine.connect() as connection:
+                connection.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+
+            self.engine.dispose()
+
+    def _row_values(self, proxy: Proxies) -> dict:
+        """ Returns the values of every column of `proxy`, using the column's default for the unset ones """
+        values = dict()
+
+        for column in Proxies.__table__.columns:
+            value = getattr(proxy, column.name)
+
+            if value is None and column.default is not None:
+                if column.default.is_scalar:
+                    value = column.default.arg
+                elif column.default.is_callable:
+                    # SQLAlchemy wraps the callable to take the execution context, which it doesn't use
+                    value = column.default.arg(None)
+
+            values[column.name] = value
+
+        return values
+
+    def _merge_rows(self, saved_row: dict, row: dict) -> dict:
+        """
+        Merges two rows of the same proxy found in a batch, the last one winning.
+
+        A row that wasn't validated doesn't override the validation results of a row that was. Two rows validated
+        alike are validations of different protocols, so their protocols and latencies are combined.
+        """
+        if row["last_checked_at"] is None and saved_row["last_checked_at"] is not None:
+            return {
+                **row,
+                **{column_name: saved_row[column_name] for column_name in _VALIDATION_COLUMNS},
+                "last_checked_at": saved_row["last_checked_at"],
+                "last_valid_at": saved_row["last_valid_at"]
+            }
+
+        if (row["last_checked_at"] is None) != (saved_row["last_checked_at"] is None):
+            return row
+
+        total_times = [
+            total_time for total_time in [saved_row["total_time"], row["total_time"]] if total_time is not None
+        ]
+
+        return {
+            **row,
+            "protocol_mask": (saved_row["protocol_mask"] or 0) | (row["protocol_mask"] or 0),
+            "is_valid": bool(saved_row["is_valid"] or row["is_valid"]),
+            "latencies": {**(saved_row["latencies"] or dict()), **(row["latencies"] or dict())} or row["latencies"],
+            "total_time": min(total_times) if len(total_times) > 0 else None,
+            "last_valid_at": row["last_valid_at"] or saved_row["last_valid_at"]
+        }
+
+    def _health_updates(self, excluded) -> dict:
+        """
+        Returns the upsert's updates of the health columns and of the time the proxy is due to be validated again.
+
+        A proxy being saved starts its averages from its latest check only, so that check is folded into the
+        saved averages instead of replacing them. A proxy that wasn't validated keeps its saved averages.
+        """
+        success_rate = func.coalesce(
+            helpers.ewma(average=Proxies.success_rate, sample=excluded.success_rate),
+            excluded.success_rate,
+            Proxies.success_rate
+        )
+        latency = func.coalesce(
+            helpers.ewma(average=Proxies.latency_ewma, sample=excluded.latency_ewma),
+            excluded.latency_ewma,
+            Proxies.latency_ewma
+        )
+
+        return {
+            # The TTL of the check depends on the merged success rate, so it's computed here rather than taken from the proxy
+            "next_check_at": func.coalesce(
+                func.datetime(
+                    excluded.last_checked_at,
+                    func.printf("+%f seconds", helpers.revalidation_ttl(success_rate=success_rate))
+                ),
+                Proxies.next_check_at
+            ),
+            "success_rate": success_rate,
+            "latency_ewma": latency,
+            "health_score": helpers.health_score(
+                success_rate=success_rate,
+                latency=func.coalesce(latency, constants.HEALTH_LATENCY_SCALE)
+            )
+        }
+
+    def _check_rows(self, proxy: Proxies) -> list[dict]:
+        """ Returns a 'proxy_checks' row for each probe of the last validation of `proxy` """
+        verdicts = getattr(proxy, "verdicts", None) or dict()
+
+        return [
+            {
+                "proxy_id": proxy.proxy_id,
+                "checked_at": result.checked_at or proxy.last_checked_at or helpers.date(),
+                "protocol": constants.PROTOCOL_BITS[result.protocol],
+                "target": result.target_url,
+                "is_success": result.is_success,
+                "status_code": result.status_code,
+                "error": type(result.error).__name__ if result.error is not None else None,
+                "connect_time": result.connect_time,
+                "first_byte_time": result.first_byte_time,
+                "total_time": result.total_time
+            } for verdict in verdicts.values() for result in verdict.results
+        ]
+
+    def fetch_proxies(self, proxies_count: int | None = None, sort_by: str | None = None, max_latency: float | None = None, protocol: str | None = None, country: str | None = None, only_valid: bool = False, checked_within: float | None = None, due: bool = False) -> List[tuple[Proxies]]:
         """
-        Fetches proxies from the 'proxies' table.
+        Fetches proxies from the 'proxies' table. The filters are applied by the database.
 
         Args:
             proxies_count (int, optional, default: None): The number of proxies to fetch. If None, all proxies are fetched.
+            sort_by (str, optional, default: None): Sort the proxies by `latency` (fastest first, unmeasured proxies last) or `score` (healthiest first, unchecked proxies last). `priority` sorts them by score then by how long they are overdue, to revalidate the most useful proxies first. If None, the table's order is kept.
+            max_latency (float, optional, default: None): Only fetch proxies whose latency in milliseconds is at most `max_latency`.
+            protocol (str, optional, default: None): Only fetch proxies supporting `protocol`.
+            country (str, optional, default: None): Only fetch proxies located in `country`, an ISO 3166-1 alpha-2 country code.
+            only_valid (bool, optional, default: False): Only fetch the proxies that were valid when last checked.
+            checked_within (float, optional, default: None): Only fetch proxies validated within the last `checked_within` seconds.
+            due (bool, optional, default: False): Only fetch the proxies that were never validated or are due to be validated again.
 
         Returns:
             List[tuple[Proxies]]: A list of tuples containing the fetched proxies.
         """
         session = sessionmaker(bind=self.engine)
+        query = self._proxies_query(
+            proxies_count=proxies_count,
+            sort_by=sort_by,
+            max_latency=max_latency,
+            protocol=protocol,
+            country=country,
+            only_valid=only_valid,
+            checked_within=checked_within,
+            due=due
+        )
 
         proxies = None
         with session() as session:
-            if proxies_count is not None:
-                proxies = session.execute(
-                    select(Proxies).limit(proxies_count)
-                ).fetchall()
-            else:
-                proxies = session.execute(
-                    select(Proxies)
-                ).fetchall()
+            proxies = session.execute(query).fetchall()
 
         return proxies
 
-    def update_proxy_valid_value(self, proxy: Proxies) -> None:
+    def stream_proxies(self, chunk_size: int = constants.DATABASE_CHUNK_SIZE, **filters) -> Iterator[Proxies]:
         """
-        Updates the 'is_valid' value of a proxy in the 'proxies' table.
+        Yields proxies from the 'proxies' table, loading `chunk_size` rows at a time, so the memory used doesn't depend on the size of the table.
+        The yielded proxies are detached from the session and can be modified freely.
 
         Args:
-            proxy (Proxies): The proxy to be updated.
+            chunk_size (int, optional, default: constants.DATABASE_CHUNK_SIZE): The number of rows loaded at a time.
+            **filters: The filters of `fetch_proxies`.
+
+        Yields:
+            Proxies: The fetched proxies.
+        """
+        session = sessionmaker(bind=self.engine, autoflush=False)
+        query = self._proxies_query(**filters).execution_options(yield_per=chunk_size)
+
+        with session() as session:
+            for proxy in session.execute(query).scalars():
+                # Modified proxies would otherwise be kept alive by the session until it's closed
+                session.expunge(proxy)
+
+                yield proxy
+
+    def count_proxies(self, **filters) -> int:
+        """
+        Counts the proxies of the 'proxies' table matching the filters of `fetch_proxies`.
+
+        Args:
+            **filters: The filters of `fetch_proxies`.
 
         Returns:
-            None: This method dones't return anything.
+            int: The number of matching proxies.
         """
-        session = sessionmaker(
-            bind=self.engine
+        query = select(func.count()).select_from(
+            self._proxies_query(**filters).order_by(None).subquery()
         )
 
-        with session() as session:
-            session.execute(
-                update(Proxies).where(
-                    Proxies.proxy_id == proxy.proxy_id
-                ).values(
-                    is_valid=proxy.is_valid
+        with self.engine.connect() as connection:
+            return connection.execute(query).scalar()
+
+    def _proxies_query(self, proxies_count: int | None = None, sort_by: str | None = None, max_latency: float | None = None, protocol: str | None = None, country: str | None = None, only_valid: bool = False, checked_within: float | None = None, due: bool = False):
+        """ Builds the query selecting the proxies matching the filters of `fetch_proxies` """
+        query = select(Proxies)
+
+        if max_latency is not None:
+            query = query.where(Proxies.total_time <= max_latency)
+
+        if protocol is not None:
+            # Listing every mask with the protocol's bit set keeps the query on the index
+            query = query.where(
+                Proxies.protocol_mask.in_(
+                    [mask for mask in range(1 << len(constants.PROTOCOLS)) if mask & constants.PROTOCOL_BITS[protocol]]
                 )
             )
 
-            session.commit()
+        if country is not None:
+            query = query.where(Proxies.country == country.upper())
+
+        if only_valid:
+            query = query.where(Proxies.is_valid == True)
+
+        if checked_within is not None:
+            query = query.where(Proxies.last_checked_at >= helpers.date() - datetime.timedelta(seconds=checked_within))
+
+        if due:
+            query = query.where(
+                or_(
+                    Proxies.next_check_at.is_(None),
+                    Proxies.next_check_at <= helpers.date()
+                )
+            )
+
+        if sort_by == "latency":
+            query = query.order_by(Proxies.total_time.asc().nulls_last())
+        elif sort_by == "score":
+            # NULLs sort last in descending order, so the index on `health_score` serves the sort as is
+            query = query.order_by(Proxies.health_score.desc())
+        elif sort_by == "priority":
+            query = query.order_by(Proxies.health_score.desc(), Proxies.next_check_at.asc())
+
+        if proxies_count is not None:
+            query = query.limit(proxies_count)
+
+        return query
+
+    def compact(self, dead_for: float = constants.RETENTION_DEAD_FOR, checks_for: float = constants.RETENTION_CHECKS_FOR, archive_path: str | None = None, force_vacuum: bool = False) -> dict:
+        """
+        Applies the retention policy, so the size of the database and the time taken by its queries stay bounded.
+
+        The proxies that failed their last check and weren't found valid for `dead_for` seconds are removed with their check
+        history, after being copied to the archive database if `archive_path` is given. A proxy that was never found valid
+        counts as dead since its last check, and a proxy that was never validated isn't removed. The check history older than `checks_for` seconds is trimmed.
+        The statistics of the query planner are then refreshed, and the database is vacuumed if enough of its pages are free.
+
+        Args:
+            dead_for (float, optional, default: constants.RETENTION_DEAD_FOR): Seconds a proxy has to be dead for to be removed.
+            checks_for (float, optional, default: constants.RETENTION_CHECKS_FOR): Seconds the check history is kept for.
+            archive_path (str, optional, default: None): The path of the SQLite database the removed proxies are archived to. If None, they are deleted.
+            force_vacuum (bool, optional, default: False): Vacuum the database however few of its pages are free.
+
+        Returns:
+            dict: The number of `removed_proxies`, of `removed_dead_checks` (the check history of the removed proxies) and of `removed_checks` (the trimmed checks of the other proxies), the `archive_path` and whether the database was `vacuumed`.
+        """
+        now = helpers.date()
+        dead_proxies = select(Proxies.proxy_id).where(
+            # Proxies that were never validated aren't known to be dead, however long ago they were added
+            Proxies.last_checked_at.is_not(None),
+            Proxies.is_valid == False,
+            # Proxies that were never found valid are dead since they were last checked
+            func.coalesce(Proxies.last_valid_at, Proxies.last_checked_at) < now - datetime.timedelta(seconds=dead_for)
+        )
+
+        # Queued proxies could be one of the dead ones
+        self.flush()
+
+        if archive_path is not None:
+            self._create_archive(archive_path=archive_path)
+
+        with self._lock, self.engine.connect() as connection:
+            if archive_path is not None:
+                connection.execute(text("ATTACH DATABASE :archive_path AS archive"), {"archive_path": archive_path})
+
+            try:
+                if archive_path is not None:
+                    self._archive_proxies(connection=connection, dead_proxies=dead_proxies)
+
+                removed_dead_checks = connection.execute(
+                    delete(ProxyChecks).where(ProxyChecks.proxy_id.in_(dead_proxies))
+                ).rowcount
+                removed_checks = connection.execute(
+                    delete(ProxyChecks).where(ProxyChecks.checked_at < now - datetime.timedelta(seconds=checks_for))
+                ).rowcount
+                removed_proxies = connection.execute(
+                    delete(Proxies).where(Proxies.proxy_id.in_(dead_proxies))
+                ).rowcount
+
+                connection.execute(
+                    insert(Maintenance).values(task="compact", last_run_at=now).on_conflict_do_update(
+                        index_elements=[Maintenance.task],
+                        set_={"last_run_at": now}
+                    )
+                )
+
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                if archive_path is not None:
+                    connection.execute(text("DETACH DATABASE archive"))
+
+        # VACUUM can't run inside a transaction
+        with self._lock, self.engine.execution_options(isolation_level="AUTOCOMMIT").connect() as connection:
+            connection.execute(text("ANALYZE"))
+
+            page_count = connection.execute(text("PRAGMA page_count")).scalar()
+            freelist_count = connection.execute(text("PRAGMA freelist_count")).scalar()
+            vacuumed = force_vacuum or (page_count > 0 and freelist_count / page_count >= constants.VACUUM_FREE_RATIO)
+
+            if vacuumed:
+                connection.execute(text("VACUUM"))
+
+        return {
+            "removed_proxies": removed_proxies,
+            "removed_dead_checks": removed_dead_checks,
+            "removed_checks": removed_checks,
+            "archive_path": archive_path,
+            "vacuumed": vacuumed
+        }
+
+    def compact_if_due(self, interval: float = constants.COMPACT_INTERVAL) -> dict | None:
+        """
+        Compacts the database with the default retention policy, unless it was compacted within the last `interval` seconds.
+
+        Args:
+            interval (float, optional, default: constants.COMPACT_INTERVAL): Seconds between two compactions.
+
+        Returns:
+            dict | None: What `compact` returned, or None if the database wasn't due to be compacted.
+        """
+        with self.engine.connect() as connection:
+            last_run_at = connection.execute(
+                select(Maintenance.last_run_at).where(Maintenance.task == "compact")
+            ).scalar()
+
+        if last_run_at is not None and helpers.date() - last_run_at < datetime.timedelta(seconds=interval):
+            return None
+
+        return self.compact()
+
+    def _create_archive(self, archive_path: str) -> None:
+        """ Creates the archive database, or brings the one created by an older version of proxycrawler up to date """
+        archive_engine = create_engine(url=f"sqlite+pysqlite:///{archive_path}")
+        tables = [Proxies.__table__, ProxyChecks.__table__]
+
+        try:
+            Base.metadata.create_all(bind=archive_engine, tables=tables)
+
+            inspector = inspect(archive_engine)
+
+            with archive_engine.begin() as connection:
+                for table in tables:
+                    self._add_missing_columns(connection=connection, inspector=inspector, table=table)
+        finally:
+            archive_engine.dispose()
+
+    def _archive_proxies(self, connection, dead_proxies) -> None:
+        """ Copies the dead proxies and their check history to the attached archive database """
+        archive = MetaData(schema="archive")
+        archived_proxies = Proxies.__table__.to_metadata(archive)
+        archived_checks = ProxyChecks.__table__.to_metadata(archive)
+
+        # A proxy archived by an earlier run that came back and died again replaces its archived copy
+        proxies_columns = [column.name for column in Proxies.__table__.columns]
+        connection.execute(
+            insert(archived_proxies).prefix_with("OR REPLACE").from_select(
+                proxies_columns,
+                select(*[Proxies.__table__.c[column] for column in proxies_columns]).where(Proxies.proxy_id.in_(dead_proxies))
+            )
+        )
+
+        # The archive numbers the checks itself
+        checks_columns = [column.name for column in ProxyChecks.__table__.columns if column.name != "check_id"]
+        connection.execute(
+            insert(archived_checks).from_select(
+                checks_columns,
+                select(*[ProxyChecks.__table__.c[column] for column in checks_columns]).where(ProxyChecks.proxy_id.in_(dead_proxies))
+            )
+        )
 
     def _check_database_url(self) -> bool:
         """ Checks if the database URL is valid. """
@@ -143,3 +773,23 @@ class DatabaseHandler (object):
         ) # Create the directory leading to the database file
 
         open(database_path, "a").close() # Creating the database file
+
+def _load_protocols(protocols) -> list[str]:
+    """ Loads the protocols of a row, saved as the string representation of a list """
+    if not protocols:
+        return []
+
+    try:
+        return list(ast.literal_eval(protocols))
+    except (ValueError, SyntaxError):
+        return []
+
+def _load_proxy(proxy) -> dict:
+    """ Loads the URLs by protocol of a row, saved as a JSON string """
+    if isinstance(proxy, str):
+        try:
+            proxy = json.loads(proxy)
+        except ValueError:
+            return {}
+
+    return proxy if isinstance(proxy, dict) else {}
@@ -0,0 +1,145 @@
+import time
+import queue
+import threading
+
+from typing import Callable
+
+from proxycrawler import constants
+from proxycrawler.src.database.tables import Proxies
+
+# Asks the writer to write the rows queued before it right away
+_FLUSH = object()
+
+# Asks the writer to stop once the rows queued before it are written
+_STOP = object()
+
+class DatabaseWriter(object):
+    """
+    Writes proxies to the database from a dedicated thread.
+
+    The proxies are queued by the threads that produce them and committed by the writer in groups, once
+    `batch_size` of them are waiting or `flush_interval` seconds passed since the first one of the group was queued.
+    The producers never wait on the disk, unless the queue is full.
+
+    Attributes:
+        save_proxies (Callable[[list[Proxies]], None]): Writes a group of proxies in a single transaction.
+        batch_size (int): The most proxies committed at once.
+        flush_interval (float): The most seconds a queued proxy waits before being committed.
+        queue_size (int): The most proxies waiting to be written before `write` blocks.
+    """
+    def __init__(self, save_proxies: Callable[[list[Proxies]], None], batch_size: int = constants.DATABASE_BATCH_SIZE, flush_interval: float = constants.DATABASE_FLUSH_INTERVAL, queue_size: int = constants.DATABASE_QUEUE_SIZE) -> None:
+        self.save_proxies = save_proxies
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+
+        self._queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._thread: threading.Thread | None = None
+        self._error: Exception | None = None
+
+    @property
+    def is_running(self) -> bool:
+        """ True while the writer's thread is alive """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """ Starts the writer's thread """
+        if self.is_running:
+            return
+
+        self._thread = threading.Thread(target=self._run, name="database-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, proxy: Proxies) -> None:
+        """
+        Queues a proxy to be written.
+
+        Args:
+            proxy (Proxies): The proxy to be saved.
+
+        Returns:
+            None: This method doesn't return anything.
+        """
+        self._raise_error()
+
+        if not self.is_running:
+            self.start()
+
+        self._queue.put(proxy)
+
+    def flush(self) -> None:
+        """
+        Blocks until every queued proxy is written.
+
+        Raises:
+            Exception: The error raised by the last failed write, if any.
+        """
+        if self.is_running:
+            self._queue.put(_FLUSH)
+            self._queue.join()
+
+        self._raise_error()
+
+    def stop(self) -> None:
+        """
+        Writes the queued proxies and stops the writer's thread.
+
+        Raises:
+            Exception: The error raised by the last failed write, if any.
+        """
+        if self.is_running:
+            self._queue.put(_STOP)
+            self._thread.join()
+
+        self._thread = None
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        """ Raises the error of the last failed write once """
+        if self._error is None:
+            return
+
+        error = self._error
+        self._error = None
+
+        raise error
+
+    def _run(self) -> None:
+        """ Commits the queued proxies in groups until asked to stop """
+        is_stopping = False
+
+        while not is_stopping:
+            batch = []
+            received = 0
+            flush_at = None
+
+            while len(batch) < self.batch_size:
+                try:
+                    # Wait for the group's first proxy as long as needed, then up to the group's deadline
+                    timeout = None if flush_at is None else max(0, flush_at - time.monotonic())
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+
+                received += 1
+
+                if item is _STOP:
+                    is_stopping = True
+                    break
+
+                if item is _FLUSH:
+                    break
+
+                batch.append(item)
+
+                if flush_at is None:
+                    flush_at = time.monotonic() + self.flush_interval
+
+            try:
+                if len(batch) > 0:
+                    self.save_proxies(batch)
+            except Exception as error:
+                self._error = error
+            finally:
+                for _ in range(received):
+                    self._queue.task_done()
@@ -2,9 +2,13 @@ from sqlalchemy import (
     Column,
     String,
     Integer,
+    SmallInteger,
+    Float,
     Boolean,
     DateTime,
-    JSON
+    JSON,
+    Index,
+    ForeignKey
 )
 
 from sqlalchemy.orm import DeclarativeBase
@@ -19,16 +23,123 @@ class Base(DeclarativeBase):
 class Proxies(Base):
     """ Proxies table model for storing proxy information. """
     __tablename__ = "proxies"
+    __table_args__ = (
+        # A proxy is stored once, saving it again updates its row
+        Index("ix_proxies_ip_port", "ip", "port", unique=True),
+        # Serves `export-db --only-valid --checked-within`
+        Index("ix_proxies_is_valid_last_checked_at", "is_valid", "last_checked_at"),
+    )
 
     # Columns
-    proxy_id    =   Column(String, primary_key=True)
-    ip          =   Column(String(30))
-    port        =   Column(Integer)
-    proxy       =   Column(JSON)
-    protocols   =   Column(String)
-    country     =   Column(String(10))
-    is_valid    =   Column(Boolean, default=True)
-    added_at    =   Column(DateTime, default=helpers.date())
+    proxy_id        =   Column(String, primary_key=True)
+    ip              =   Column(String(30))
+    port            =   Column(Integer)
+    protocol_mask   =   Column(Integer, default=0, index=True) # See `constants.PROTOCOL_BITS`
+    country         =   Column(String(10), index=True)
+    is_valid        =   Column(Boolean, default=True)
+    added_at        =   Column(DateTime, default=helpers.date)
+
+    # Latency in milliseconds of each valid protocol, and of the fastest one
+    latencies       =   Column(JSON)
+    connect_time    =   Column(Float)
+    first_byte_time =   Column(Float)
+    total_time      =   Column(Float, index=True)
+
+    # When the proxy was last validated, and when it's due to be validated again, see `helpers.revalidation_ttl`
+    last_checked_at =   Column(DateTime, index=True)
+    next_check_at   =   Column(DateTime, index=True)
+
+    # When the proxy was last found valid, how long it's been dead for decides when `db compact` removes it
+    last_valid_at   =   Column(DateTime)
+
+    # Exponentially weighted averages of the proxy's checks, and the score derived from them, see `helpers.health_score`
+    success_rate    =   Column(Float)
+    latency_ewma    =   Column(Float)
+    health_score    =   Column(Float, index=True)
+
+    @property
+    def protocols(self) -> list[str]:
+        """ The protocols supported by the proxy """
+        return helpers.mask_to_protocols(self.protocol_mask or 0)
+
+    @protocols.setter
+    def protocols(self, protocols: list[str]) -> None:
+        self.protocol_mask = helpers.protocols_to_mask(protocols)
+
+    @property
+    def proxy(self) -> dict:
+        """ The URL of the proxy for each supported protocol """
+        return {
+            protocol: f"{protocol}://{self.ip}:{self.port}" for protocol in self.protocols
+        }
+
+    @proxy.setter
+    def proxy(self, proxy: dict) -> None:
+        self.protocols = list(proxy)
+
+    def export_dict(self) -> dict:
+        """
+        Exports the proxy's columns into a dict format, like the `export_dict()` of the proxy models.
+
+        Args:
+            None
+
+        Returns:
+            dict: The proxy's data in dictionary format.
+        """
+        return {
+            "ip"                :   self.ip,
+            "port"              :   self.port,
+            "country"           :   self.country,
+            "proxy"             :   self.proxy,
+            "protocols"         :   self.protocols,
+            "is_valid"          :   self.is_valid,
+            "latencies"         :   self.latencies,
+            "total_time"        :   self.total_time,
+            "last_checked_at"   :   self.last_checked_at,
+            "health_score"      :   self.health_score
+        }
+
+    def __repr__(self) -> str:
+        return f"Proxies(proxy_id={self.proxy_id!r}, ip={self.ip!r}, port={self.port!r}, proxy={self.proxy!r}, protocols={self.protocols!r}, country={self.country!r}, is_valid={self.is_valid!r}, added_at={self.added_at!r}, total_time={self.total_time!r}, last_checked_at={self.last_checked_at!r}, next_check_at={self.next_check_at!r}, health_score={self.health_score!r})"
+
+class ProxyChecks(Base):
+    """ Append-only history of the probes sent through the proxies, one row per probe. """
+    __tablename__ = "proxy_checks"
+    __table_args__ = (
+        # Serves the history of a proxy, oldest or newest first
+        Index("ix_proxy_checks_proxy_id_checked_at", "proxy_id", "checked_at"),
+        # Serves the trimming of the old history by `db compact`
+        Index("ix_proxy_checks_checked_at", "checked_at"),
+    )
+
+    # Columns
+    check_id        =   Column(Integer, primary_key=True)
+    proxy_id        =   Column(String, ForeignKey("proxies.proxy_id"), nullable=False)
+    checked_at      =   Column(DateTime, nullable=False)
+    protocol        =   Column(SmallInteger, nullable=False) # A single bit of `constants.PROTOCOL_BITS`
+    target          =   Column(String)
+
+    # Outcome of the probe, the status code is NULL when the target didn't answer
+    is_success      =   Column(Boolean, nullable=False)
+    status_code     =   Column(SmallInteger)
+    error           =   Column(String(40)) # The name of the exception raised while probing
+
+    # Latency in milliseconds
+    connect_time    =   Column(Float)
+    first_byte_time =   Column(Float)
+    total_time      =   Column(Float)
+
+    def __repr__(self) -> str:
+        return f"ProxyChecks(check_id={self.check_id!r}, proxy_id={self.proxy_id!r}, checked_at={self.checked_at!r}, protocol={self.protocol!r}, target={self.target!r}, is_success={self.is_success!r}, status_code={self.status_code!r}, error={self.error!r}, total_time={self.total_time!r})"
+
+class Maintenance(Base):
+    """ When each maintenance task of the database last ran. """
+    __tablename__ = "maintenance"
+
+    # Columns
+    task            =   Column(String, primary_key=True)
+    last_run_at     =   Column(DateTime)
 
     def __repr__(self) -> str:
-        return f"Proxies(proxy_id={self.proxy_id!r}, ip={self.ip!r}, port={self.port!r}, proxy={self.proxy!r}, protocols={self.protocols!r}, country={self.country!r}, is_valid={self.is_valid!r}, added_at={self.added_at!r})"
+        return f"Maintenance(task={self.task!r}, last_run_at={self.last_run_at!r})"
@@ -0,0 +1,91 @@
+import time
+import threading
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from user_agent import generate_user_agent
+
+from proxycrawler import constants
+
+class HttpClient(object):
+    """
+    The HTTP client shared by the services.
+
+    Wraps a single `requests.Session` so the connections to the services are kept alive and reused across
+    pages and crawls instead of redoing the TCP and TLS handshakes on every request. Responses are
+    compressed and the session keeps the same User-Agent for its whole life.
+
+    Attributes:
+        session (requests.Session): The underlying session.
+        timeout (tuple[float, float]): The default (connect, read) timeouts of the requests.
+    """
+    def __init__(self, pool_connections: int = constants.HTTP_POOL_CONNECTIONS, pool_maxsize: int = constants.HTTP_POOL_MAXSIZE, max_retries: int = constants.HTTP_MAX_RETRIES, timeout: tuple[float, float] = constants.SCRAPER_TIMEOUT) -> None:
+        self.timeout = timeout
+        self.session = requests.Session()
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(
+                total=max_retries,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["GET"]
+            )
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.session.headers.update(
+            {
+                "User-Agent": generate_user_agent(),
+                "Accept-Encoding": "gzip, deflate", # 'br' is left out because the response content is not readable without brotli
+                "Connection": "keep-alive"
+            }
+        )
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a GET request through the shared session.
+
+        Args:
+            url (str): The URL to request.
+            **kwargs: Passed to `requests.Session.get`, `timeout` defaults to the client's timeout.
+
+        Returns:
+            requests.Response: The response.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+
+        return self.session.get(url, **kwargs)
+
+    def close(self) -> None:
+        """ Closes the pooled connections """
+        self.session.close()
+
+class RateLimiter(object):
+    """
+    Spaces out requests sent from several threads so that at most `rate` of them start per second.
+
+    Attributes:
+        rate (float): The maximum number of requests started per second.
+    """
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def wait(self) -> None:
+        """ Blocks the calling thread until it's allowed to send its request """
+        if self.rate <= 0:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1 / self.rate
+
+        if slot > now:
+            time.sleep(slot - now)
@@ -3,7 +3,7 @@ class CLIOptions(object):
     """
     A model that holds CLI options
     """
-    def __init__(self, enable_save_on_run: bool = True, proxy_file_path: str = None, proxies_count: int = None, group_by_protocol: bool = False, output_file_path: str = None, validate_proxies: bool = False, protocol: str = None, test_all_protocols: bool = False, debug_mode: bool = False) -> None:
+    def __init__(self, enable_save_on_run: bool = True, proxy_file_path: str = None, proxies_count: int = None, group_by_protocol: bool = False, output_file_path: str = None, validate_proxies: bool = False, protocol: str = None, test_all_protocols: bool = False, target_urls: list[str] = None, concurrency: int = 200, quorum_size: int = 3, quorum_threshold: int = 2, deadline: float = None, sort_by: str = None, max_latency: float = None, country: str = None, only_valid: bool = False, checked_within: float = None, budget: int = None, snapshot: bool = False, output_format: str = "txt", low_memory: bool = False, debug_mode: bool = False) -> None:
         self.enable_save_on_run     =   enable_save_on_run
         self.proxy_file_path        =   proxy_file_path
         self.proxies_count          =   proxies_count
@@ -12,4 +12,18 @@ class CLIOptions(object):
         self.validate_proxies       =   validate_proxies
         self.test_all_protocols     =   test_all_protocols
         self.protocol               =   protocol
+        self.target_urls            =   target_urls
+        self.concurrency            =   concurrency
+        self.quorum_size            =   quorum_size
+        self.quorum_threshold       =   quorum_threshold
+        self.deadline               =   deadline
+        self.sort_by                =   sort_by
+        self.max_latency            =   max_latency
+        self.country                =   country
+        self.only_valid             =   only_valid
+        self.checked_within         =   checked_within
+        self.budget                 =   budget
+        self.snapshot               =   snapshot
+        self.output_format          =   output_format
+        self.low_memory             =   low_memory
         self.debug_mode             =   debug_mode
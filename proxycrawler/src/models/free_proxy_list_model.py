@@ -1,13 +1,8 @@
-import json
-import time
-import requests
+import datetime
 
 from rich.console import Console
-from user_agent import generate_user_agent
 
 from proxycrawler import helpers
-from proxycrawler import constants
-from proxycrawler.messages import debug
 from proxycrawler.src.database.tables import Proxies
 
 class FreeProxyListModel(object):
@@ -25,9 +20,19 @@ class FreeProxyListModel(object):
         last_checked (str): Timestamp for when the proxy was last checked.
         proxy (dict): A dictionary containing proxy details for different protocols.
         is_valid (bool): Indicates whether the proxy is valid or not.
+        latencies (dict): The connect, first byte and total times in milliseconds of each valid protocol.
+        connect_time (float): Milliseconds taken to connect through the fastest protocol.
+        first_byte_time (float): Milliseconds to the first byte of the response through the fastest protocol.
+        total_time (float): Milliseconds to the end of the response headers through the fastest protocol.
+        last_checked_at (datetime): When the proxy was last validated.
+        next_check_at (datetime): When the proxy is due to be validated again.
+        last_valid_at (datetime): When the proxy was last found valid.
+        success_rate (float): The exponentially weighted share of the proxy's checks that succeeded.
+        latency_ewma (float): The exponentially weighted latency in milliseconds of the proxy's successful checks.
+        health_score (float): The score derived from `success_rate` and `latency_ewma`, higher is better.
+        verdicts (dict): The quorum verdict of each probed protocol, holding the results of the probes sent by the last validation.
 
     Methods:
-        validate(): Validates the proxy's compatibility with various protocols.
         export_dict(): Exports the class attributes as a dictionary.
         export_table_row(): Exports the proxy data as a `Proxies` table row.
     """
@@ -41,73 +46,22 @@ class FreeProxyListModel(object):
     last_checked            :       str
     proxy                   :       dict    =   dict()
     is_valid                :       bool    =   False
+    latencies               :       dict    =   dict()
+    connect_time            :       float   =   None
+    first_byte_time         :       float   =   None
+    total_time              :       float   =   None
+    last_checked_at         :       datetime =   None
+    next_check_at           :       datetime =   None
+    last_valid_at           :       datetime =   None
+    success_rate            :       float   =   None
+    latency_ewma            :       float   =   None
+    health_score            :       float   =   None
+    verdicts                :       dict    =   dict()
 
     def __init__(self, console: Console | None = None) -> None:
         self.protocols = list() # supported protocols
         self.console = console
 
-    def validate(self) -> bool:
-        """
-        Validate proxy
-
-        Args:
-            None
-
-        Returns:
-            bool: True if the proxy is valid, otherwise False is returned
-        """
-        protocols = ["http", "https", "socks4", "socks5"]
-        proxy = {
-
-        }
-        delay_time = 3
-
-        for protocol in protocols:
-            try:
-                headers = {
-                    "User-Agent": generate_user_agent()
-                }
-                proxies = {
-                    protocol: f"{protocol}://{self.ip}:{self.port}"
-                }
-                status_codes = []
-
-                for _ in range(3):
-                    time.sleep(delay_time)
-                    response = requests.get(
-                        "https://google.com",
-                        headers=headers,
-                        proxies=proxies
-                    )
-                    status_codes.append(response.status_code)
-
-                if status_codes.count(200) >= 2:
-                    proxy[protocol] = proxies[protocol]
-                    self.protocols.append(protocol)
-            except requests.exceptions.ProxyError as error:
-                if constants.DEBUG:
-                    self.console.log(
-                        debug.EXCEPTION_RAISED_WHEN_VALIDATING_PROXY(
-                            proxy=proxies,
-                            error=error
-                        )
-                    )
-            except Exception as error:
-                if constants.DEBUG:
-                    self.console.log(
-                        debug.EXCEPTION_RAISED_WHEN_VALIDATING_PROXY(
-                            proxy=proxies,
-                            error=error
-                        )
-                    )
-
-        if len(proxy) != 0:
-            self.is_valid = True
-
-        self.proxy = proxy
-
-        return self.is_valid
-
     def export_dict(self) -> dict:
         """
         Exports class attributes into a dict format.
@@ -128,7 +82,11 @@ class FreeProxyListModel(object):
             "https"               : self.https,
             "last_checked"        : self.last_checked,
             "proxy"               : self.proxy,
-            "is_valid"            : self.is_valid
+            "protocols"           : list(self.proxy),
+            "is_valid"            : self.is_valid,
+            "latencies"           : self.latencies,
+            "total_time"          : self.total_time,
+            "last_checked_at"     : self.last_checked_at
         }
 
     def export_table_row(self) -> Proxies:
@@ -141,20 +99,29 @@ class FreeProxyListModel(object):
         Returns:
             Proxies: The `Proxies` table row containing the current proxy data.
         """
-        proxy_id = helpers.generate_uid(
-            data=json.dumps(
-                self.export_dict()
-            )
+        proxy_id = helpers.generate_proxy_uid(
+            ip=self.ip,
+            port=self.port
         )
 
         proxy = Proxies(
             proxy_id=proxy_id,
             ip=self.ip,
             port=self.port,
-            proxy=json.dumps(self.proxy),
-            protocols=str(self.protocols),
-            country=self.country,
-            is_valid=self.is_valid
+            protocols=self.protocols,
+            country=self.proxy_country_code,
+            is_valid=self.is_valid,
+            latencies=self.latencies,
+            connect_time=self.connect_time,
+            first_byte_time=self.first_byte_time,
+            total_time=self.total_time,
+            last_checked_at=self.last_checked_at,
+            next_check_at=self.next_check_at,
+            last_valid_at=self.last_valid_at,
+            success_rate=self.success_rate,
+            latency_ewma=self.latency_ewma,
+            health_score=self.health_score
         )
+        proxy.verdicts = self.verdicts
 
         return proxy
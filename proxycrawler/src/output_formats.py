@@ -0,0 +1,206 @@
+import io
+import abc
+import csv
+import json
+import math
+import socket
+import struct
+
+from typing import (
+    IO,
+    BinaryIO,
+    Iterator
+)
+
+from proxycrawler import helpers
+
+class OutputFormat(abc.ABC):
+    """
+    The base of the formats the proxies can be saved in.
+
+    A format turns the `export_dict()` of a proxy into records, each one keyed by what makes it unique in a file,
+    so the file's `OutputIndex` can skip the proxies it already holds. It can also read the keys of a file back,
+    for the index to rebuild itself from the file.
+
+    Attributes:
+        name (str): The name of the format, as given to `--format`.
+        extension (str): The extension of the files of this format.
+        is_binary (bool): The files are written in binary mode.
+        header (str | None): Written at the start of an empty file.
+    """
+    name        :   str
+    extension   :   str
+    is_binary   :   bool        =   False
+    header      :   str | None  =   None
+
+    def open(self, output_file_path: str) -> IO:
+        """
+        Opens a file of this format to append records to, writing the header if it's empty.
+
+        Args:
+            output_file_path (str): The path of the file.
+
+        Returns:
+            IO: The opened file.
+        """
+        if self.is_binary:
+            return open(output_file_path, "ab")
+
+        output_file = open(output_file_path, "a", encoding="utf-8", newline="")
+
+        if self.header is not None and output_file.tell() == 0:
+            output_file.write(self.header)
+
+        return output_file
+
+    @abc.abstractmethod
+    def records(self, proxy: dict, protocols: list[str] | None = None) -> Iterator[tuple[str, str | bytes]]:
+        """
+        Turns a proxy into records.
+
+        Args:
+            proxy (dict): The `export_dict()` of the proxy.
+            protocols (list[str], optional, default: None): The protocols the records are for, all of the proxy's if None.
+
+        Yields:
+            tuple[str, str | bytes]: The key of each record and the record.
+        """
+
+    @abc.abstractmethod
+    def read_keys(self, output_file: BinaryIO) -> Iterator[str]:
+        """
+        Reads the keys of the records of a file from its current position.
+
+        Args:
+            output_file (BinaryIO): The file, opened in binary mode.
+
+        Yields:
+            str: The key of each record.
+        """
+
+class TextFormat(OutputFormat):
+    """ One `<protocol>://<ip>:<port>` line per protocol supported by the proxy, the URL being the key """
+    name = "txt"
+    extension = ".txt"
+
+    def records(self, proxy: dict, protocols: list[str] | None = None) -> Iterator[tuple[str, str]]:
+        for protocol, url in proxy["proxy"].items():
+            if protocols is None or protocol in protocols:
+                yield (url, f"{url}\n")
+
+    def read_keys(self, output_file: BinaryIO) -> Iterator[str]:
+        for line in output_file:
+            line = line.decode(errors="replace").strip()
+
+            if line != "":
+                yield line
+
+class JsonLinesFormat(OutputFormat):
+    """ One JSON object per proxy and per line, the proxy's `export_dict()`. `<ip>:<port>` is the key """
+    name = "jsonl"
+    extension = ".jsonl"
+
+    def records(self, proxy: dict, protocols: list[str] | None = None) -> Iterator[tuple[str, str]]:
+        yield (_endpoint(proxy), f"{json.dumps(proxy, default=str)}\n")
+
+    def read_keys(self, output_file: BinaryIO) -> Iterator[str]:
+        for line in output_file:
+            try:
+                yield _endpoint(json.loads(line))
+            except (ValueError, KeyError, TypeError):
+                continue
+
+class CsvFormat(OutputFormat):
+    """ One row per proxy with the `columns` of its `export_dict()`, protocols are separated by `|`. `<ip>:<port>` is the key """
+    name = "csv"
+    extension = ".csv"
+    columns = ["ip", "port", "protocols", "country", "is_valid", "total_time", "last_checked_at"]
+    header = ",".join(columns) + "\n"
+
+    def records(self, proxy: dict, protocols: list[str] | None = None) -> Iterator[tuple[str, str]]:
+        row = {**proxy, "protocols": "|".join(proxy["protocols"] or [])}
+        record = io.StringIO()
+
+        csv.writer(record, lineterminator="\n").writerow(
+            ["" if row.get(column) is None else row[column] for column in self.columns]
+        )
+
+        yield (_endpoint(proxy), record.getvalue())
+
+    def read_keys(self, output_file: BinaryIO) -> Iterator[str]:
+        for row in csv.reader(line.decode(errors="replace") for line in output_file):
+            # The ip and the port are the first two columns, the header is skipped
+            if len(row) < 2 or row[0] == "ip":
+                continue
+
+            yield f"{row[0]}:{row[1]}"
+
+class BinaryFormat(OutputFormat):
+    """
+    Fixed-width little-endian records of 12 bytes, one per proxy, so millions of proxies can be loaded with a single
+    zero-copy read, like `numpy.fromfile(path, dtype=[("ip", ">u4"), ("port", "<u2"), ("protocols", "u1"), ("pad", "u1"), ("latency", "<f4")])`.
+
+    Record layout:
+        ip (4 bytes): The IPv4 address, in network byte order.
+        port (uint16): The port.
+        protocols (uint8): The supported protocols, as a bitmask of `constants.PROTOCOL_BITS`.
+        padding (1 byte): Always 0.
+        latency (float32): The latency in milliseconds, NaN if it wasn't measured.
+
+    Proxies without an IPv4 address are skipped. `<ip>:<port>` is the key.
+    """
+    name = "bin"
+    extension = ".bin"
+    is_binary = True
+    record = struct.Struct("<4sHBxf")
+
+    def records(self, proxy: dict, protocols: list[str] | None = None) -> Iterator[tuple[str, bytes]]:
+        try:
+            ip = socket.inet_aton(proxy["ip"])
+        except (OSError, TypeError):
+            return
+
+        latency = proxy.get("total_time")
+
+        yield (
+            _endpoint(proxy),
+            self.record.pack(
+                ip,
+                int(proxy["port"]),
+                helpers.protocols_to_mask(proxy["protocols"] or []),
+                math.nan if latency is None else latency
+            )
+        )
+
+    def read_keys(self, output_file: BinaryIO) -> Iterator[str]:
+        while True:
+            chunk = output_file.read(self.record.size * 4096)
+
+            if len(chunk) == 0:
+                return
+
+            # A record cut short by an interrupted write is ignored
+            chunk = chunk[:len(chunk) - len(chunk) % self.record.size]
+
+            for ip, port, _, _ in self.record.iter_unpack(chunk):
+                yield f"{socket.inet_ntoa(ip)}:{port}"
+
+def get_output_format(name: str) -> OutputFormat:
+    """
+    Returns the output format called `name`.
+
+    Args:
+        name (str): The name of the format, one of `constants.OUTPUT_FORMATS`.
+
+    Returns:
+        OutputFormat: The format.
+    """
+    output_formats = {
+        output_format.name: output_format for output_format in [TextFormat, JsonLinesFormat, CsvFormat, BinaryFormat]
+    }
+
+    return output_formats[name]()
+
+def _endpoint(proxy: dict) -> str:
+    """ Returns the `<ip>:<port>` of a proxy """
+    return f"{proxy['ip']}:{int(proxy['port'])}"
@@ -0,0 +1,101 @@
+import os
+import sqlite3
+
+from typing import (
+    BinaryIO,
+    Callable,
+    Iterable
+)
+
+from proxycrawler.src.output_formats import TextFormat
+
+class OutputIndex(object):
+    """
+    An on-disk set of the keys of the records of an output file, kept in a SQLite file next to it.
+    By default a record is a line and is its own key, structured formats key their records by proxy instead.
+
+    Records written through the index are skipped if the file already holds their key, so an output file appended to by
+    several runs holds every proxy once. The index follows the file: lines appended to the file by something else are
+    indexed the next time it's opened, and the index is rebuilt if the file shrank or was removed since, so it never
+    hides a line the file lost.
+
+    The lines added during a write are committed once the file is closed, rolling them back on errors
+    is safe since the lines that did reach the file are picked up from its tail the next time.
+
+    Attributes:
+        output_file_path (str): The path of the output file.
+        read_keys (Callable[[BinaryIO], Iterable[str]]): Reads the keys of the output file's records from the file's current position, the lines of a `TextFormat` file by default.
+        index_path (str): The path of the index, the output file's path followed by `.index`.
+    """
+    def __init__(self, output_file_path: str, read_keys: Callable[[BinaryIO], Iterable[str]] | None = None) -> None:
+        self.output_file_path = output_file_path
+        self.read_keys = read_keys or TextFormat().read_keys
+        self.index_path = f"{output_file_path}.index"
+
+        self._connection = sqlite3.connect(self.index_path)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS lines (line TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER) WITHOUT ROWID")
+
+        self._sync()
+
+    def __enter__(self) -> "OutputIndex":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self._connection.rollback()
+
+        self._connection.close()
+
+    def add(self, line: str) -> bool:
+        """
+        Adds a key to the set.
+
+        Args:
+            line (str): The key, a line without its line break by default.
+
+        Returns:
+            bool: True if the key wasn't in the set yet and its record has to be written, otherwise False.
+        """
+        cursor = self._connection.execute("INSERT OR IGNORE INTO lines (line) VALUES (?)", (line,))
+
+        return cursor.rowcount == 1
+
+    def commit(self) -> None:
+        """ Commits the added keys, call it once their records were written and the output file was closed """
+        self._set_indexed_size(self._file_size())
+        self._connection.commit()
+
+    def _sync(self) -> None:
+        """ Indexes the records the output file got since it was last indexed, from scratch if it shrank """
+        indexed_size = self._connection.execute("SELECT value FROM meta WHERE key = 'size'").fetchone()
+        indexed_size = indexed_size[0] if indexed_size is not None else None
+        file_size = self._file_size()
+
+        if indexed_size == file_size:
+            return
+
+        if indexed_size is None or file_size < indexed_size:
+            self._connection.execute("DELETE FROM lines")
+            indexed_size = 0
+
+        if file_size > indexed_size:
+            with open(self.output_file_path, "rb") as output_file:
+                output_file.seek(indexed_size)
+
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO lines (line) VALUES (?)",
+                    ((key,) for key in self.read_keys(output_file))
+                )
+
+        self.commit()
+
+    def _file_size(self) -> int:
+        """ Returns the size of the output file, 0 if it doesn't exist """
+        return os.path.getsize(self.output_file_path) if os.path.exists(self.output_file_path) else 0
+
+    def _set_indexed_size(self, size: int) -> None:
+        """ Records the size of the output file the index matches """
+        self._connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('size', ?)", (size,))
@@ -0,0 +1,106 @@
+import os
+import re
+
+from proxycrawler import (
+    helpers,
+    constants
+)
+
+class OutputSnapshot(object):
+    """
+    Publishes an output file as a series of immutable generations, for readers that can't see a file being written.
+
+    The proxies of a run are written to a hidden staging file next to the output file. Publishing fsyncs it and
+    renames it to a new generation, `<name>.<timestamp><extension>`, then atomically points the `<name>.latest<extension>`
+    symlink at it. A generation is never modified once published, so readers get a consistent list without locking
+    and can mmap it safely. Only the newest `generations` generations are kept, a reader holding an older one
+    open keeps reading it until it closes it.
+
+    Attributes:
+        output_file_path (str): The path of the output file the generations are named after.
+        generations (int): The number of generations kept.
+        staging_path (str): The path of the file the proxies are written to until the generation is published.
+        latest_path (str): The path of the symlink pointing at the newest generation.
+    """
+    def __init__(self, output_file_path: str, generations: int = constants.SNAPSHOT_GENERATIONS) -> None:
+        self.output_file_path = output_file_path
+        self.generations = max(1, generations)
+
+        self._directory, name = os.path.split(os.path.abspath(output_file_path))
+        self._stem, self._extension = os.path.splitext(name)
+
+        self.staging_path = os.path.join(self._directory, f".{self._stem}{self._extension}.tmp")
+        self.latest_path = os.path.join(self._directory, f"{self._stem}.latest{self._extension}")
+
+        # Drop what an interrupted run left behind, it was never published
+        self.discard()
+
+    def publish(self) -> str | None:
+        """
+        Publishes the staging file as the newest generation.
+
+        Args:
+            None
+
+        Returns:
+            str | None: The path of the new generation, or None if nothing was written since the last one.
+        """
+        if not os.path.exists(self.staging_path):
+            return None
+
+        with open(self.staging_path, "rb+") as staging_file:
+            os.fsync(staging_file.fileno())
+
+        generation_path = os.path.join(
+            self._directory,
+            f"{self._stem}.{helpers.date().strftime('%Y%m%dT%H%M%S%f')}{self._extension}"
+        )
+        os.replace(self.staging_path, generation_path)
+
+        # Swap the symlink by renaming a new one over it, readers never find it missing
+        latest_staging_path = f"{self.latest_path}.tmp"
+
+        if os.path.lexists(latest_staging_path):
+            os.remove(latest_staging_path)
+
+        os.symlink(os.path.basename(generation_path), latest_staging_path)
+        os.replace(latest_staging_path, self.latest_path)
+
+        self._fsync_directory()
+        self._remove_staging_index()
+        self._prune()
+
+        return generation_path
+
+    def discard(self) -> None:
+        """ Removes the staging file and its index without publishing them """
+        if os.path.exists(self.staging_path):
+            os.remove(self.staging_path)
+
+        self._remove_staging_index()
+
+    def _prune(self) -> None:
+        """ Removes the generations older than the newest `generations` ones """
+        pattern = re.compile(rf"^{re.escape(self._stem)}\.\d{{8}}T\d{{12}}{re.escape(self._extension)}$")
+        generation_names = sorted(
+            name for name in os.listdir(self._directory) if pattern.match(name)
+        )
+
+        for name in generation_names[:-self.generations]:
+            os.remove(os.path.join(self._directory, name))
+
+    def _remove_staging_index(self) -> None:
+        """ Removes the `OutputIndex` of the staging file, a generation is deduplicated on its own """
+        staging_index_path = f"{self.staging_path}.index"
+
+        if os.path.exists(staging_index_path):
+            os.remove(staging_index_path)
+
+    def _fsync_directory(self) -> None:
+        """ Makes the renames durable """
+        directory_fd = os.open(self._directory, os.O_RDONLY)
+
+        try:
+            os.fsync(directory_fd)
+        finally:
+            os.close(directory_fd)
@@ -0,0 +1,257 @@
+import queue
+import asyncio
+import functools
+import threading
+
+from typing import (
+    Callable,
+    Iterable,
+    AsyncIterator
+)
+
+from rich.console import Console
+
+from proxycrawler import (
+    helpers,
+    constants
+)
+from proxycrawler.messages import (
+    info,
+    errors
+)
+from proxycrawler.src.validation.engine import ValidationEngine
+
+# Marks the end of a stage's stream
+_END_OF_STREAM = object()
+
+class Pipeline(object):
+    """
+    Streams proxies from the services to the sinks through the validation engine.
+
+    The pipeline is made of three stages connected by bounded queues, each running in its own thread:
+    the sources, which put the proxies in the candidates queue as soon as they are parsed, the validator,
+    which validates them concurrently as they come and the sinks, which receive the validated proxies in small
+    batches as soon as they are out of the validator. A full queue makes the upstream stage wait, so the
+    memory used stays flat however many proxies are crawled.
+
+    The validator hands the validated proxies over from its event loop, which never waits on the sinks: a slow sink
+    would otherwise stall the probes in flight and skew their latencies. Instead, room is reserved in the results
+    queue before a candidate is validated, so the validator stops taking candidates while the sinks are behind.
+
+    Attributes:
+        sources (dict[str, Callable[[], Iterable]]): The sources by name, each one returning an iterable of proxies.
+        sinks (list[Callable[[list], None]]): Called with every batch of validated proxies, valid or not.
+        validation_engine (ValidationEngine): The engine used to validate the proxies.
+        validate_proxies (bool): Validate the proxies, otherwise they are assumed to speak every protocol.
+        protocols (list[str] | None): The protocols to test.
+        queue_size (int): The number of proxies buffered between two stages.
+        batch_size (int): The most proxies handed to the sinks at once.
+        found (int): The number of proxies that went through the pipeline so far.
+        valid (int): The number of valid proxies that went through the pipeline so far.
+        console (Console): An instance of the `rich.console.Console` for logging.
+    """
+    def __init__(self, sources: dict[str, Callable[[], Iterable]], sinks: list[Callable[[list], None]], validation_engine: ValidationEngine, validate_proxies: bool = True, protocols: list[str] | None = None, queue_size: int = constants.PIPELINE_QUEUE_SIZE, batch_size: int = constants.PIPELINE_BATCH_SIZE, console: Console | None = None) -> None:
+        self.sources = sources
+        self.sinks = sinks
+        self.validation_engine = validation_engine
+        self.validate_proxies = validate_proxies
+        self.protocols = protocols
+        self.queue_size = queue_size
+        self.batch_size = max(1, batch_size)
+        self.console = console
+
+        self.found = 0
+        self.valid = 0
+
+        self._candidates: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._results: queue.Queue = queue.Queue()
+        self._results_room = threading.Semaphore(self.queue_size)
+        self._stop = threading.Event()
+        self._validator_error: Exception | None = None
+        self._sink_error: Exception | None = None
+
+    def run(self) -> None:
+        """
+        Runs the pipeline, blocking until every source is exhausted and every proxy reached the sinks,
+        or until the validation engine's deadline is reached.
+
+        Args:
+            None
+
+        Returns:
+            None: This method doesn't return anything.
+
+        Raises:
+            Exception: The error that stopped the validator or a sink, if any.
+        """
+        producers = [
+            threading.Thread(
+                target=self._produce,
+                args=(source_name, source),
+                name=f"pipeline-source-{source_name}",
+                daemon=True
+            ) for source_name, source in self.sources.items()
+        ]
+        validator = threading.Thread(target=self._validate, name="pipeline-validator", daemon=True)
+        sink = threading.Thread(target=self._sink, name="pipeline-sink", daemon=True)
+
+        for thread in [*producers, validator, sink]:
+            thread.start()
+
+        for thread in [*producers, validator, sink]:
+            thread.join()
+
+        if self._validator_error is not None:
+            raise self._validator_error
+
+        if self._sink_error is not None:
+            raise self._sink_error
+
+        if self.console is not None:
+            self.console.log(
+                info.PIPELINE_SUMMARY(
+                    found=self.found,
+                    valid=self.valid
+                )
+            )
+
+    def _produce(self, source_name: str, source: Callable[[], Iterable]) -> None:
+        """ Puts the proxies of a source in the candidates queue until it's exhausted or the pipeline stops """
+        try:
+            for proxy in source():
+                if not self._put(self._candidates, proxy):
+                    break
+        except Exception as error:
+            if self.console is not None:
+                self.console.log(
+                    errors.SOURCE_FAILED(
+                        source_name=source_name,
+                        error=error
+                    )
+                )
+        finally:
+            self._put(self._candidates, _END_OF_STREAM)
+
+    def _put(self, stage_queue: queue.Queue, item) -> bool:
+        """ Puts `item` in `stage_queue`, waiting for room unless the pipeline stops. Returns False if it stopped """
+        while not self._stop.is_set():
+            try:
+                stage_queue.put(item, timeout=0.5)
+
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def _validate(self) -> None:
+        """ Validates the candidates as they come and puts them in the results queue """
+        try:
+            if self.validate_proxies:
+                self.validation_engine.validate(
+                    proxies=self._stream_candidates(),
+                    protocols=self.protocols,
+                    on_validated=self._results.put_nowait
+                )
+            else:
+                for proxy in self._iter_candidates():
+                    helpers.assume_all_protocols(proxy=proxy)
+
+                    if not self._reserve_result():
+                        break
+
+                    self._results.put(proxy)
+        except Exception as error:
+            self._validator_error = error
+        finally:
+            # Unblock the sources still waiting for room, their proxies are dropped
+            self._stop.set()
+            self._results.put(_END_OF_STREAM)
+
+    def _iter_candidates(self) -> Iterable:
+        """ Yields the candidates until every source is exhausted or the pipeline stops """
+        sources_left = len(self.sources)
+
+        while sources_left > 0 and not self._stop.is_set():
+            try:
+                proxy = self._candidates.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            if proxy is _END_OF_STREAM:
+                sources_left -= 1
+                continue
+
+            yield proxy
+
+    async def _stream_candidates(self) -> AsyncIterator:
+        """ Yields the candidates without blocking the validator's event loop, until every source is exhausted or the deadline is reached """
+        loop = asyncio.get_running_loop()
+        sources_left = len(self.sources)
+
+        while sources_left > 0 and not self._stop.is_set() and not self.validation_engine.deadline_reached:
+            try:
+                proxy = await loop.run_in_executor(
+                    None,
+                    functools.partial(self._candidates.get, timeout=0.5)
+                )
+            except queue.Empty:
+                continue
+
+            if proxy is _END_OF_STREAM:
+                sources_left -= 1
+                continue
+
+            # Wait for the sinks to catch up without blocking the event loop
+            if not await loop.run_in_executor(None, self._reserve_result):
+                return
+
+            yield proxy
+
+    def _reserve_result(self) -> bool:
+        """ Reserves room in the results queue for a proxy, waiting for the sinks unless the pipeline stops. Returns False if it stopped """
+        while not self._stop.is_set():
+            if self._results_room.acquire(timeout=0.5):
+                return True
+
+        return False
+
+    def _sink(self) -> None:
+        """ Hands the validated proxies to the sinks in batches, as soon as they are available """
+        is_done = False
+
+        while not is_done:
+            batch = []
+            proxy = self._results.get()
+
+            # Take whatever else is already waiting, without waiting for a full batch
+            while proxy is not _END_OF_STREAM:
+                batch.append(proxy)
+                self._results_room.release()
+
+                if len(batch) >= self.batch_size:
+                    break
+
+                try:
+                    proxy = self._results.get_nowait()
+                except queue.Empty:
+                    break
+
+            is_done = proxy is _END_OF_STREAM
+
+            if len(batch) == 0:
+                continue
+
+            if self._sink_error is not None:
+                # Keep draining so the validator isn't left waiting for room
+                continue
+
+            self.found += len(batch)
+            self.valid += len([proxy for proxy in batch if proxy.is_valid or not self.validate_proxies])
+
+            try:
+                for sink in self.sinks:
+                    sink(batch)
+            except Exception as error:
+                self._sink_error = error
+                self._stop.set()
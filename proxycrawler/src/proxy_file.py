@@ -0,0 +1,153 @@
+import re
+import functools
+
+from typing import Iterator
+
+from rich.console import Console
+from rich.markup import escape
+
+from proxycrawler import (
+    helpers,
+    constants
+)
+from proxycrawler.messages import (
+    info,
+    errors
+)
+
+from proxycrawler.src.seen_set import SeenSet
+
+# Models
+from proxycrawler.src.models.proxy_model import ProxyModel
+
+# A proxy line, <protocol>://<ip>:<port>
+_PROXY_LINE = re.compile(r"^(https?|socks[45])://(\d{1,3}(?:\.\d{1,3}){3}):(\d{1,5})$")
+
+class ProxyFile(object):
+    """
+    Reads the proxies of a proxy list file lazily, so lists of any size can be validated.
+
+    The file is read a chunk of lines at a time and every line is parsed, checked and deduplicated as it's read,
+    the proxies being yielded as `ProxyModel` instances right away. A line that isn't a valid `<protocol>://<ip>:<port>`
+    proxy is reported with its line number and skipped. Only the first `constants.PROXY_FILE_REPORTED_LINES` bad lines
+    are reported, the others are counted.
+
+    A proxy is yielded as soon as the first line listing it is read, so validation starts while the file is still being read.
+    It's tested once on every protocol, the engine sniffing the ones it speaks before probing them, unless `protocols`
+    is given, in which case it's tested on these protocols. Either way the protocol a proxy is listed with doesn't narrow
+    down its test, so the other lines listing the same ip and port are duplicates. The proxies already seen are kept in a
+    `SeenSet` as packed integers, on disk if `on_disk` is enabled so lists larger than the RAM can be deduplicated.
+
+    Attributes:
+        proxy_file_path (str): The path of the proxy list file.
+        protocols (list[str] | None): The protocols to test the proxies on, every protocol the engine sniffs if None.
+        chunk_size (int): The bytes of lines read at a time.
+        on_disk (bool): Keep the proxies already yielded on disk instead of in memory.
+        lines (int): The number of lines read so far.
+        proxies (int): The number of proxies yielded so far.
+        bad_lines (int): The number of lines skipped so far because they aren't valid proxies.
+        duplicates (int): The number of lines skipped so far because their proxy was already listed.
+        console (Console): An instance of the `rich.console.Console` for logging.
+    """
+    def __init__(self, proxy_file_path: str, protocols: list[str] | None = None, chunk_size: int = constants.PROXY_FILE_CHUNK_SIZE, on_disk: bool = False, console: Console | None = None) -> None:
+        self.proxy_file_path = proxy_file_path
+        self.protocols = protocols
+        self.chunk_size = max(1, chunk_size)
+        self.on_disk = on_disk
+        self.console = console
+
+        self.lines = 0
+        self.proxies = 0
+        self.bad_lines = 0
+        self.duplicates = 0
+
+    def __iter__(self) -> Iterator[ProxyModel]:
+        with SeenSet(on_disk=self.on_disk) as seen_proxies:
+            for line_number, line in self.read_lines():
+                if line == "":
+                    continue
+
+                proxy = parse_proxy_line(line=line)
+
+                if proxy is None:
+                    self.report_bad_line(line_number=line_number, line=line)
+                    continue
+
+                _, ip, port = proxy
+
+                if not seen_proxies.add(key=helpers.pack_endpoint(ip=ip, port=port)):
+                    self.duplicates += 1
+                    continue
+
+                yield self.proxy_model(ip=ip, port=port, protocols=self.protocols or constants.PROTOCOLS)
+
+    def proxy_model(self, ip: str, port: int, protocols: list[str]) -> ProxyModel:
+        """ Returns the `ProxyModel` of a proxy of the file, counting it """
+        self.proxies += 1
+
+        return ProxyModel(
+            ip=ip,
+            port=port,
+            protocols=protocols,
+            console=self.console
+        )
+
+    def read_lines(self) -> Iterator[tuple[int, str]]:
+        """
+        Yields the lines of the file with their line number, reading `chunk_size` bytes of lines at a time.
+
+        Args:
+            None
+
+        Yields:
+            tuple[int, str]: The number of the line, starting at 1, and the line without its surrounding whitespace.
+        """
+        with open(self.proxy_file_path, "rb") as proxy_file:
+            for lines in iter(functools.partial(proxy_file.readlines, self.chunk_size), []):
+                for line in lines:
+                    self.lines += 1
+
+                    yield (self.lines, line.decode(errors="replace").strip())
+
+    def report_bad_line(self, line_number: int, line: str) -> None:
+        """ Counts a bad line, logging it unless enough bad lines were already reported """
+        self.bad_lines += 1
+
+        if self.console is None or self.bad_lines > constants.PROXY_FILE_REPORTED_LINES:
+            return
+
+        self.console.log(
+            errors.UNVALID_PROXY_LINE(
+                proxy_file_path=self.proxy_file_path,
+                line_number=line_number,
+                line=escape(line[:100])
+            )
+        )
+
+        if self.bad_lines == constants.PROXY_FILE_REPORTED_LINES:
+            self.console.log(
+                info.BAD_LINES_NOT_REPORTED
+            )
+
+def parse_proxy_line(line: str) -> tuple[str, str, int] | None:
+    """
+    Parses a proxy line in the format <protocol>://<ip>:<port>.
+
+    Args:
+        line (str): The line, without its line break.
+
+    Returns:
+        tuple[str, str, int] | None: The protocol, the IP and the port of the proxy, or None if the line isn't a valid proxy.
+    """
+    match = _PROXY_LINE.match(line)
+
+    if match is None:
+        return None
+
+    protocol, ip, port = match.groups()
+    port = int(port)
+
+    if not 0 < port < 65536 or any(int(octet) > 255 for octet in ip.split(".")):
+        return None
+
+    return (protocol, ip, port)
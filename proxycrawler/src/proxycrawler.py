@@ -1,20 +1,29 @@
-import re
-import ast
 import sys
-import json
-import time
-import requests
+import contextlib
+import functools
 
-from user_agent import generate_user_agent
+from typing import (
+    Iterable,
+    Iterator
+)
 from rich.console import Console
 
+from proxycrawler import constants
+
 from proxycrawler.messages import (
     info,
-    debug,
     errors
 )
+from proxycrawler.src.pipeline import Pipeline
+from proxycrawler.src.proxy_file import ProxyFile
+from proxycrawler.src.output_index import OutputIndex
+from proxycrawler.src.output_formats import get_output_format
+from proxycrawler.src.output_snapshot import OutputSnapshot
+from proxycrawler.src.http_client import HttpClient
 from proxycrawler.src.database.tables import Proxies
 from proxycrawler.src.database.database_handler import DatabaseHandler
+from proxycrawler.src.validation.quorum import Quorum
+from proxycrawler.src.validation.engine import ValidationEngine
 
 # Services
 from proxycrawler.src.services.geonode import Geonode
@@ -35,40 +44,54 @@ class ProxyCrawler:
         free_proxy_list (list): A list that will be used to store the valid proxies scrapped from the service `https://free-proxy-list.com`
         geonnode_proxies_paths (list): A list that will be used to store the valid proxies scrapped from the service `https://geonode.net`
         output_save_paths (list): A list that will store the paths to the files where the proxies where saved. There can be multipule files if the flag `--group-by-protocol` was used wich will seperate the proxies into different files based off their supported protocol
+        unsaved_proxies (list): The valid proxies waiting to be saved to the output file at the end of the crawl, when `enable_save_on_run` is disabled
+        output_snapshots (dict): The `OutputSnapshot` of each output file written in snapshot mode, by output file path, published at the end of the command
 
     """
     free_proxy_list         :   list    = list()
     geonode_proxies_list    :   list    = list()
     output_save_paths       :   list    = list()
+    unsaved_proxies         :   list    = list()
+    output_snapshots        :   dict    = dict()
 
     def __init__(self, database_handler: DatabaseHandler, cli_options: CLIOptions, console: Console | None = None) -> None:
         self.database_handler = database_handler
         self.console = console
         self.cli_options = cli_options
+        self.output_snapshots = dict()
+
+        self.validation_engine = ValidationEngine(
+            concurrency=self.cli_options.concurrency,
+            target_urls=self.cli_options.target_urls,
+            quorum=Quorum(
+                size=self.cli_options.quorum_size,
+                threshold=self.cli_options.quorum_threshold
+            ),
+            deadline=self.cli_options.deadline,
+            console=self.console,
+            debug_mode=self.cli_options.debug_mode
+        )
 
     def crawl_proxies(self) -> None:
         """
         Starts crawling proxies from all the known services
 
-        This method initiates the process of gathering proxy information from various services. It takes several parameters, including options to enable saving the crawled proxies on the run to a file and group them by protocol. Additionally, you can specify a custom output file path for saving the results.
+        This method initiates the process of gathering proxy information from various services. The services are streamed through a `Pipeline`, so the proxies are validated while the services are still being crawled and reach the database and the output file as soon as they are validated. It takes several parameters, including options to enable saving the crawled proxies on the run to a file and group them by protocol. Additionally, you can specify a custom output file path for saving the results.
 
         Args:
             None.
         Returns:
             None: this method doesn't return anything.
         """
+        http_client = HttpClient()
         geonode = Geonode(
             console=self.console,
-            database_handler=self.database_handler,
-            save_proxies_to_file=self.save_proxies_to_file,
-            enable_save_on_run=self.cli_options.enable_save_on_run,
-            group_by_protocol=self.cli_options.group_by_protocol,
-            validate_proxies=self.cli_options.validate_proxies,
-            output_file_path=self.cli_options.output_file_path
+            validation_engine=self.validation_engine,
+            http_client=http_client,
+            validate_proxies=self.cli_options.validate_proxies
         )
         free_proxy_list = FreeProxyList(
-            database_handler=self.database_handler,
-            validate_proxies=self.cli_options.validate_proxies,
+            http_client=http_client,
             console=self.console
         )
 
@@ -77,43 +100,47 @@ class ProxyCrawler:
             "geonode": geonode
         }
 
-        for service in services:
-            service_name    =   service
-            service         =   services[service]
-            service_url     =   service.url
+        self.output_save_paths = list()
+        self.unsaved_proxies = list()
 
-            self.console.log(
-                info.USING_SERVICE(
-                    service_name=service_name,
-                    service_url=service_url
-                )
-            )
-
-            # Fetching and validating proxies from `service_name`
-            service.fetch_proxies()
-
-            proxies = service.found_proxies
+        # The services are crawled at the same time and their proxies are
+        # validated and saved as soon as they are parsed
+        pipeline = Pipeline(
+            sources={
+                service_name: functools.partial(self.stream_service_proxies, service_name, service)
+                for service_name, service in services.items()
+            },
+            sinks=[
+                self.save_crawled_proxies_to_database,
+                self.save_crawled_proxies_to_file
+            ],
+            validation_engine=self.validation_engine,
+            validate_proxies=self.cli_options.validate_proxies,
+            protocols=constants.PROTOCOLS,
+            console=self.console
+        )
 
-            # Save to the output file on the run in case
-            # `self.enable_save_on_run` was enabled
-            if not self.cli_options.enable_save_on_run:
-                # Saving the proxies to the database
-                for proxy in proxies:
-                    proxy = proxy.export_table_row()
+        try:
+            pipeline.run()
+        finally:
+            http_client.close()
+            self.database_handler.flush()
 
-                    self.database_handler.save_proxy(
-                        proxy=proxy
-                    )
-                
-                continue
+        # Keep the database bounded over months of crawling
+        compaction = self.database_handler.compact_if_due()
 
-            self.output_save_paths = self.save_proxies_to_file(proxies=proxies)
+        if compaction is not None:
+            self.console.log(
+                info.DATABASE_COMPACTED(**compaction)
+            )
 
+        # Save to the output file at the end unless `enable_save_on_run` was enabled
         if not self.cli_options.enable_save_on_run:
-            for service in services:
-                proxies = services[service].valid_proxies
+            self.add_output_save_paths(
+                self.save_proxies_to_file(proxies=self.unsaved_proxies)
+            )
 
-                self.output_save_paths = self.save_proxies_to_file(proxies=proxies)
+        self.publish_output_snapshots()
 
         self.console.log(
             info.PROXIES_SAVED_IN_PATHS(
@@ -121,53 +148,215 @@ class ProxyCrawler:
             )
         )
 
+    def stream_service_proxies(self, service_name: str, service: FreeProxyList | Geonode) -> Iterator[FreeProxyListModel | GeonodeModel]:
+        """
+        Yields the proxies of a service as soon as they are parsed
+
+        Args:
+            service_name (str): The name of the service.
+            service (FreeProxyList | Geonode): The service.
+
+        Yields:
+            FreeProxyListModel | GeonodeModel: The proxies of the service, not validated yet.
+        """
+        self.console.log(
+            info.USING_SERVICE(
+                service_name=service_name,
+                service_url=service.url
+            )
+        )
+
+        yield from service.stream_proxies()
+
+    def save_crawled_proxies_to_database(self, proxies: list[FreeProxyListModel | GeonodeModel]) -> None:
+        """
+        Buffers a batch of crawled proxies to be saved to the database, valid or not
+
+        Args:
+            proxies (list): The batch of proxies coming out of the pipeline.
+
+        Returns:
+            None: This method doesn't return anything.
+        """
+        for proxy in proxies:
+            self.database_handler.add_proxy(
+                proxy=proxy.export_table_row()
+            )
+
+    def save_checked_proxy_to_database(self, proxy: Proxies) -> None:
+        """
+        Queues the outcome of the check of a proxy of the database to be saved, without waiting for it to be written
+
+        The proxy's averages were updated by the validation engine from the values it was loaded with, while saving a proxy
+        folds its check into the saved averages. So the check is saved as a new row that starts its averages from the check only,
+        the way crawled proxies are saved, and the database folds it into the proxy's current averages.
+
+        Args:
+            proxy (Proxies): The validated proxy.
+
+        Returns:
+            None: This method doesn't return anything.
+        """
+        checked_proxy = Proxies(
+            proxy_id=proxy.proxy_id,
+            ip=proxy.ip,
+            port=proxy.port,
+            protocol_mask=proxy.protocol_mask,
+            country=proxy.country,
+            is_valid=proxy.is_valid,
+            latencies=proxy.latencies,
+            connect_time=proxy.connect_time,
+            first_byte_time=proxy.first_byte_time,
+            total_time=proxy.total_time,
+            last_checked_at=proxy.last_checked_at,
+            last_valid_at=proxy.last_valid_at,
+            success_rate=1.0 if proxy.is_valid else 0.0,
+            latency_ewma=proxy.total_time
+        )
+        checked_proxy.verdicts = getattr(proxy, "verdicts", None)
+
+        self.database_handler.add_proxy(
+            proxy=checked_proxy
+        )
+
+    def save_crawled_proxies_to_file(self, proxies: list[FreeProxyListModel | GeonodeModel]) -> None:
+        """
+        Saves the valid proxies of a batch of crawled proxies to the output file, or keeps them for the end of the run unless `enable_save_on_run` is enabled
+
+        Args:
+            proxies (list): The batch of proxies coming out of the pipeline.
+
+        Returns:
+            None: This method doesn't return anything.
+        """
+        valid_proxies = [
+            proxy for proxy in proxies if proxy.is_valid or not self.cli_options.validate_proxies
+        ]
+
+        for proxy in valid_proxies:
+            self.console.log(
+                info.FOUND_A_VALID_PROXY(
+                    proxy=proxy
+                )
+            )
+
+        if len(valid_proxies) == 0:
+            return
+
+        if not self.cli_options.enable_save_on_run:
+            self.unsaved_proxies.extend(valid_proxies)
+            return
+
+        self.add_output_save_paths(
+            self.save_proxies_to_file(proxies=valid_proxies)
+        )
+
+    def output_file_paths(self, output_file_path: str) -> tuple[str, str]:
+        """
+        Returns the path to write the proxies of `output_file_path` to, and the path to report to the user.
+        In snapshot mode they are written to the staging file of the output file's `OutputSnapshot` and read from its `latest` symlink.
+
+        Args:
+            output_file_path (str): The path of the output file.
+
+        Returns:
+            tuple[str, str]: The path to write to and the path to report.
+        """
+        if not self.cli_options.snapshot:
+            return (output_file_path, output_file_path)
+
+        if output_file_path not in self.output_snapshots:
+            self.output_snapshots[output_file_path] = OutputSnapshot(output_file_path)
+
+        output_snapshot = self.output_snapshots[output_file_path]
+
+        return (output_snapshot.staging_path, output_snapshot.latest_path)
+
+    def publish_output_snapshots(self) -> None:
+        """ Publishes the generation written by the command of each output file, in snapshot mode """
+        for output_snapshot in self.output_snapshots.values():
+            generation_path = output_snapshot.publish()
+
+            if generation_path is None:
+                continue
+
+            self.console.log(
+                info.SNAPSHOT_PUBLISHED(
+                    generation_path=generation_path,
+                    latest_path=output_snapshot.latest_path
+                )
+            )
+
+        self.output_snapshots = dict()
+
+    def add_output_save_paths(self, output_save_paths: list[str]) -> None:
+        """ Adds the paths that are not known yet to `self.output_save_paths` """
+        for output_save_path in output_save_paths:
+            if output_save_path not in self.output_save_paths:
+                self.output_save_paths.append(output_save_path)
+
     def export_database_proxies(self) -> None:
         """
         Export a number of proxies from the database and validate them
 
+        The proxies are streamed out of the database a chunk at a time and written to the output file as they come,
+        so the memory used doesn't depend on the size of the table. Only sorting freshly validated proxies by latency or score
+        needs to keep the valid proxies in memory.
+
         Args:
             None.
         
         Returns:
             None: This method doesn't return anything.
         """
-        saved_database_proxies = self.database_handler.fetch_proxies(
-            proxies_count=self.cli_options.proxies_count
-        )
-        valid_proxies = []
+        filters = {
+            "proxies_count": self.cli_options.proxies_count,
+            "sort_by": self.cli_options.sort_by,
+            "max_latency": self.cli_options.max_latency,
+            "protocol": self.cli_options.protocol,
+            "country": self.cli_options.country,
+            "only_valid": self.cli_options.only_valid,
+            "checked_within": self.cli_options.checked_within
+        }
+        proxies_count = self.database_handler.count_proxies(**filters)
 
-        if len(saved_database_proxies) == 0:
+        if proxies_count == 0:
             self.console.log(
                 errors.NO_PROXIES_WHERE_FOUND_IN_THE_DATABASE
             )
             sys.exit(1)
 
-        if valid_proxies:
+        saved_database_proxies = self.database_handler.stream_proxies(**filters)
+        self.output_save_paths = list()
+
+        if not self.cli_options.validate_proxies:
             self.console.log(
-                info.FETCHED_PROXIES_FROM_THE_DATABASE_VALIDATING(
-                    count=len(saved_database_proxies)
+                info.FETCHED_PROXIES_FROM_THE_DATABASE_WITHOUT_VALIDATING(
+                    count=proxies_count
                 )
             )
+
+            self.output_save_paths = self.save_proxies_to_file(
+                proxies=saved_database_proxies
+            )
         else:
             self.console.log(
-                info.FETCHED_PROXIES_FROM_THE_DATABASE_WITHOUT_VALIDATING(
-                    count=len(saved_database_proxies)
+                info.FETCHED_PROXIES_FROM_THE_DATABASE_VALIDATING(
+                    count=proxies_count
                 )
             )
-        
-        for proxy in saved_database_proxies:
-            proxy = proxy[0]
 
-            if not self.cli_options.validate_proxies:
-                valid_proxies.append(proxy)
-                continue
+            valid_proxies = []
 
-            if self.validate_db_proxies(proxy=proxy):
-                valid_proxies.append(proxy)
+            def save_validated_proxy(proxy: Proxies) -> None:
+                self.save_checked_proxy_to_database(proxy=proxy)
 
-                self.database_handler.update_proxy_valid_value(
-                    proxy=proxy
-                )
+                if not proxy.is_valid:
+                    return
+
+                # Filter on the freshly measured latency
+                if self.cli_options.max_latency is not None and proxy.total_time > self.cli_options.max_latency:
+                    return
 
                 self.console.log(
                     info.FOUND_A_VALID_PROXY(
@@ -175,184 +364,196 @@ class ProxyCrawler:
                     )
                 )
 
-            else:
-                proxy.is_valid = False
+                valid_proxies.append(proxy)
 
-                self.database_handler.update_proxy_valid_value(
-                    proxy=proxy
+                # Ranking needs every valid proxy, otherwise they are written a chunk at a time
+                if self.cli_options.sort_by is None and len(valid_proxies) >= constants.DATABASE_CHUNK_SIZE:
+                    self.add_output_save_paths(
+                        self.save_proxies_to_file(proxies=valid_proxies)
+                    )
+                    valid_proxies.clear()
+
+            try:
+                self.validation_engine.validate(
+                    proxies=saved_database_proxies,
+                    on_validated=save_validated_proxy
                 )
-        if len(valid_proxies) == 0 and not self.cli_options.validate_proxies:
-            self.output_save_paths = self.save_proxies_to_file(proxies=saved_database_proxies)
-        else:
-            self.output_save_paths = self.save_proxies_to_file(
-                proxies=valid_proxies
+            finally:
+                self.database_handler.flush()
+
+            # Rank on the freshly measured latencies and scores
+            if self.cli_options.sort_by == "latency":
+                valid_proxies.sort(key=lambda proxy: proxy.total_time)
+            elif self.cli_options.sort_by == "score":
+                valid_proxies.sort(key=lambda proxy: proxy.health_score, reverse=True)
+
+            self.add_output_save_paths(
+                self.save_proxies_to_file(proxies=valid_proxies)
             )
 
+        self.publish_output_snapshots()
+
         self.console.log(
                 info.PROXIES_SAVED_IN_PATHS(
                     output_file_paths=self.output_save_paths
                 )
             )
 
-    def validate_db_proxies(self, proxy: Proxies) -> bool:
+    def revalidate_proxies(self) -> None:
         """
-        Validate proxies from the database
+        Revalidates the proxies of the database that are due, within the run's budget
+
+        A proxy is due once its last check is older than its TTL, which is shorter for flaky proxies than for stable ones.
+        The due proxies are revalidated by priority, the ones with the best scores first, and at most `budget` of them per run,
+        so a fixed amount of probing keeps the most useful part of the database fresh. The others are left for the next runs.
 
         Args:
-            proxy (Proxies): A proxy record representing a row in the 'Proxies' table.
+            None.
 
         Returns:
-            bool: True if the proxy is valid, otherwise False is returned.
+            None: This method doesn't return anything.
         """
-        if isinstance(proxy.proxy, str):
-            proxy.proxy = json.loads(proxy.proxy)
+        due_count = self.database_handler.count_proxies(due=True)
 
-        delay_time = 7
-        status_codes = []
-        headers = {
-            "User-Agent": generate_user_agent()
-        }
+        if due_count == 0:
+            self.console.log(
+                info.NO_PROXIES_DUE
+            )
+            return
 
-        for _ in range(3):
-            time.sleep(delay_time)
-            try:
-                response = requests.get(
-                        "https://google.com",
-                        headers=headers,
-                        proxies=proxy.proxy
-                    )
-                status_codes.append(response.status_code)
-            except requests.exceptions.ProxyError as error:
-                if self.cli_options.debug_mode:
-                    self.console.log(
-                        debug.EXCEPTION_RAISED_WHEN_VALIDATING_PROXY(
-                            proxy=proxy.proxy,
-                            error=error
-                        )
-                    )
-            except Exception as error:
-                if self.cli_options.debug_mode:
-                    self.console.log(
-                        debug.EXCEPTION_RAISED_WHEN_VALIDATING_PROXY(
-                            proxy=proxy.proxy,
-                            error=error
-                        )
-                    )
+        self.console.log(
+            info.REVALIDATING_PROXIES(
+                count=min(due_count, self.cli_options.budget),
+                due=due_count
+            )
+        )
+
+        checked_proxies = []
+        valid_proxies = []
+
+        def save_revalidated_proxy(proxy: Proxies) -> None:
+            self.save_checked_proxy_to_database(proxy=proxy)
 
-        if status_codes.count(200) >= 2:
-            proxy.is_valid = True
+            checked_proxies.append(proxy.proxy_id)
 
-        return proxy.is_valid
+            if proxy.is_valid:
+                valid_proxies.append(proxy.proxy_id)
 
-    def validate_proxies(self, proxies: list[str]) -> None:
+        try:
+            self.validation_engine.validate(
+                proxies=self.database_handler.stream_proxies(
+                    proxies_count=self.cli_options.budget,
+                    sort_by="priority",
+                    due=True
+                ),
+                on_validated=save_revalidated_proxy
+            )
+        finally:
+            self.database_handler.flush()
+
+        self.console.log(
+            info.REVALIDATION_SUMMARY(
+                checked=len(checked_proxies),
+                valid=len(valid_proxies),
+                left=due_count - len(checked_proxies)
+            )
+        )
+
+    def validate_proxies(self, proxy_file: ProxyFile) -> None:
         """
         Validates proxies from a proxy list file
 
+        The file is streamed through a `Pipeline`, so the valid proxies reach the database and the output file
+        as soon as they are validated. Each proxy is validated once, as soon as it's read, see `ProxyFile`.
+        The memory used doesn't depend on the size of the file.
+
         Args:
-            proxies (list[str]): A list of proxies in plain text in the format <protocol>://<ip>:<port>.
-    
+            proxy_file (ProxyFile): The proxy list file, read lazily.
+
         Returns:
             None: This method doesn't return anything.
         """
-        protocols = [
-            "http",
-            "https",
-            "socks4",
-            "socks5"
-        ]
-        valid_proxies = []
-
-        # In case of a protocol was specified to test the proxies
-        # on or in case the user chose to test all the protocols
-        # on the proxies, we need to make sure we are revalidating
-        # the same proxy because the list may contain the same proxy
-        # but with different procotols, wich is why we keep track of
-        # them here in the `processed_proxies`
-        processed_proxies = []
-
-        for proxy in proxies:
-            if proxy == "":
-                continue
-
-            ip = proxy.split("/")[2].split(":")[0]
-            port= proxy.split(":")[-1]
-            proxy_protocols = None
-
-            # Determining wich protocols to use
-            if not self.cli_options.test_all_protocols:
-                if self.cli_options.protocol is None:
-                    proxy_protocols = [proxy.split("/")[0].replace(":", "")]
-                else:
-                    # Skip the proxy if already processed
-                    if proxy.split("/")[2] in processed_proxies:
-                        continue
-
-                    proxy_protocols = [self.cli_options.protocol]
-            else:
-                # Skip the proxy if already processed
-                if proxy.split("/")[2] in processed_proxies:
-                    continue
-
-                proxy_protocols = protocols
-
-            proxy = ProxyModel(
-                ip=ip,
-                port=port,
-                protocols=proxy_protocols,
-                console=self.console
-            )
-
-            if proxy.validate():
-                valid_proxies.append(proxy)
-
-                self.console.log(
-                    info.FOUND_A_VALID_PROXY(
-                        proxy=proxy
-                    )
-                )
+        if self.cli_options.output_file_path is None:
+            self.cli_options.output_file_path = f"{self.cli_options.proxy_file_path.split('/')[-1].replace('.txt', '')}-valid{get_output_format(self.cli_options.output_format).extension}"
 
-                # Save proxy to the database
-                self.database_handler.save_proxy(
-                    proxy=proxy.export_table_row()
-                )
+        self.output_save_paths = list()
 
-            processed_proxies.append(f"{proxy.ip}:{proxy.port}")
+        pipeline = Pipeline(
+            sources={
+                "proxy_file": lambda: proxy_file
+            },
+            sinks=[
+                self.save_validated_proxies
+            ],
+            validation_engine=self.validation_engine,
+            console=self.console
+        )
 
-        if self.cli_options.output_file_path is None:
-            self.cli_options.output_file_path = f"{self.cli_options.proxy_file_path.split('/')[-1].replace('.txt', '')}-valid.txt"
+        try:
+            pipeline.run()
+        finally:
+            self.database_handler.flush()
 
-        self.output_save_paths = self.save_proxies_to_file(
-            proxies=valid_proxies
+        self.console.log(
+            info.PROXY_FILE_SUMMARY(
+                lines=proxy_file.lines,
+                proxies=proxy_file.proxies,
+                bad_lines=proxy_file.bad_lines,
+                duplicates=proxy_file.duplicates
+            )
         )
 
+        self.publish_output_snapshots()
+
         self.console.log(
             info.PROXIES_SAVED_IN_PATHS(
                 output_file_paths=self.output_save_paths
             )
         )
 
-    def check_proxy_fromat(self, proxy: str) -> bool:
+    def save_validated_proxies(self, proxies: list[ProxyModel]) -> None:
         """
-        Checks the format of the proxy.
-        The supported format is <protocol>://<ip>:<port>.
+        Saves the valid proxies of a batch of proxies validated from a proxy list file to the database and the output file
 
         Args:
-            proxy (str): The proxy info in plain text.
+            proxies (list[ProxyModel]): The batch of proxies coming out of the pipeline.
 
         Returns:
-            bool: True if the proxy's format is valid, otherwise False is returned.
+            None: This method doesn't return anything.
         """
-        regex =  r"^(https?|socks[45])://\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}:\d+"
+        valid_proxies = [
+            proxy for proxy in proxies if proxy.is_valid
+        ]
+
+        if len(valid_proxies) == 0:
+            return
 
-        return re.match(regex, proxy)
+        for proxy in valid_proxies:
+            self.console.log(
+                info.FOUND_A_VALID_PROXY(
+                    proxy=proxy
+                )
+            )
 
-    def save_proxies_to_file(self, proxies: list[FreeProxyListModel | GeonodeModel | ProxyModel]) -> list[str]:
+            self.database_handler.add_proxy(
+                proxy=proxy.export_table_row()
+            )
+
+        self.add_output_save_paths(
+            self.save_proxies_to_file(proxies=valid_proxies)
+        )
+
+    def save_proxies_to_file(self, proxies: Iterable[FreeProxyListModel | GeonodeModel | ProxyModel | Proxies]) -> list[str]:
         """
         Saves proxies to the output file path.
         In case no `output_file_path` was given the proxies will be saved based on if `group_by_protocol` is turned on.
+        The proxies are written one at a time, so `proxies` can be a lazy iterable of any size.
+        Each output file is written through its `OutputIndex`, so a proxy the file already holds isn't written again.
+        In snapshot mode the proxies are written to the staging file of the output file's `OutputSnapshot` instead, see `output_file_paths`.
+        The proxies are written in the `output_format` of the CLI options, from their `export_dict()`.
 
         Args:
-            proxies (list): List of instance of models `FreeProxyListMode`, `GeonodeModel` and `ProxyModel`.
+            proxies (Iterable): Instances of models `FreeProxyListMode`, `GeonodeModel` and `ProxyModel`, or rows of the `Proxies` table.
 
         Returns:
             list[str]: Returns a list paths `self.output_save_paths` where the proxies where saved. `
@@ -362,66 +563,74 @@ class ProxyCrawler:
         """
         output_save_paths = []
 
+        output_format = get_output_format(self.cli_options.output_format)
+
         if self.cli_options.output_file_path is None:
-            self.cli_options.output_file_path = "./proxycrawler-proxies.txt"
+            self.cli_options.output_file_path = f"./proxycrawler-proxies{output_format.extension}"
 
         if not self.cli_options.group_by_protocol:
-            with open(self.cli_options.output_file_path, "a") as save_proxies:
-                data = []
+            write_path, save_path = self.output_file_paths(self.cli_options.output_file_path)
 
+            with OutputIndex(write_path, read_keys=output_format.read_keys) as output_index, output_format.open(write_path) as save_proxies:
                 for proxy_data in proxies:
-                    if isinstance(proxy_data.proxy, str):
-                        proxy_data.proxy = json.loads(proxy_data.proxy) # Reattache to a session
-
-                    for proxy in proxy_data.proxy:
-                        data.append(f"{proxy_data.proxy[proxy]}\n")
-
-                save_proxies.write(''.join(data))
+                    save_proxies.writelines(
+                        record for key, record in output_format.records(proxy_data.export_dict()) if output_index.add(key)
+                    )
 
-            output_save_paths.append(self.cli_options.output_file_path)
+            output_save_paths.append(save_path)
 
             return output_save_paths
 
         protocols = {
             "http": {
-                "output_file_path": f"{'/'.join(self.cli_options.output_file_path.split('/')[:-1])}/proxies-http.txt",
-                "proxies": set()
+                "output_file_path": f"{'/'.join(self.cli_options.output_file_path.split('/')[:-1])}/proxies-http{output_format.extension}",
+                "file": None,
+                "index": None,
+                "save_path": None
             },
             "https": {
-                "output_file_path": f"{'/'.join(self.cli_options.output_file_path.split('/')[:-1])}/proxies-https.txt",
-                "proxies": set()
+                "output_file_path": f"{'/'.join(self.cli_options.output_file_path.split('/')[:-1])}/proxies-https{output_format.extension}",
+                "file": None,
+                "index": None,
+                "save_path": None
             },
             "socks4": {
-                "output_file_path": f"{'/'.join(self.cli_options.output_file_path.split('/')[:-1])}/proxies-socks4.txt",
-                "proxies": set()
+                "output_file_path": f"{'/'.join(self.cli_options.output_file_path.split('/')[:-1])}/proxies-socks4{output_format.extension}",
+                "file": None,
+                "index": None,
+                "save_path": None
             },
             "socks5": {
-                "output_file_path": f"{'/'.join(self.cli_options.output_file_path.split('/')[:-1])}/proxies-socks5.txt",
-                "proxies": set()
+                "output_file_path": f"{'/'.join(self.cli_options.output_file_path.split('/')[:-1])}/proxies-socks5{output_format.extension}",
+                "file": None,
+                "index": None,
+                "save_path": None
             }
         }
 
-        # Load the proxies into the "proxies" key in
-        # protocols based on the supported protocol
-        for proxy in proxies:
-            if isinstance(proxy.proxy, str):
-                proxy.proxy = json.loads(proxy.proxy)
+        # Write the proxies into the "output_file_path" of each protocol
+        # they support, a file is only opened once a proxy supports its protocol.
+        # The files are closed before their index is committed
+        with contextlib.ExitStack() as output_files:
+            for proxy in proxies:
+                proxy_data = proxy.export_dict()
 
-            if isinstance(proxy.protocols, str):
-                proxy.protocols = ast.literal_eval(proxy.protocols)
+                for protocol in proxy_data["proxy"]:
+                    if protocols[protocol]["file"] is None:
+                        write_path, protocols[protocol]["save_path"] = self.output_file_paths(protocols[protocol]["output_file_path"])
 
-            for protocol in proxy.protocols:
-                protocols[protocol]["proxies"].add(f"{proxy.proxy[protocol]}\n")
+                        protocols[protocol]["index"] = output_files.enter_context(OutputIndex(write_path, read_keys=output_format.read_keys))
+                        protocols[protocol]["file"] = output_files.enter_context(output_format.open(write_path))
+
+                    for key, record in output_format.records(proxy_data, protocols=[protocol]):
+                        if protocols[protocol]["index"].add(key):
+                            protocols[protocol]["file"].write(record)
 
-        # Save the proxies into the corresponding "output_file_path" key's value
         for protocol in protocols:
-            # Don't save in case no proxies supports this `protocol`
-            if not len(protocols[protocol]["proxies"]) > 0:
+            # Don't report the file in case no proxies supports this `protocol`
+            if protocols[protocol]["file"] is None:
                 continue
 
-            with open(protocols[protocol]["output_file_path"], "a") as save_proxies:
-                save_proxies.write(''.join(protocols[protocol]["proxies"]))
-
-            output_save_paths.append(protocols[protocol]["output_file_path"])
+            output_save_paths.append(protocols[protocol]["save_path"])
 
         return output_save_paths
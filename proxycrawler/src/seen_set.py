@@ -0,0 +1,70 @@
+import sqlite3
+
+from proxycrawler import constants
+
+class SeenSet(object):
+    """
+    A set of integer keys, like the endpoints packed by `helpers.pack_endpoint`, used to skip what was already seen.
+
+    The keys are kept in a Python set of ints by default, a few dozen bytes per key. The on-disk mode keeps them in a
+    temporary SQLite database instead, its B-tree being keyed by the integers themselves, so the memory used is bounded
+    by `constants.SEEN_SET_CACHE_SIZE` whatever the number of keys, at the cost of slower lookups once they don't fit in the cache.
+    The database is removed when the set is closed.
+
+    Attributes:
+        on_disk (bool): The keys are kept on disk instead of in memory.
+        size (int): The number of keys in the set.
+    """
+    def __init__(self, on_disk: bool = False) -> None:
+        self.on_disk = on_disk
+        self.size = 0
+
+        self._keys: set[int] = set()
+        self._connection: sqlite3.Connection | None = None
+
+        if self.on_disk:
+            # An empty path opens a private database in a temporary file, removed once it's closed
+            self._connection = sqlite3.connect("")
+            self._connection.execute("PRAGMA journal_mode = OFF")
+            self._connection.execute("PRAGMA synchronous = OFF")
+            self._connection.execute(f"PRAGMA cache_size = -{constants.SEEN_SET_CACHE_SIZE}")
+            self._connection.execute("CREATE TABLE seen (key INTEGER PRIMARY KEY)")
+
+    def __enter__(self) -> "SeenSet":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, key: int) -> bool:
+        """
+        Adds a key to the set.
+
+        Args:
+            key (int): The key, at most 63 bits wide.
+
+        Returns:
+            bool: True if the key wasn't in the set yet, otherwise False.
+        """
+        if self._connection is not None:
+            is_new = self._connection.execute("INSERT OR IGNORE INTO seen (key) VALUES (?)", (key,)).rowcount == 1
+        else:
+            is_new = key not in self._keys
+
+            if is_new:
+                self._keys.add(key)
+
+        self.size += is_new
+
+        return is_new
+
+    def close(self) -> None:
+        """ Drops the keys, removing the on-disk database """
+        self._keys = set()
+
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
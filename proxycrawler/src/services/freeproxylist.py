@@ -1,15 +1,16 @@
 import requests
 
+from typing import Iterator
+
 from bs4 import BeautifulSoup
 from rich.console import Console
-from user_agent import generate_user_agent
 
 from proxycrawler.messages import (
     info,
     errors
 )
 
-from proxycrawler.src.database.database_handler import  DatabaseHandler
+from proxycrawler.src.http_client import HttpClient
 
 # Models
 from proxycrawler.src.models.free_proxy_list_model import FreeProxyListModel
@@ -20,39 +21,41 @@ class FreeProxyList:
 
     Attributes:
         url (str): The official url for `free-proxy-list`.
-        found_proxies (list[FreeProxyListModel]): A list of valid proxies represented in instances of the `FreeProxyListModel` class.
     """
     url                 :       str                         =   "https://free-proxy-list.net"
-    found_proxies       :       list[FreeProxyListModel]    =   list()
 
-    def __init__(self, database_handler: DatabaseHandler, console: Console, validate_proxies: bool | None = False):
-        self.database_handler = database_handler
+    def __init__(self, console: Console, http_client: HttpClient):
+        self.http_client = http_client
         self.console = console
-        self.validate_proxies = validate_proxies
 
-    def fetch_proxies(self) -> list[FreeProxyListModel]:
+    def stream_proxies(self) -> Iterator[FreeProxyListModel]:
         """
-        Fetches proxies from `free-proxy-list.com` by scrapping them.
+        Scraps the proxies from `free-proxy-list.com` and yields them as soon as they are parsed, without validating nor saving them.
 
         Args:
             None
 
-        Returns:
-            list[FreeProxyListModel]: Returns a list of valid proxies represented in instances of the `FreeProxyListModel` class.
+        Yields:
+            FreeProxyListModel: The scrapped proxies.
         """
-        headers = {
-            "User-Agent": generate_user_agent()
-        }
         self.console.log(
             info.REQUESTING_FREE_PROXY_LIST(
                 url=self.url
             )
         )
 
-        response = requests.get(
-            self.url,
-            headers=headers
-        )
+        try:
+            response = self.http_client.get(
+                self.url
+            )
+        except requests.exceptions.RequestException as error:
+            self.console.log(
+                errors.FAILD_TO_REQUEST_FREE_PROXY_LIST(
+                    error=error
+                )
+            )
+
+            return
 
         if response.status_code != 200:
             self.console.log(
@@ -65,9 +68,8 @@ class FreeProxyList:
             response.content,
             "html.parser"
         )
-        rows = soup.find_all("tr")
 
-        for row in rows:
+        for row in soup.find_all("tr"):
             proxy = FreeProxyListModel(
                 console=self.console
             )
@@ -83,30 +85,4 @@ class FreeProxyList:
                 proxy.https               =   parts[6].text
                 proxy.last_checked        =   parts[7].text
 
-                self.found_proxies.append(proxy)
-                
-                proxy_table = proxy.export_table_row()
-
-                if self.validate_proxies:
-                    if proxy.validate():
-                        proxy_table.is_valid = True
-                else:
-                    # Since we don't know what protocols does the proxy support
-                    # we will just set it to all.
-                    proxy.proxy = {
-                        "http": f"http://{proxy.ip}:{proxy.port}",
-                        "socks4": f"socks4://{proxy.ip}:{proxy.port}",
-                        "socks5": f"socks5://{proxy.ip}:{proxy.port}",
-                    }
-                    proxy.protocols = ["http", "socks4", "socks5"]
-                
-                # Save to database
-                self.database_handler.save_proxy(proxy=proxy_table)
-                
-                self.console.log(
-                    info.FOUND_A_VALID_PROXY(
-                        proxy=proxy
-                    )
-                )
-
-        return self.found_proxies
+                yield proxy
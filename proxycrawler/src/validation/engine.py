@@ -0,0 +1,436 @@
+import time
+import asyncio
+import datetime
+import itertools
+
+from urllib.parse import urlsplit
+
+from typing import (
+    Callable,
+    Iterable,
+    AsyncIterable
+)
+
+from rich.console import Console
+
+from proxycrawler import (
+    helpers,
+    constants
+)
+from proxycrawler.messages import (
+    info,
+    debug
+)
+from proxycrawler.src.validation.probe import (
+    probe,
+    ProbeTimeouts
+)
+from proxycrawler.src.validation.quorum import (
+    Quorum,
+    QuorumVerdict
+)
+from proxycrawler.src.validation.sniffer import sniff
+from proxycrawler.src.validation.scheduler import RetryScheduler
+
+class ValidationEngine(object):
+    """
+    Validates proxies concurrently using asyncio.
+
+    The protocols a proxy may speak are first sniffed on a single connection, then every remaining protocol
+    is voted on by a `Quorum` of probes, which stops as soon as the verdict is known.
+    The number of probes in flight is capped by `concurrency`, the delay between probes is decided by a `RetryScheduler`.
+    The results are written back into the proxies, which can be instances of `FreeProxyListModel`, `GeonodeModel`,
+    `ProxyModel` or rows of the `Proxies` table. The verdict of each protocol is kept in the proxy's `verdicts`
+    and the latency of each valid protocol in its `latencies`, the fastest one also sets the proxy's `connect_time`,
+    `first_byte_time` and `total_time` (in milliseconds).
+
+    Every phase of a probe has its own timeout, every proxy has `proxy_deadline` seconds to be validated
+    and the whole run can be given a `deadline`, once it's reached the unfinished proxies are cancelled
+    and left untouched while the ones that were validated are returned as usual.
+
+    Attributes:
+        concurrency (int): The maximum number of probes in flight.
+        target_urls (list[str]): The URLs requested through the proxies, probes go through them in turn.
+        scheduler (RetryScheduler): Decides the backoff and politeness delays between probes.
+        quorum (Quorum): The number of probes sent per protocol and how many of them must succeed.
+        sniff_protocols (bool): Sniff the protocols before probing them end to end.
+        timeouts (ProbeTimeouts): The connect, TLS and first byte timeouts of each probe.
+        proxy_deadline (float): Seconds a single proxy can take to be validated, its unfinished protocols are considered invalid.
+        deadline (float | None): Seconds the engine can spend validating, counted from its creation. None means no deadline.
+        proxies_cancelled (int): The number of proxies cancelled by the deadline so far.
+        probes_sent (int): The number of probes sent so far.
+        probes_skipped (int): The number of probes skipped by an early quorum verdict so far.
+        time_saved (float): The estimated seconds saved by the skipped probes so far.
+        console (Console): An instance of the `rich.console.Console` for logging.
+        debug_mode (bool): Log the exceptions raised when probing.
+    """
+    def __init__(self, concurrency: int = constants.DEFAULT_CONCURRENCY, target_urls: list[str] | None = None, scheduler: RetryScheduler | None = None, quorum: Quorum | None = None, sniff_protocols: bool = True, timeouts: ProbeTimeouts | None = None, proxy_deadline: float = constants.PROXY_DEADLINE, deadline: float | None = None, console: Console | None = None, debug_mode: bool = False) -> None:
+        self.concurrency = max(1, concurrency)
+        self.target_urls = list(target_urls) if target_urls else list(constants.VALIDATION_TARGETS)
+        self.scheduler = scheduler if scheduler is not None else RetryScheduler()
+        self.quorum = quorum if quorum is not None else Quorum()
+        self.sniff_protocols = sniff_protocols
+        self.timeouts = timeouts if timeouts is not None else ProbeTimeouts()
+        self.proxy_deadline = proxy_deadline
+        self.deadline = deadline
+        self.console = console
+        self.debug_mode = debug_mode
+
+        self.probes_sent = 0
+        self.probes_skipped = 0
+        self.time_saved = 0.0
+        self.proxies_cancelled = 0
+
+        self._semaphore: asyncio.Semaphore | None = None
+        self._targets = itertools.cycle(self.target_urls)
+        self._deadline_at: float | None = time.monotonic() + deadline if deadline is not None else None
+
+    @property
+    def deadline_reached(self) -> bool:
+        """ True once the run's deadline has passed """
+        return self._deadline_at is not None and time.monotonic() >= self._deadline_at
+
+    def _time_left(self) -> float | None:
+        """ Seconds left before the run's deadline, None if there is no deadline """
+        if self._deadline_at is None:
+            return None
+
+        return max(0.0, self._deadline_at - time.monotonic())
+
+    def validate(self, proxies: Iterable | AsyncIterable, protocols: list[str] | None = None, on_validated: Callable | None = None) -> list:
+        """
+        Validates the proxies, blocking until all of them are done.
+
+        Args:
+            proxies (Iterable | AsyncIterable): The proxies to validate.
+            protocols (list[str], optional, default: None): The protocols to test, by default the proxy's known protocols are tested, or all of them if none are known.
+            on_validated (Callable, optional, default: None): Called with every proxy as soon as it's validated, valid or not.
+
+        Returns:
+            list: The valid proxies.
+        """
+        return asyncio.run(
+            self.validate_async(
+                proxies=proxies,
+                protocols=protocols,
+                on_validated=on_validated
+            )
+        )
+
+    async def validate_async(self, proxies: Iterable | AsyncIterable, protocols: list[str] | None = None, on_validated: Callable | None = None) -> list:
+        """
+        Validates the proxies concurrently. Only `concurrency` proxies are scheduled at once
+        so `proxies` can be a lazy iterable of any size, or an async iterable fed while the validation runs.
+
+        Args:
+            proxies (Iterable | AsyncIterable): The proxies to validate.
+            protocols (list[str], optional, default: None): The protocols to test.
+            on_validated (Callable, optional, default: None): Called with every proxy as soon as it's validated, valid or not.
+                When given, the valid proxies are handed to it and not kept, and an empty list is returned.
+
+        Returns:
+            list: The valid proxies, in the order they were validated.
+
+        Raises:
+            Exception: The first error raised by `on_validated` or by the validation of a proxy, once the proxies in flight are cancelled.
+        """
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        valid_proxies = []
+        pending = set()
+        callback_errors = []
+
+        def collect(task: asyncio.Task) -> None:
+            # Runs as soon as a proxy is done, so the results don't wait for the next proxy to be scheduled
+            pending.discard(task)
+
+            if task.cancelled():
+                return
+
+            # asyncio would only log an error raised here, it's raised once the validation is stopped instead
+            try:
+                proxy = task.result()
+
+                if on_validated is not None:
+                    on_validated(proxy)
+                elif proxy.is_valid:
+                    valid_proxies.append(proxy)
+            except Exception as error:
+                callback_errors.append(error)
+
+        async def schedule(proxy) -> bool:
+            while len(pending) >= self.concurrency and not self.deadline_reached and len(callback_errors) == 0:
+                await asyncio.wait(set(pending), timeout=self._time_left(), return_when=asyncio.FIRST_COMPLETED)
+
+                # Give the done callbacks a chance to run
+                await asyncio.sleep(0)
+
+            if self.deadline_reached or len(callback_errors) > 0:
+                return False
+
+            task = asyncio.ensure_future(
+                self.validate_proxy(
+                    proxy=proxy,
+                    protocols=protocols
+                )
+            )
+            task.add_done_callback(collect)
+            pending.add(task)
+
+            return True
+
+        if isinstance(proxies, AsyncIterable):
+            async for proxy in proxies:
+                if not await schedule(proxy):
+                    break
+        else:
+            for proxy in proxies:
+                if not await schedule(proxy):
+                    break
+
+        while pending and not self.deadline_reached and len(callback_errors) == 0:
+            await asyncio.wait(set(pending), timeout=self._time_left(), return_when=asyncio.FIRST_COMPLETED)
+            await asyncio.sleep(0)
+
+        if pending and len(callback_errors) > 0:
+            # Stop validating, the error is raised once the proxies in flight are dropped
+            cancelled = set(pending)
+
+            for task in cancelled:
+                task.cancel()
+
+            await asyncio.gather(*cancelled, return_exceptions=True)
+
+        if len(callback_errors) > 0:
+            raise callback_errors[0]
+
+        if pending:
+            # The deadline was reached, drop the unfinished proxies
+            cancelled = set(pending)
+
+            for task in cancelled:
+                task.cancel()
+
+            await asyncio.gather(*cancelled, return_exceptions=True)
+
+            self.proxies_cancelled += len(cancelled)
+
+            if self.console is not None:
+                self.console.log(
+                    info.RUN_DEADLINE_REACHED(
+                        cancelled=len(cancelled)
+                    )
+                )
+
+        if self.console is not None:
+            self.console.log(
+                info.VALIDATION_SUMMARY(
+                    probes_sent=self.probes_sent,
+                    probes_skipped=self.probes_skipped,
+                    time_saved=self.time_saved
+                )
+            )
+
+        return valid_proxies
+
+    async def validate_proxy(self, proxy, protocols: list[str] | None = None):
+        """
+        Validates a single proxy, probing all of its plausible protocols concurrently.
+
+        Args:
+            proxy: The proxy to validate.
+            protocols (list[str], optional, default: None): The protocols to test.
+
+        Returns:
+            The same proxy, with its `proxy`, `protocols`, `is_valid`, `verdicts`, `latencies`, `connect_time`, `first_byte_time`, `total_time`, `last_checked_at`, `next_check_at`, `last_valid_at` and health fields updated.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        protocols = self._candidate_protocols(proxy=proxy, protocols=protocols)
+        plausible_protocols = protocols
+
+        if not helpers.is_valid_port(proxy.port):
+            # A malformed port can't be connected to, the proxy is invalid on every protocol
+            plausible_protocols = []
+        elif self.sniff_protocols:
+            async with self._semaphore:
+                sniffed_protocols = await sniff(
+                    ip=proxy.ip,
+                    port=proxy.port
+                )
+
+            plausible_protocols = [protocol for protocol in protocols if protocol in sniffed_protocols]
+
+        tasks = {
+            protocol: asyncio.ensure_future(
+                self._check_protocol(
+                    ip=proxy.ip,
+                    port=proxy.port,
+                    protocol=protocol
+                )
+            ) for protocol in plausible_protocols
+        }
+
+        try:
+            if tasks:
+                await asyncio.wait(tasks.values(), timeout=self.proxy_deadline)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+            self.scheduler.forget(f"{proxy.ip}:{proxy.port}")
+
+        # Protocols that missed the proxy's deadline are invalid
+        verdicts = [
+            task.result() if task.done() and not task.cancelled() else QuorumVerdict(
+                protocol=protocol,
+                is_valid=False,
+                results=[],
+                probes_skipped=0,
+                time_saved=0.0
+            ) for protocol, task in tasks.items()
+        ]
+
+        # Protocols ruled out by sniffing never get probed
+        verdicts = [
+            *verdicts,
+            *[
+                QuorumVerdict(
+                    protocol=protocol,
+                    is_valid=False,
+                    results=[],
+                    probes_skipped=self.quorum.size,
+                    time_saved=0.0
+                ) for protocol in protocols if protocol not in plausible_protocols
+            ]
+        ]
+        self.probes_skipped += self.quorum.size * (len(protocols) - len(plausible_protocols))
+
+        proxy.verdicts = {verdict.protocol: verdict for verdict in verdicts}
+        proxy.proxy = {
+            verdict.protocol: f"{verdict.protocol}://{proxy.ip}:{proxy.port}"
+                for verdict in verdicts if verdict.is_valid
+        }
+        proxy.protocols = list(proxy.proxy)
+        proxy.is_valid = len(proxy.proxy) != 0
+        proxy.latencies = {
+            verdict.protocol: verdict.latency for verdict in verdicts if verdict.is_valid
+        }
+
+        # The fastest protocol's latency is the proxy's latency
+        fastest = min(proxy.latencies.values(), key=lambda latency: latency["total"], default=None)
+
+        proxy.connect_time = fastest["connect"] if fastest is not None else None
+        proxy.first_byte_time = fastest["first_byte"] if fastest is not None else None
+        proxy.total_time = fastest["total"] if fastest is not None else None
+        proxy.last_checked_at = helpers.date()
+
+        if proxy.is_valid:
+            proxy.last_valid_at = proxy.last_checked_at
+
+        self._update_health(proxy=proxy)
+
+        # Flaky proxies are due again sooner than stable ones
+        proxy.next_check_at = proxy.last_checked_at + datetime.timedelta(
+            seconds=helpers.revalidation_ttl(success_rate=proxy.success_rate)
+        )
+
+        return proxy
+
+    def _update_health(self, proxy) -> None:
+        """ Folds the outcome of the check into the proxy's `success_rate`, `latency_ewma` and `health_score`, in O(1) """
+        success = 1.0 if proxy.is_valid else 0.0
+        success_rate = getattr(proxy, "success_rate", None)
+        latency = getattr(proxy, "latency_ewma", None)
+
+        proxy.success_rate = success if success_rate is None else helpers.ewma(average=success_rate, sample=success)
+
+        # Failed checks don't tell anything about the latency
+        if proxy.total_time is not None:
+            latency = proxy.total_time if latency is None else helpers.ewma(average=latency, sample=proxy.total_time)
+
+        proxy.latency_ewma = latency
+        proxy.health_score = helpers.health_score(
+            success_rate=proxy.success_rate,
+            latency=latency if latency is not None else constants.HEALTH_LATENCY_SCALE
+        )
+
+    async def _check_protocol(self, ip: str, port: int, protocol: str) -> QuorumVerdict:
+        """ Probes a protocol until the quorum's verdict is known """
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        results = []
+        successes = 0
+        failures = 0
+
+        while not self.quorum.is_decided(successes=successes, failures=failures):
+            target_url = next(self._targets)
+
+            # Wait outside of the semaphore so a waiting probe doesn't hold a slot
+            await self.scheduler.wait(
+                proxy=f"{ip}:{port}",
+                target_host=urlsplit(target_url).netloc,
+                failures=failures
+            )
+
+            async with self._semaphore:
+                result = await probe(
+                    ip=ip,
+                    port=port,
+                    protocol=protocol,
+                    target_url=target_url,
+                    timeouts=self.timeouts
+                )
+
+            results.append(result)
+
+            if result.is_success:
+                successes += 1
+                continue
+
+            failures += 1
+
+            if result.error is not None and self.debug_mode and self.console is not None:
+                self.console.log(
+                    debug.EXCEPTION_RAISED_WHEN_VALIDATING_PROXY(
+                        proxy=f"{protocol}://{ip}:{port}",
+                        error=repr(result.error)
+                    )
+                )
+
+        probes_skipped = self.quorum.size - len(results)
+        verdict = QuorumVerdict(
+            protocol=protocol,
+            is_valid=successes >= self.quorum.threshold,
+            results=results,
+            probes_skipped=probes_skipped,
+            time_saved=(loop.time() - started_at) / len(results) * probes_skipped
+        )
+
+        self.probes_sent += verdict.probes_used
+        self.probes_skipped += verdict.probes_skipped
+        self.time_saved += verdict.time_saved
+
+        if self.debug_mode and self.console is not None:
+            self.console.log(
+                debug.QUORUM_VERDICT(
+                    proxy=f"{protocol}://{ip}:{port}",
+                    verdict=verdict
+                )
+            )
+
+        return verdict
+
+    def _candidate_protocols(self, proxy, protocols: list[str] | None = None) -> list[str]:
+        """ Returns the protocols to test on `proxy` """
+        if protocols is not None:
+            return list(protocols)
+
+        if proxy.proxy:
+            return list(proxy.proxy)
+
+        if proxy.protocols:
+            return list(proxy.protocols)
+
+        return list(constants.PROTOCOLS)
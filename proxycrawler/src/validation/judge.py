@@ -0,0 +1,84 @@
+import json
+import time
+import threading
+
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer
+)
+
+from proxycrawler import constants
+
+class JudgeRequestHandler(BaseHTTPRequestHandler):
+    """ Answers every GET request with the request's headers and the address it came from, as JSON """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        if self.server.delay > 0:
+            time.sleep(self.server.delay / 1000)
+
+        body = json.dumps(
+            {
+                "remote_addr": self.client_address[0],
+                "method": self.command,
+                "path": self.path,
+                "headers": dict(self.headers.items())
+            }
+        ).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        # Keep the console quiet, a judge gets thousands of requests per run
+        pass
+
+class JudgeServer(ThreadingHTTPServer):
+    """
+    A lightweight local judge, the validation target to use for offline runs and benchmarks.
+
+    Attributes:
+        host (str): The address the judge listens on.
+        port (int): The port the judge listens on, 0 picks a free port.
+        delay (float): Milliseconds to wait before answering, to simulate a remote target with a predictable latency.
+    """
+    daemon_threads = True
+
+    def __init__(self, host: str = constants.JUDGE_HOST, port: int = constants.JUDGE_PORT, delay: float = 0) -> None:
+        super().__init__((host, port), JudgeRequestHandler)
+
+        self.delay = delay
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """ The URL to use as a validation target """
+        host, port = self.server_address[:2]
+
+        return f"http://{host}:{port}/"
+
+    def start(self) -> str:
+        """
+        Serves the judge in a background thread.
+
+        Args:
+            None
+
+        Returns:
+            str: The URL of the judge.
+        """
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+        return self.url
+
+    def stop(self) -> None:
+        """ Stops the judge and closes its socket """
+        self.shutdown()
+        self.server_close()
+
+        if self._thread is not None:
+            self._thread.join()
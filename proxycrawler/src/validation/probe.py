@@ -0,0 +1,320 @@
+import ssl
+import socket
+import struct
+import asyncio
+import datetime
+
+from urllib.parse import (
+    urlsplit,
+    urlunsplit
+)
+
+from user_agent import generate_user_agent
+
+from proxycrawler import (
+    helpers,
+    constants
+)
+
+class ProxyHandshakeError(Exception):
+    """ Raised when a proxy refuses or fails the protocol handshake """
+    pass
+
+class ProbeTimeoutError(Exception):
+    """ Raised when a phase of a probe takes longer than its timeout """
+    pass
+
+class ProbeTimeouts(object):
+    """
+    The timeouts of each phase of a probe.
+
+    Attributes:
+        connect (float): Seconds to connect to the proxy and open the tunnel to the target.
+        tls (float): Seconds to complete the TLS handshake with the target through the tunnel.
+        first_byte (float): Seconds to receive the first line of the target's response once the request is sent.
+    """
+    def __init__(self, connect: float = constants.CONNECT_TIMEOUT, tls: float = constants.TLS_TIMEOUT, first_byte: float = constants.FIRST_BYTE_TIMEOUT) -> None:
+        self.connect = connect
+        self.tls = tls
+        self.first_byte = first_byte
+
+    @property
+    def total(self) -> float:
+        """ The longest a probe can take """
+        return self.connect + self.tls + self.first_byte
+
+    def __repr__(self) -> str:
+        return f"ProbeTimeouts(connect={self.connect!r}, tls={self.tls!r}, first_byte={self.first_byte!r})"
+
+class ProbeResult(object):
+    """
+    The result of a single probe sent through a proxy.
+
+    Attributes:
+        protocol (str): The protocol the proxy was probed with.
+        target_url (str | None): The URL requested through the proxy.
+        checked_at (datetime | None): When the probe was sent.
+        status_code (int | None): The HTTP status code returned by the target, None if no response was received.
+        error (Exception | None): The exception raised while probing, None if the probe went through.
+        connect_time (float | None): Milliseconds taken to connect to the proxy and open the tunnel.
+        first_byte_time (float | None): Milliseconds from the start of the probe to the first line of the response.
+        total_time (float | None): Milliseconds from the start of the probe to the end of the response headers.
+    """
+    protocol        :   str
+    target_url      :   str | None
+    checked_at      :   datetime.datetime | None
+    status_code     :   int | None
+    error           :   Exception | None
+    connect_time    :   float | None
+    first_byte_time :   float | None
+    total_time      :   float | None
+
+    def __init__(self, protocol: str, target_url: str | None = None, checked_at: datetime.datetime | None = None, status_code: int | None = None, error: Exception | None = None, connect_time: float | None = None, first_byte_time: float | None = None, total_time: float | None = None) -> None:
+        self.protocol = protocol
+        self.target_url = target_url
+        self.checked_at = checked_at
+        self.status_code = status_code
+        self.error = error
+        self.connect_time = connect_time
+        self.first_byte_time = first_byte_time
+        self.total_time = total_time
+
+    @property
+    def is_success(self) -> bool:
+        """ True if the target answered through the proxy with a non error status code """
+        return self.status_code is not None and 200 <= self.status_code < 400
+
+    def __repr__(self) -> str:
+        return f"ProbeResult(protocol={self.protocol!r}, target_url={self.target_url!r}, checked_at={self.checked_at!r}, status_code={self.status_code!r}, error={self.error!r}, connect_time={self.connect_time!r}, first_byte_time={self.first_byte_time!r}, total_time={self.total_time!r})"
+
+# Resolved target hosts, SOCKS4 can only connect to IPv4 addresses
+_resolved_hosts: dict[str, str] = dict()
+
+async def probe(ip: str, port: int, protocol: str, target_url: str, timeouts: ProbeTimeouts) -> ProbeResult:
+    """
+    Sends a single GET request to `target_url` through the proxy `ip:port` using `protocol`.
+
+    The `http` protocol is probed with an absolute-form request over plain http, an https target being requested
+    over http instead, so it doesn't repeat the CONNECT tunnel that the `https` protocol is probed with.
+
+    Args:
+        ip (str): The IP address of the proxy.
+        port (int): The port number of the proxy.
+        protocol (str): The protocol to speak with the proxy (http, https, socks4 or socks5).
+        target_url (str): The URL to request through the proxy.
+        timeouts (ProbeTimeouts): The timeouts of each phase of the probe.
+
+    Returns:
+        ProbeResult: The outcome of the probe. Errors are captured in `ProbeResult.error` and never raised.
+    """
+    if protocol == "http":
+        target_url = _plain_http_url(target_url)
+
+    result = ProbeResult(
+        protocol=protocol,
+        target_url=target_url,
+        checked_at=helpers.date()
+    )
+
+    try:
+        result.status_code = await _probe(
+            ip=ip,
+            port=int(port),
+            protocol=protocol,
+            target_url=target_url,
+            timeouts=timeouts,
+            result=result
+        )
+    except Exception as error:
+        result.error = error
+
+    return result
+
+async def _probe(ip: str, port: int, protocol: str, target_url: str, timeouts: ProbeTimeouts, result: ProbeResult) -> int:
+    """ Connects to the proxy, tunnels to the target and returns the target's status code. The timings are written into `result` """
+    loop = asyncio.get_running_loop()
+    started_at = loop.time()
+    target = urlsplit(target_url)
+    is_tls = target.scheme == "https"
+    target_host = target.hostname
+    target_port = target.port or (443 if is_tls else 80)
+    path = target.path or "/"
+
+    if target.query:
+        path = f"{path}?{target.query}"
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    writer = None
+
+    if protocol == "http" and not is_tls:
+        # Plain http proxies forward absolute-form requests
+        path = target_url
+
+    try:
+        await _within(
+            _open_tunnel(loop, sock, ip, port, protocol, target_host, target_port, is_tls),
+            timeout=timeouts.connect,
+            phase="connect"
+        )
+        result.connect_time = (loop.time() - started_at) * 1000
+
+        reader, writer = await _within(
+            asyncio.open_connection(
+                sock=sock,
+                ssl=ssl.create_default_context() if is_tls else None,
+                server_hostname=target_host if is_tls else None
+            ),
+            timeout=timeouts.tls,
+            phase="tls"
+        )
+        writer.write(
+            (
+                f"GET {path} HTTP/1.1\r\n"
+                f"Host: {target_host}\r\n"
+                f"User-Agent: {generate_user_agent()}\r\n"
+                "Accept: */*\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode()
+        )
+
+        status_line = await _within(
+            _send_and_read_status_line(reader, writer),
+            timeout=timeouts.first_byte,
+            phase="first byte"
+        )
+        result.first_byte_time = (loop.time() - started_at) * 1000
+        status_code = _parse_status_code(status_line)
+
+        await _within(
+            reader.readuntil(b"\r\n\r\n"),
+            timeout=timeouts.first_byte,
+            phase="response headers"
+        )
+        result.total_time = (loop.time() - started_at) * 1000
+
+        return status_code
+    finally:
+        if writer is not None:
+            writer.close()
+        else:
+            sock.close()
+
+def _plain_http_url(url: str) -> str:
+    """ Returns the plain http equivalent of `url`, an https URL being moved to the default http port """
+    target = urlsplit(url)
+
+    if target.scheme == "http":
+        return url
+
+    return urlunsplit(("http", target.hostname, target.path, target.query, ""))
+
+async def _within(coroutine, timeout: float, phase: str):
+    """ Awaits `coroutine`, raising `ProbeTimeoutError` if it takes longer than `timeout` """
+    try:
+        return await asyncio.wait_for(coroutine, timeout=timeout)
+    except asyncio.TimeoutError:
+        raise ProbeTimeoutError(f"The {phase} phase timed out after {timeout}s") from None
+
+async def _open_tunnel(loop: asyncio.AbstractEventLoop, sock: socket.socket, ip: str, port: int, protocol: str, target_host: str, target_port: int, is_tls: bool) -> None:
+    """ Connects to the proxy and opens a tunnel to the target when the protocol needs one """
+    await loop.sock_connect(sock, (ip, port))
+
+    if protocol == "socks5":
+        await _socks5_handshake(loop, sock, target_host, target_port)
+    elif protocol == "socks4":
+        await _socks4_handshake(loop, sock, await _resolve(loop, target_host), target_port)
+    elif protocol == "https" or is_tls:
+        await _http_connect(loop, sock, target_host, target_port)
+
+async def _send_and_read_status_line(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bytes:
+    """ Flushes the request and reads the status line of the response """
+    await writer.drain()
+
+    return await reader.readline()
+
+async def _resolve(loop: asyncio.AbstractEventLoop, host: str) -> str:
+    """ Resolves `host` to an IPv4 address, results are cached """
+    if host not in _resolved_hosts:
+        addresses = await loop.getaddrinfo(host, None, family=socket.AF_INET, type=socket.SOCK_STREAM)
+        _resolved_hosts[host] = addresses[0][4][0]
+
+    return _resolved_hosts[host]
+
+async def _http_connect(loop: asyncio.AbstractEventLoop, sock: socket.socket, host: str, port: int) -> None:
+    """ Opens a tunnel to `host:port` using the HTTP CONNECT method """
+    await loop.sock_sendall(
+        sock,
+        f"CONNECT {host}:{port} HTTP/1.1\r\nHost: {host}:{port}\r\n\r\n".encode()
+    )
+
+    response = b""
+    while b"\r\n\r\n" not in response:
+        chunk = await loop.sock_recv(sock, 4096)
+        if not chunk or len(response) > 16384:
+            raise ProxyHandshakeError("Unterminated CONNECT response")
+        response += chunk
+
+    status_code = _parse_status_code(response.split(b"\r\n", 1)[0])
+
+    if status_code != 200:
+        raise ProxyHandshakeError(f"CONNECT refused with status code {status_code}")
+
+async def _socks4_handshake(loop: asyncio.AbstractEventLoop, sock: socket.socket, host_ip: str, port: int) -> None:
+    """ Opens a tunnel to `host_ip:port` using SOCKS4 """
+    await loop.sock_sendall(
+        sock,
+        struct.pack(">BBH", 4, 1, port) + socket.inet_aton(host_ip) + b"\x00"
+    )
+    reply = await _recv_exactly(loop, sock, 8)
+
+    if reply[1] != 0x5A:
+        raise ProxyHandshakeError(f"SOCKS4 request rejected with code {reply[1]:#x}")
+
+async def _socks5_handshake(loop: asyncio.AbstractEventLoop, sock: socket.socket, host: str, port: int) -> None:
+    """ Opens a tunnel to `host:port` using SOCKS5 without authentication """
+    await loop.sock_sendall(sock, b"\x05\x01\x00")
+    greeting = await _recv_exactly(loop, sock, 2)
+
+    if greeting != b"\x05\x00":
+        raise ProxyHandshakeError(f"SOCKS5 greeting rejected: {greeting!r}")
+
+    await loop.sock_sendall(
+        sock,
+        b"\x05\x01\x00\x03" + bytes([len(host)]) + host.encode() + struct.pack(">H", port)
+    )
+    reply = await _recv_exactly(loop, sock, 4)
+
+    if reply[1] != 0x00:
+        raise ProxyHandshakeError(f"SOCKS5 request rejected with code {reply[1]:#x}")
+
+    # Drain the bound address
+    if reply[3] == 0x01:
+        await _recv_exactly(loop, sock, 4 + 2)
+    elif reply[3] == 0x03:
+        length = (await _recv_exactly(loop, sock, 1))[0]
+        await _recv_exactly(loop, sock, length + 2)
+    elif reply[3] == 0x04:
+        await _recv_exactly(loop, sock, 16 + 2)
+    else:
+        raise ProxyHandshakeError(f"SOCKS5 reply has an unknown address type {reply[3]:#x}")
+
+async def _recv_exactly(loop: asyncio.AbstractEventLoop, sock: socket.socket, size: int) -> bytes:
+    """ Reads exactly `size` bytes from `sock` """
+    data = b""
+    while len(data) < size:
+        chunk = await loop.sock_recv(sock, size - len(data))
+        if not chunk:
+            raise ProxyHandshakeError("Connection closed by the proxy")
+        data += chunk
+
+    return data
+
+def _parse_status_code(status_line: bytes) -> int:
+    """ Parses the status code out of an HTTP status line """
+    parts = status_line.split()
+
+    if len(parts) < 2 or not parts[0].startswith(b"HTTP/") or not parts[1].isdigit():
+        raise ProxyHandshakeError(f"Unvalid HTTP status line: {status_line[:64]!r}")
+
+    return int(parts[1])
@@ -0,0 +1,84 @@
+import statistics
+
+from proxycrawler import constants
+from proxycrawler.src.validation.probe import ProbeResult
+
+class Quorum(object):
+    """
+    A `threshold` out of `size` vote on a proxy's protocol.
+
+    The vote is decided as soon as either `threshold` probes succeeded or enough probes failed
+    that `threshold` can't be reached anymore, the remaining probes are then skipped.
+
+    Attributes:
+        size (int): The maximum number of probes sent.
+        threshold (int): The number of successful probes needed for the protocol to be valid.
+    """
+    def __init__(self, size: int = constants.QUORUM_SIZE, threshold: int = constants.QUORUM_THRESHOLD) -> None:
+        if not 1 <= threshold <= size:
+            raise ValueError(f"The quorum threshold must be between 1 and the quorum size ({size}), got {threshold}")
+
+        self.size = size
+        self.threshold = threshold
+
+    def is_decided(self, successes: int, failures: int) -> bool:
+        """
+        Checks if the vote is decided.
+
+        Args:
+            successes (int): The number of successful probes so far.
+            failures (int): The number of failed probes so far.
+
+        Returns:
+            bool: True if the remaining probes can't change the verdict.
+        """
+        return successes >= self.threshold or failures > self.size - self.threshold
+
+    def __repr__(self) -> str:
+        return f"Quorum(size={self.size!r}, threshold={self.threshold!r})"
+
+class QuorumVerdict(object):
+    """
+    The verdict of a quorum on a single protocol of a proxy.
+
+    Attributes:
+        protocol (str): The protocol that was voted on.
+        is_valid (bool): True if the quorum was reached.
+        results (list[ProbeResult]): The results of the probes that were sent.
+        probes_skipped (int): The number of probes that were skipped once the vote was decided.
+        time_saved (float): The estimated seconds saved by skipping probes, based on the average duration of the sent ones.
+    """
+    protocol        :   str
+    is_valid        :   bool
+    results         :   list[ProbeResult]
+    probes_skipped  :   int
+    time_saved      :   float
+
+    def __init__(self, protocol: str, is_valid: bool, results: list[ProbeResult], probes_skipped: int, time_saved: float) -> None:
+        self.protocol = protocol
+        self.is_valid = is_valid
+        self.results = results
+        self.probes_skipped = probes_skipped
+        self.time_saved = time_saved
+
+    @property
+    def probes_used(self) -> int:
+        """ The number of probes that were sent """
+        return len(self.results)
+
+    @property
+    def latency(self) -> dict | None:
+        """ The median connect, first byte and total times in milliseconds of the successful probes, None if none succeeded """
+        results = [result for result in self.results if result.is_success]
+
+        if len(results) == 0:
+            return None
+
+        return {
+            "connect": round(statistics.median(result.connect_time for result in results), 1),
+            "first_byte": round(statistics.median(result.first_byte_time for result in results), 1),
+            "total": round(statistics.median(result.total_time for result in results), 1)
+        }
+
+    def __repr__(self) -> str:
+        return f"QuorumVerdict(protocol={self.protocol!r}, is_valid={self.is_valid!r}, probes_used={self.probes_used!r}, probes_skipped={self.probes_skipped!r}, time_saved={self.time_saved!r})"
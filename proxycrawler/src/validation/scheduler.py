@@ -0,0 +1,107 @@
+import random
+import asyncio
+
+from proxycrawler import constants
+
+class RetryScheduler(object):
+    """
+    Decides how long a probe waits before it is sent.
+
+    A probe that follows a failure waits an exponential backoff with jitter, a probe that follows a success
+    goes out right away. On top of that every proxy (its `ip:port`) and every target host has a politeness budget,
+    a token bucket refilled at a number of probes per second that holds up to a burst of probes, so a single proxy
+    is never flooded by the probes of all its protocols at once and a target isn't flooded by the probes sent
+    through thousands of proxies at once.
+
+    Waiting is done with `asyncio.sleep`, the caller must not hold a concurrency slot while awaiting `wait`.
+
+    Attributes:
+        backoff_base (float): Seconds to wait after the first failure, doubled on each consecutive failure.
+        backoff_max (float): Upper bound of the backoff in seconds.
+        jitter (float): Fraction of the backoff that is randomized, between 0 and 1.
+        politeness_rate (float): Probes per second allowed on a single proxy.
+        politeness_burst (int): Probes that can be sent to a single proxy without waiting.
+        target_rate (float): Probes per second allowed on a single target host, through every proxy.
+        target_burst (int): Probes that can be sent to a single target host without waiting.
+    """
+    def __init__(self, backoff_base: float = constants.PROBE_BACKOFF_BASE, backoff_max: float = constants.PROBE_BACKOFF_MAX, jitter: float = constants.PROBE_BACKOFF_JITTER, politeness_rate: float = constants.POLITENESS_RATE, politeness_burst: int = constants.POLITENESS_BURST, target_rate: float = constants.TARGET_RATE_LIMIT, target_burst: int = constants.TARGET_BURST) -> None:
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self.politeness_rate = politeness_rate
+        self.politeness_burst = max(1, politeness_burst)
+        self.target_rate = target_rate
+        self.target_burst = max(1, target_burst)
+
+        # proxy -> (available tokens, last refill time), and the same by target host
+        self._buckets: dict[str, tuple[float, float]] = dict()
+        self._target_buckets: dict[str, tuple[float, float]] = dict()
+
+    def backoff(self, failures: int) -> float:
+        """
+        Returns the backoff delay after `failures` consecutive failures.
+
+        Args:
+            failures (int): The number of consecutive failed attempts.
+
+        Returns:
+            float: The delay in seconds, 0 if there were no failures.
+        """
+        if failures <= 0:
+            return 0.0
+
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (failures - 1))
+
+        return delay * (1 - self.jitter * random.random())
+
+    def politeness_delay(self, proxy: str, target_host: str | None = None) -> float:
+        """
+        Reserves a probe on `proxy` and on `target_host`, and returns how long it has to wait for its turn.
+
+        Args:
+            proxy (str): The proxy that is about to be probed.
+            target_host (str, optional, default: None): The host requested through the proxy. If None, only the proxy's budget is used.
+
+        Returns:
+            float: The delay in seconds, 0 if neither budget is exhausted.
+        """
+        delay = _reserve(self._buckets, key=proxy, rate=self.politeness_rate, burst=self.politeness_burst)
+
+        if target_host is not None:
+            delay = max(delay, _reserve(self._target_buckets, key=target_host, rate=self.target_rate, burst=self.target_burst))
+
+        return delay
+
+    async def wait(self, proxy: str, target_host: str | None = None, failures: int = 0) -> None:
+        """
+        Waits until a probe can be sent through `proxy` to `target_host`.
+
+        Args:
+            proxy (str): The proxy that is about to be probed.
+            target_host (str, optional, default: None): The host requested through the proxy.
+            failures (int, optional, default: 0): The number of consecutive failed attempts on this proxy.
+
+        Returns:
+            None: This method doesn't return anything.
+        """
+        delay = max(self.backoff(failures), self.politeness_delay(proxy, target_host))
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def forget(self, proxy: str) -> None:
+        """ Drops the politeness budget of a proxy that won't be probed anymore """
+        self._buckets.pop(proxy, None)
+
+def _reserve(buckets: dict[str, tuple[float, float]], key: str, rate: float, burst: int) -> float:
+    """ Takes a token from the bucket of `key`, returning how long to wait for it. A rate of 0 or less disables the bucket """
+    if rate <= 0:
+        return 0.0
+
+    now = asyncio.get_running_loop().time()
+    tokens, updated_at = buckets.get(key, (burst, now))
+    tokens = min(burst, tokens + (now - updated_at) * rate) - 1
+
+    buckets[key] = (tokens, now)
+
+    return 0.0 if tokens >= 0 else -tokens / rate
@@ -0,0 +1,81 @@
+import socket
+import asyncio
+
+from proxycrawler import constants
+
+# A SOCKS5 greeting offering the "no authentication" method, SOCKS5 servers answer it right away
+SOCKS5_GREETING = b"\x05\x01\x00"
+
+# Terminates the greeting as a (malformed) HTTP request, so HTTP proxies answer it with an error
+HTTP_NUDGE = b"\r\n\r\n"
+
+# Completes a SOCKS4 request and its empty user id, so SOCKS4 servers reject it with a reply
+SOCKS4_NUDGE = b"\x00\x00"
+
+SNIFF_PAYLOAD = SOCKS5_GREETING + HTTP_NUDGE + SOCKS4_NUDGE
+
+# Protocols that can't be ruled out when the proxy gives nothing away
+AMBIGUOUS_PROTOCOLS = frozenset(["http", "https", "socks4"])
+
+async def sniff(ip: str, port: int, timeout: float = constants.SNIFF_TIMEOUT) -> frozenset[str]:
+    """
+    Guesses the protocols a proxy may speak using a single TCP connection.
+
+    A single payload is sent that every kind of proxy answers without waiting for more: SOCKS5 servers
+    accept its greeting, SOCKS4 servers reject it as a SOCKS4 request and HTTP proxies reject it as a
+    malformed HTTP request. The first bytes of the answer tell them apart.
+
+    Args:
+        ip (str): The IP address of the proxy.
+        port (int): The port number of the proxy.
+        timeout (float, optional, default: constants.SNIFF_TIMEOUT): Seconds to wait for the connection and for the answer.
+
+    Returns:
+        frozenset[str]: The protocols worth validating end to end, empty if the port is closed or malformed.
+    """
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setblocking(False)
+
+    try:
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (ip, int(port))), timeout=timeout)
+        except (OSError, ValueError, OverflowError, asyncio.TimeoutError):
+            # A malformed port is as good as a closed one
+            return frozenset()
+
+        try:
+            await loop.sock_sendall(sock, SNIFF_PAYLOAD)
+            data = await asyncio.wait_for(loop.sock_recv(sock, 64), timeout=timeout)
+        except (OSError, asyncio.TimeoutError):
+            return AMBIGUOUS_PROTOCOLS
+
+        if not data:
+            # Closed without an answer, SOCKS4 servers do that on a version mismatch and so do some HTTP proxies
+            return AMBIGUOUS_PROTOCOLS
+
+        return classify(data)
+    finally:
+        sock.close()
+
+def classify(data: bytes) -> frozenset[str]:
+    """
+    Classifies the first bytes a proxy answered to the sniffing payloads.
+
+    Args:
+        data (bytes): The answer of the proxy.
+
+    Returns:
+        frozenset[str]: The protocols the answer is compatible with.
+    """
+    if data[0] == 0x05:
+        # SOCKS servers commonly speak both versions, SOCKS4 is left to the end to end check
+        return frozenset(["socks5", "socks4"])
+
+    if data[0] == 0x00:
+        return frozenset(["socks4"])
+
+    if data.startswith(b"HTTP/"):
+        return frozenset(["http", "https"])
+
+    return AMBIGUOUS_PROTOCOLS
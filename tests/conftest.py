@@ -0,0 +1,18 @@
+import pytest
+
+from proxycrawler import constants
+from proxycrawler.src.database.database_handler import DatabaseHandler
+
+@pytest.fixture
+def database_url(tmp_path, monkeypatch) -> str:
+    """ Points proxycrawler at a database in a temporary directory """
+    database_url = f"sqlite+pysqlite:///{tmp_path}/database.db"
+    monkeypatch.setattr(constants, "DATABASE_URL", database_url)
+
+    return database_url
+
+@pytest.fixture
+def database_handler(database_url):
+    """ A `DatabaseHandler` on a fresh temporary database """
+    with DatabaseHandler() as database_handler:
+        yield database_handler
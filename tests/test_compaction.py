@@ -0,0 +1,99 @@
+import sqlite3
+import datetime
+
+from sqlalchemy import insert
+
+from proxycrawler import helpers
+from proxycrawler.src.database.tables import (
+    Proxies,
+    ProxyChecks
+)
+
+DAY = 24 * 3600
+
+def days_ago(days: float) -> datetime.datetime:
+    return helpers.date() - datetime.timedelta(days=days)
+
+def save_proxy(database_handler, ip: str, is_valid: bool, added_at: datetime.datetime, last_checked_at: datetime.datetime | None = None, last_valid_at: datetime.datetime | None = None, checks: list[datetime.datetime] = []) -> None:
+    """ Saves a proxy and the times of its checks as they would be after its last validation """
+    proxy_id = helpers.generate_proxy_uid(ip=ip, port=80)
+
+    database_handler.save_proxies([
+        Proxies(
+            proxy_id=proxy_id,
+            ip=ip,
+            port=80,
+            protocol_mask=helpers.protocols_to_mask(["http"]),
+            is_valid=is_valid,
+            added_at=added_at,
+            last_checked_at=last_checked_at,
+            last_valid_at=last_valid_at
+        )
+    ])
+
+    if len(checks) == 0:
+        return
+
+    with database_handler.engine.begin() as connection:
+        connection.execute(
+            insert(ProxyChecks),
+            [
+                {"proxy_id": proxy_id, "checked_at": checked_at, "protocol": 1, "is_success": is_valid} for checked_at in checks
+            ]
+        )
+
+def saved_ips(database_handler) -> set[str]:
+    return {proxy.ip for proxy, in database_handler.fetch_proxies()}
+
+def test_proxies_that_were_never_validated_are_kept(database_handler):
+    save_proxy(database_handler, "1.1.1.1", is_valid=False, added_at=days_ago(40))
+
+    assert database_handler.compact(dead_for=30 * DAY)["removed_proxies"] == 0
+    assert saved_ips(database_handler) == {"1.1.1.1"}
+
+def test_proxies_that_were_never_valid_are_dead_since_their_last_check(database_handler):
+    save_proxy(database_handler, "1.1.1.1", is_valid=False, added_at=days_ago(40), last_checked_at=days_ago(1))
+    save_proxy(database_handler, "2.2.2.2", is_valid=False, added_at=days_ago(40), last_checked_at=days_ago(31))
+
+    database_handler.compact(dead_for=30 * DAY)
+
+    assert saved_ips(database_handler) == {"1.1.1.1"}
+
+def test_proxies_are_dead_since_they_were_last_found_valid(database_handler):
+    save_proxy(database_handler, "1.1.1.1", is_valid=False, added_at=days_ago(40), last_checked_at=days_ago(1), last_valid_at=days_ago(2))
+    save_proxy(database_handler, "2.2.2.2", is_valid=False, added_at=days_ago(40), last_checked_at=days_ago(1), last_valid_at=days_ago(31))
+    save_proxy(database_handler, "3.3.3.3", is_valid=True, added_at=days_ago(40), last_checked_at=days_ago(31), last_valid_at=days_ago(31))
+
+    assert database_handler.compact(dead_for=30 * DAY)["removed_proxies"] == 1
+    assert saved_ips(database_handler) == {"1.1.1.1", "3.3.3.3"}
+
+def test_dead_proxies_checks_and_expired_checks_are_removed_and_counted_apart(database_handler):
+    save_proxy(database_handler, "1.1.1.1", is_valid=True, added_at=days_ago(40), last_checked_at=days_ago(1), last_valid_at=days_ago(1), checks=[days_ago(1), days_ago(20), days_ago(40)])
+    save_proxy(database_handler, "2.2.2.2", is_valid=False, added_at=days_ago(40), last_checked_at=days_ago(31), checks=[days_ago(31), days_ago(35)])
+
+    compaction = database_handler.compact(dead_for=30 * DAY, checks_for=30 * DAY)
+
+    assert compaction["removed_proxies"] == 1
+    assert compaction["removed_dead_checks"] == 2
+    assert compaction["removed_checks"] == 1
+
+    with database_handler.engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT COUNT(*) FROM proxy_checks").scalar() == 2
+
+def test_dead_proxies_are_archived(database_handler, tmp_path):
+    archive_path = str(tmp_path / "archive.db")
+
+    save_proxy(database_handler, "1.1.1.1", is_valid=False, added_at=days_ago(40), last_checked_at=days_ago(31), checks=[days_ago(31)])
+
+    database_handler.compact(dead_for=30 * DAY, archive_path=archive_path)
+
+    archive = sqlite3.connect(archive_path)
+
+    assert archive.execute("SELECT ip FROM proxies").fetchall() == [("1.1.1.1",)]
+    assert archive.execute("SELECT COUNT(*) FROM proxy_checks").fetchone() == (1,)
+
+    archive.close()
+
+def test_compaction_runs_once_per_interval(database_handler):
+    assert database_handler.compact_if_due(interval=DAY) is not None
+    assert database_handler.compact_if_due(interval=DAY) is None
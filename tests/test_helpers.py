@@ -0,0 +1,32 @@
+import pytest
+
+from proxycrawler import helpers
+
+@pytest.mark.parametrize("duration, seconds", [
+    ("90", 90),
+    ("90s", 90),
+    ("1.5m", 90),
+    ("30m", 30 * 60),
+    ("1h", 3600),
+    (" 7D ", 7 * 24 * 3600),
+    ("2w", 2 * 7 * 24 * 3600),
+])
+def test_parse_duration(duration, seconds):
+    assert helpers.parse_duration(duration) == seconds
+
+@pytest.mark.parametrize("duration", ["", "h", "ten minutes", "5y", "-1h"])
+def test_parse_duration_rejects_unvalid_durations(duration):
+    with pytest.raises(ValueError):
+        helpers.parse_duration(duration)
+
+@pytest.mark.parametrize("port, is_valid", [
+    (80, True),
+    ("8080", True),
+    (65535, True),
+    (0, False),
+    (70000, False),
+    ("", False),
+    (None, False),
+])
+def test_is_valid_port(port, is_valid):
+    assert helpers.is_valid_port(port) is is_valid
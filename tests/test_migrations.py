@@ -0,0 +1,95 @@
+import json
+import sqlite3
+import datetime
+
+from sqlalchemy import inspect
+
+from proxycrawler import helpers
+from proxycrawler.src.database.database_handler import DatabaseHandler
+
+# The 'proxies' table as created by proxycrawler 0.2.7
+LEGACY_SCHEMA = """
+CREATE TABLE proxies (
+    proxy_id VARCHAR NOT NULL,
+    ip VARCHAR(30),
+    port INTEGER,
+    proxy JSON,
+    protocols VARCHAR,
+    country VARCHAR(10),
+    is_valid BOOLEAN,
+    added_at DATETIME,
+    PRIMARY KEY (proxy_id)
+)
+"""
+
+def legacy_row(proxy_id: str, ip: str, port: int, protocols: list[str], is_valid: bool, added_at: datetime.datetime) -> tuple:
+    """ A row saved by proxycrawler 0.2.7, which keyed proxies by a hash of their data and double-encoded their URLs """
+    proxy = {protocol: f"{protocol}://{ip}:{port}" for protocol in protocols}
+
+    return (proxy_id, ip, port, json.dumps(json.dumps(proxy)), str(protocols), "FR", is_valid, added_at.strftime("%Y-%m-%d %H:%M:%S.%f"))
+
+def create_legacy_database(database_url: str, rows: list[tuple]) -> None:
+    connection = sqlite3.connect(database_url.replace("sqlite+pysqlite:///", ""))
+
+    with connection:
+        connection.execute(LEGACY_SCHEMA)
+        connection.executemany("INSERT INTO proxies VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    connection.close()
+
+def test_migrating_a_legacy_database_merges_its_duplicate_rows(database_url):
+    january = datetime.datetime(2026, 1, 1)
+    february = datetime.datetime(2026, 2, 1)
+
+    create_legacy_database(database_url, [
+        legacy_row("old-uid-1", "1.1.1.1", 80, ["http"], False, february),
+        legacy_row("old-uid-2", "1.1.1.1", 80, ["socks5"], True, january),
+        legacy_row("old-uid-3", "2.2.2.2", 3128, ["https"], False, february),
+    ])
+
+    with DatabaseHandler() as database_handler:
+        proxies = {proxy.ip: proxy for proxy, in database_handler.fetch_proxies()}
+
+        assert set(proxies) == {"1.1.1.1", "2.2.2.2"}
+
+        merged = proxies["1.1.1.1"]
+
+        assert merged.proxy_id == helpers.generate_proxy_uid(ip="1.1.1.1", port=80)
+        assert merged.protocols == ["http", "socks5"]
+        assert merged.is_valid
+        assert merged.added_at == january
+
+        assert proxies["2.2.2.2"].proxy_id == helpers.generate_proxy_uid(ip="2.2.2.2", port=3128)
+        assert proxies["2.2.2.2"].protocols == ["https"]
+
+        indexes = [index["name"] for index in inspect(database_handler.engine).get_indexes("proxies")]
+
+        assert "ix_proxies_ip_port" in indexes
+
+def test_migrating_a_legacy_database_assumes_valid_proxies_were_valid_when_added(database_url):
+    added_at = datetime.datetime(2026, 1, 1)
+
+    create_legacy_database(database_url, [
+        legacy_row("old-uid-1", "1.1.1.1", 80, ["http"], True, added_at),
+        legacy_row("old-uid-2", "2.2.2.2", 80, ["http"], False, added_at),
+    ])
+
+    with DatabaseHandler() as database_handler:
+        proxies = {proxy.ip: proxy for proxy, in database_handler.fetch_proxies()}
+
+        assert proxies["1.1.1.1"].last_valid_at == added_at
+        assert proxies["2.2.2.2"].last_valid_at is None
+
+def test_migrations_run_once(database_url):
+    create_legacy_database(database_url, [
+        legacy_row("old-uid-1", "1.1.1.1", 80, ["http"], True, datetime.datetime(2026, 1, 1)),
+    ])
+
+    with DatabaseHandler() as database_handler:
+        first_run = [repr(proxy) for proxy, in database_handler.fetch_proxies()]
+
+    with DatabaseHandler() as database_handler:
+        with database_handler.engine.connect() as connection:
+            assert database_handler._database_version(connection=connection) == 3
+
+        assert [repr(proxy) for proxy, in database_handler.fetch_proxies()] == first_run
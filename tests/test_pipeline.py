@@ -0,0 +1,78 @@
+import pytest
+
+from proxycrawler.src.pipeline import Pipeline
+from proxycrawler.src.validation.engine import ValidationEngine
+from proxycrawler.src.models.proxy_model import ProxyModel
+
+def proxies(count: int) -> list[ProxyModel]:
+    return [ProxyModel(ip="127.0.0.1", port=port, protocols=["http"]) for port in range(1, count + 1)]
+
+class FailingEngine(ValidationEngine):
+    """ An engine that fails like it did on a scraped port out of range """
+    def validate(self, proxies, protocols=None, on_validated=None):
+        raise OverflowError("connect(): port must be 0-65535.")
+
+def test_every_proxy_reaches_the_sinks():
+    sunk = []
+    pipeline = Pipeline(
+        sources={
+            "first": lambda: proxies(250),
+            "second": lambda: proxies(50)
+        },
+        sinks=[sunk.extend],
+        validation_engine=ValidationEngine(),
+        validate_proxies=False,
+        queue_size=10,
+        batch_size=7
+    )
+
+    pipeline.run()
+
+    assert len(sunk) == 300
+    assert pipeline.found == 300
+    assert all(proxy.protocols == ["http", "socks4", "socks5"] for proxy in sunk)
+
+def test_a_failing_source_doesnt_stop_the_others():
+    sunk = []
+
+    def failing_source():
+        yield from proxies(5)
+        raise RuntimeError("The service is down")
+
+    Pipeline(
+        sources={
+            "failing": failing_source,
+            "working": lambda: proxies(20)
+        },
+        sinks=[sunk.extend],
+        validation_engine=ValidationEngine(),
+        validate_proxies=False
+    ).run()
+
+    assert len(sunk) == 25
+
+def test_the_validator_errors_are_raised():
+    pipeline = Pipeline(
+        sources={"source": lambda: proxies(5000)},
+        sinks=[lambda batch: None],
+        validation_engine=FailingEngine(),
+        queue_size=10
+    )
+
+    with pytest.raises(OverflowError):
+        pipeline.run()
+
+def test_the_sink_errors_are_raised():
+    def failing_sink(batch):
+        raise OSError("No space left on device")
+
+    pipeline = Pipeline(
+        sources={"source": lambda: proxies(5000)},
+        sinks=[failing_sink],
+        validation_engine=ValidationEngine(),
+        validate_proxies=False,
+        queue_size=10
+    )
+
+    with pytest.raises(OSError):
+        pipeline.run()
@@ -0,0 +1,42 @@
+import pytest
+
+from proxycrawler import constants
+from proxycrawler.src.proxy_file import (
+    ProxyFile,
+    parse_proxy_line
+)
+
+@pytest.mark.parametrize("line, proxy", [
+    ("http://1.2.3.4:80", ("http", "1.2.3.4", 80)),
+    ("socks5://10.0.0.1:1080", ("socks5", "10.0.0.1", 1080)),
+    ("ftp://1.2.3.4:80", None),
+    ("http://1.2.3.4", None),
+    ("http://1.2.3.256:80", None),
+    ("http://1.2.3.4:70000", None),
+])
+def test_parse_proxy_line(line, proxy):
+    assert parse_proxy_line(line=line) == proxy
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_proxies_are_yielded_once_as_soon_as_they_are_read(tmp_path, on_disk):
+    proxy_file_path = tmp_path / "proxies.txt"
+    proxy_file_path.write_text("http://1.2.3.4:80\nsocks5://1.2.3.4:80\nnot a proxy\n\nhttps://5.6.7.8:3128\n")
+
+    proxy_file = ProxyFile(proxy_file_path=str(proxy_file_path), on_disk=on_disk)
+    proxies = iter(proxy_file)
+
+    first = next(proxies)
+
+    assert (first.ip, first.port, first.protocols) == ("1.2.3.4", 80, constants.PROTOCOLS)
+    assert proxy_file.lines == 1
+
+    assert [(proxy.ip, proxy.port) for proxy in proxies] == [("5.6.7.8", 3128)]
+    assert (proxy_file.proxies, proxy_file.duplicates, proxy_file.bad_lines) == (2, 1, 1)
+
+def test_forced_protocols_are_tested(tmp_path):
+    proxy_file_path = tmp_path / "proxies.txt"
+    proxy_file_path.write_text("http://1.2.3.4:80\n")
+
+    proxy, = ProxyFile(proxy_file_path=str(proxy_file_path), protocols=["socks4"])
+
+    assert proxy.protocols == ["socks4"]
@@ -0,0 +1,76 @@
+import pytest
+
+from proxycrawler.src.validation import engine
+from proxycrawler.src.validation.probe import ProbeResult
+from proxycrawler.src.validation.quorum import Quorum
+from proxycrawler.src.validation.engine import ValidationEngine
+from proxycrawler.src.models.proxy_model import ProxyModel
+
+@pytest.mark.parametrize("successes, failures, is_decided", [
+    (0, 0, False),
+    (1, 0, False),
+    (1, 1, False),
+    (2, 0, True),   # The threshold is reached
+    (0, 2, True),   # The threshold can't be reached anymore
+    (2, 1, True),
+])
+def test_quorum_is_decided(successes, failures, is_decided):
+    assert Quorum(size=3, threshold=2).is_decided(successes=successes, failures=failures) is is_decided
+
+@pytest.mark.parametrize("size, threshold", [(3, 0), (3, 4)])
+def test_quorum_rejects_unreachable_thresholds(size, threshold):
+    with pytest.raises(ValueError):
+        Quorum(size=size, threshold=threshold)
+
+def validate_with_outcomes(monkeypatch, outcomes: list[bool]) -> tuple[ProxyModel, ValidationEngine, list[ProbeResult]]:
+    """ Validates a proxy on http, its probes succeeding or failing in the order of `outcomes` """
+    outcomes = iter(outcomes)
+    sent = []
+
+    async def fake_probe(ip, port, protocol, target_url, timeouts):
+        result = ProbeResult(
+            protocol=protocol,
+            target_url=target_url,
+            status_code=200 if next(outcomes) else None,
+            connect_time=1.0,
+            first_byte_time=2.0,
+            total_time=3.0
+        )
+        sent.append(result)
+
+        return result
+
+    monkeypatch.setattr(engine, "probe", fake_probe)
+
+    validation_engine = ValidationEngine(
+        quorum=Quorum(size=3, threshold=2),
+        sniff_protocols=False
+    )
+    validation_engine.scheduler.backoff_base = 0
+    proxy = ProxyModel(ip="127.0.0.1", port=8080, protocols=["http"])
+
+    validation_engine.validate(proxies=[proxy])
+
+    return proxy, validation_engine, sent
+
+def test_quorum_stops_once_the_threshold_is_reached(monkeypatch):
+    proxy, validation_engine, sent = validate_with_outcomes(monkeypatch, [True, True, True])
+
+    assert len(sent) == 2
+    assert proxy.is_valid
+    assert validation_engine.probes_sent == 2
+    assert validation_engine.probes_skipped == 1
+
+def test_quorum_stops_once_the_threshold_is_out_of_reach(monkeypatch):
+    proxy, validation_engine, sent = validate_with_outcomes(monkeypatch, [False, False, True])
+
+    assert len(sent) == 2
+    assert not proxy.is_valid
+    assert proxy.verdicts["http"].probes_skipped == 1
+
+def test_quorum_sends_every_probe_on_a_split_vote(monkeypatch):
+    proxy, _, sent = validate_with_outcomes(monkeypatch, [True, False, True])
+
+    assert len(sent) == 3
+    assert proxy.is_valid
+    assert proxy.latencies["http"] == {"connect": 1.0, "first_byte": 2.0, "total": 3.0}
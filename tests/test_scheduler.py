@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+from proxycrawler.src.validation.scheduler import RetryScheduler
+
+def politeness_delays(scheduler: RetryScheduler, probes: list[tuple[str, str]]) -> list[float]:
+    """ Reserves the probes at once, returning the delay of each one """
+    async def reserve():
+        return [scheduler.politeness_delay(proxy, target_host) for proxy, target_host in probes]
+
+    return asyncio.run(reserve())
+
+def test_the_probes_through_a_proxy_are_rate_limited():
+    scheduler = RetryScheduler(politeness_rate=2, politeness_burst=2, target_rate=0)
+    delays = politeness_delays(scheduler, [("1.1.1.1:80", f"target-{index}") for index in range(4)])
+
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2:] == pytest.approx([0.5, 1.0], abs=0.01)
+
+def test_the_probes_to_a_target_are_rate_limited_across_proxies():
+    scheduler = RetryScheduler(politeness_rate=0, target_rate=10, target_burst=5)
+    delays = politeness_delays(scheduler, [(f"1.1.1.{index}:80", "judge") for index in range(7)])
+
+    assert delays[:5] == [0.0] * 5
+    assert delays[5:] == pytest.approx([0.1, 0.2], abs=0.01)
+
+def test_the_backoff_grows_with_the_failures_up_to_its_bound():
+    scheduler = RetryScheduler(backoff_base=1, backoff_max=4, jitter=0)
+
+    assert [scheduler.backoff(failures) for failures in range(5)] == [0.0, 1, 2, 4, 4]
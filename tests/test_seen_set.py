@@ -0,0 +1,23 @@
+import pytest
+
+from proxycrawler import helpers
+from proxycrawler.src.seen_set import SeenSet
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_seen_set_reports_new_keys_once(on_disk):
+    with SeenSet(on_disk=on_disk) as seen:
+        assert seen.add(key=1)
+        assert seen.add(key=2**62)
+        assert not seen.add(key=1)
+        assert len(seen) == 2
+
+def test_pack_endpoint_reads_octets_as_decimal():
+    assert helpers.pack_endpoint(ip="1.2.3.4", port=80) == (0x01020304 << 16) | 80
+    assert helpers.pack_endpoint(ip="10.0.0.1", port=80) == helpers.pack_endpoint(ip="010.0.0.1", port=80)
+
+def test_packed_endpoints_are_distinct():
+    endpoints = {
+        helpers.pack_endpoint(ip=ip, port=port) for ip in ["0.0.0.0", "0.0.0.1", "255.255.255.255"] for port in [0, 1, 65535]
+    }
+
+    assert len(endpoints) == 9
@@ -0,0 +1,23 @@
+import asyncio
+
+import pytest
+
+from proxycrawler.src.validation.sniffer import (
+    sniff,
+    classify,
+    AMBIGUOUS_PROTOCOLS
+)
+
+@pytest.mark.parametrize("data, protocols", [
+    (b"\x05\x00", {"socks5", "socks4"}),
+    (b"\x05\xff", {"socks5", "socks4"}),
+    (b"\x00\x5b\x00\x00\x00\x00\x00\x00", {"socks4"}),
+    (b"HTTP/1.1 400 Bad Request\r\n\r\n", {"http", "https"}),
+    (b"SSH-2.0-OpenSSH_9.6\r\n", AMBIGUOUS_PROTOCOLS),
+])
+def test_classify(data, protocols):
+    assert classify(data) == protocols
+
+@pytest.mark.parametrize("port", ["not a port", 70000])
+def test_sniff_treats_a_malformed_port_as_closed(port):
+    assert asyncio.run(sniff(ip="127.0.0.1", port=port)) == frozenset()
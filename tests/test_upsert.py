@@ -0,0 +1,126 @@
+import datetime
+
+import pytest
+
+from proxycrawler import (
+    helpers,
+    constants
+)
+from proxycrawler.src.database.tables import Proxies
+
+def proxy_row(ip: str = "1.2.3.4", port: int = 8080, checked_at: datetime.datetime | None = None, is_valid: bool = True, protocols: list[str] = ["http"], total_time: float | None = 100.0, **columns) -> Proxies:
+    """ A row of a proxy as saved by a crawl, validated at `checked_at` unless it's None, its health computed like the validation engine does """
+    validation = dict()
+
+    if checked_at is not None:
+        success_rate = 1.0 if is_valid else 0.0
+        validation = {
+            "last_checked_at": checked_at,
+            "last_valid_at": checked_at if is_valid else None,
+            "latencies": {protocol: {"total": total_time} for protocol in protocols} if is_valid else {},
+            "total_time": total_time if is_valid else None,
+            "next_check_at": checked_at + datetime.timedelta(seconds=helpers.revalidation_ttl(success_rate=success_rate)),
+            "success_rate": success_rate,
+            "latency_ewma": total_time if is_valid else None,
+            "health_score": helpers.health_score(success_rate=success_rate, latency=total_time if is_valid else constants.HEALTH_LATENCY_SCALE)
+        }
+
+    return Proxies(
+        proxy_id=helpers.generate_proxy_uid(ip=ip, port=port),
+        ip=ip,
+        port=port,
+        protocol_mask=helpers.protocols_to_mask(protocols),
+        is_valid=is_valid,
+        **{**validation, **columns}
+    )
+
+def saved_proxies(database_handler) -> list[Proxies]:
+    return [proxy for proxy, in database_handler.fetch_proxies()]
+
+def test_saving_a_proxy_again_updates_its_row(database_handler):
+    added_at = helpers.date() - datetime.timedelta(days=3)
+
+    database_handler.save_proxies([proxy_row(checked_at=helpers.date(), added_at=added_at, country="FR")])
+    database_handler.save_proxies([proxy_row(checked_at=helpers.date(), country="DE")])
+
+    proxies = saved_proxies(database_handler)
+
+    assert len(proxies) == 1
+    assert proxies[0].proxy_id == helpers.generate_proxy_uid(ip="1.2.3.4", port=8080)
+    assert proxies[0].added_at == added_at
+    assert proxies[0].country == "DE"
+
+def test_saving_an_unvalidated_proxy_keeps_its_validation(database_handler):
+    checked_at = helpers.date()
+
+    database_handler.save_proxies([proxy_row(checked_at=checked_at, protocols=["http", "https"])])
+    database_handler.save_proxies([proxy_row(checked_at=None, protocols=["http", "https", "socks4", "socks5"], is_valid=False)])
+
+    proxy, = saved_proxies(database_handler)
+
+    assert proxy.is_valid
+    assert proxy.protocols == ["http", "https"]
+    assert proxy.total_time == 100.0
+    assert proxy.last_checked_at == checked_at
+    assert proxy.success_rate == 1.0
+
+def test_a_batch_merges_the_rows_of_a_proxy(database_handler):
+    checked_at = helpers.date()
+
+    database_handler.save_proxies([
+        proxy_row(checked_at=checked_at, protocols=["http"], total_time=200.0),
+        proxy_row(checked_at=checked_at, protocols=["socks5"], total_time=100.0),
+        proxy_row(checked_at=None, protocols=["socks4"], is_valid=False)
+    ])
+
+    proxy, = saved_proxies(database_handler)
+
+    assert proxy.is_valid
+    assert proxy.protocols == ["http", "socks5"]
+    assert set(proxy.latencies) == {"http", "socks5"}
+    assert proxy.total_time == 100.0
+
+def test_checks_are_folded_into_the_health_averages(database_handler):
+    alpha = 0.3
+
+    database_handler.save_proxies([proxy_row(checked_at=helpers.date(), total_time=100.0)])
+    database_handler.save_proxies([proxy_row(checked_at=helpers.date(), total_time=300.0)])
+    database_handler.save_proxies([proxy_row(checked_at=helpers.date(), is_valid=False)])
+
+    proxy, = saved_proxies(database_handler)
+    latency = alpha * 300.0 + (1 - alpha) * 100.0
+
+    assert proxy.success_rate == pytest.approx(1 - alpha)
+    # Failed checks don't tell anything about the latency
+    assert proxy.latency_ewma == pytest.approx(latency)
+    assert proxy.health_score == pytest.approx(helpers.health_score(success_rate=1 - alpha, latency=latency))
+
+def test_the_next_check_is_scheduled_from_the_merged_success_rate(database_handler):
+    checked_at = helpers.date()
+
+    database_handler.save_proxies([proxy_row(checked_at=checked_at)])
+    database_handler.save_proxies([proxy_row(checked_at=checked_at, is_valid=False)])
+
+    proxy, = saved_proxies(database_handler)
+    ttl = helpers.revalidation_ttl(success_rate=proxy.success_rate)
+
+    assert (proxy.next_check_at - checked_at).total_seconds() == pytest.approx(ttl, abs=1)
+
+def test_saving_an_unvalidated_proxy_keeps_its_health(database_handler):
+    database_handler.save_proxies([proxy_row(checked_at=helpers.date())])
+    health_score = saved_proxies(database_handler)[0].health_score
+
+    database_handler.save_proxies([proxy_row(checked_at=None, is_valid=False)])
+
+    proxy, = saved_proxies(database_handler)
+
+    assert proxy.success_rate == 1.0
+    assert proxy.health_score == health_score
+
+def test_the_writer_saves_the_queued_proxies(database_handler):
+    for port in range(1000, 1010):
+        database_handler.add_proxy(proxy=proxy_row(port=port, checked_at=helpers.date()))
+
+    database_handler.flush()
+
+    assert database_handler.count_proxies() == 10